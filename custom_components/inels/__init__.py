@@ -1,17 +1,79 @@
 """The iNels integration."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Mapping
+import time
 from typing import Any
 
 from inelsmqtt import InelsMqtt
+from inelsmqtt.const import MQTT_TRANSPORT
+from inelsmqtt.devices import Device
 from inelsmqtt.discovery import InelsDiscovery
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, Platform
+from homeassistant.const import (
+    CONF_DISCOVERY,
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_USERNAME,
+    CONF_VERIFY_SSL,
+    Platform,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
-from .const import BROKER, BROKER_CONFIG, DEVICES, DOMAIN, LOGGER
+from .availability import InelsAvailability
+from .base_class import build_device_info, build_gateway_info, device_key
+from .commands import InelsCommandTracker
+from .const import (
+    AVAILABILITY,
+    BROKER,
+    BROKER_CONFIG,
+    COMMAND_TRACKER,
+    CONF_DECODE_WORKER,
+    CONF_KEEPALIVE,
+    CONF_RECONNECT_MAX,
+    CONF_RECONNECT_MIN,
+    CONF_TLS,
+    DELIVERY,
+    DEVICE_HUBS,
+    DEVICE_INFO,
+    DEVICE_VALUES,
+    DEVICES,
+    DOMAIN,
+    ENTRY_OPTIONS,
+    INBOUND_QUEUE,
+    LOGGER,
+    METRICS,
+    RECONFIGURE_LOCK,
+    SCENES,
+    SCHEDULER,
+    SIGNAL_DEVICES_CHANGED,
+    TLS_CONTEXT,
+    TOPOLOGY,
+)
+from .delivery import InelsDelivery
+from .hub import InelsDeviceHub, InelsInboundQueue, async_refresh_hubs
+from .metrics import InelsMetrics
+from .scene import InelsSceneStore
+from .scheduler import InelsOutboundScheduler
+from .services import async_setup_services, async_unload_services
+from .topology import InelsTopology
+from .websocket import async_setup_websocket
+from .transport import (
+    DEFAULT_KEEPALIVE,
+    DEFAULT_RECONNECT_MAX,
+    DEFAULT_RECONNECT_MIN,
+    TRANSPORT_OPTIONS,
+    InelsTlsContext,
+    build_tls_context,
+    configure_client,
+    tls_settings,
+)
 
 PLATFORMS: "list[Platform]" = [
     Platform.BUTTON,
@@ -21,15 +83,158 @@ PLATFORMS: "list[Platform]" = [
     Platform.SENSOR,
     Platform.WATER_HEATER,
     Platform.CLIMATE,
+    Platform.SCENE,
 ]
 
+UNLOAD_DEADLINE = 5.0  # s
 
-async def _async_config_entry_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Call when config entry being updated."""
+TRANSPORT_KEYS = (
+    CONF_HOST,
+    CONF_PORT,
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    MQTT_TRANSPORT,
+    *TRANSPORT_OPTIONS,
+)
 
-    client: InelsMqtt = hass.data[BROKER]
 
-    await hass.async_add_executor_job(client.disconnect)
+# settings missing in entries created before the forms had them
+TRANSPORT_DEFAULTS: dict[str, Any] = {
+    MQTT_TRANSPORT: "tcp",
+    CONF_TLS: False,
+    CONF_VERIFY_SSL: True,
+    CONF_KEEPALIVE: DEFAULT_KEEPALIVE,
+    CONF_RECONNECT_MIN: DEFAULT_RECONNECT_MIN,
+    CONF_RECONNECT_MAX: DEFAULT_RECONNECT_MAX,
+}
+# the options form writes these, entries fresh from the config flow have none
+ENTITY_OPTION_DEFAULTS: dict[str, Any] = {
+    CONF_DISCOVERY: True,
+    CONF_DECODE_WORKER: False,
+}
+
+SWAP_FLUSH_TIMEOUT = 5.0  # s
+
+
+def _transport(config: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the connection settings of the broker, unset ones as defaults."""
+    settings: dict[str, Any] = {}
+    for key in TRANSPORT_KEYS:
+        value = config.get(key)
+        settings[key] = TRANSPORT_DEFAULTS.get(key) if value in (None, "") else value
+    return settings
+
+
+def _entity_options(options: Mapping[str, Any]) -> dict[str, Any]:
+    """Return options used by the entities, unset ones as defaults."""
+    return {
+        **ENTITY_OPTION_DEFAULTS,
+        **{key: val for key, val in options.items() if key not in TRANSPORT_KEYS},
+    }
+
+
+def _connect(config: Mapping[str, Any], context: InelsTlsContext | None) -> InelsMqtt:
+    """Create client with the transport settings. Blocking."""
+    mqtt = InelsMqtt(config)
+    configure_client(mqtt, config, context)
+    return mqtt
+
+
+def _reconnect(
+    config: Mapping[str, Any], context: InelsTlsContext | None
+) -> InelsMqtt | None:
+    """Connect a new client with the new settings, None when it fails. Blocking."""
+    try:
+        mqtt = _connect(config, context)
+        if mqtt.test_connection() is not False:
+            return mqtt
+    except OSError as exc:
+        LOGGER.debug("Connecting to %s failed: %s", config.get(CONF_HOST), exc)
+        return None
+
+    _close(mqtt)
+    return None
+
+
+def _recreate_devices(mqtt: InelsMqtt, devices: list[Device]) -> list[Device]:
+    """Create the devices again on the new client, in the same order. Blocking.
+
+    The client of a device is fixed when it is created, the discovery
+    creates them the same way.
+    """
+    return [type(device)(mqtt, device.state_topic, device.title) for device in devices]
+
+
+def _resubscribe(mqtt: InelsMqtt, devices: list[Device]) -> None:
+    """Subscribe state topics of the devices. Blocking."""
+    for device in devices:
+        mqtt.subscribe(device.state_topic)
+
+
+def _subscribe_gateways(mqtt: InelsMqtt, topics: list[str]) -> None:
+    """Subscribe connected topics of the gateways in one request. Blocking."""
+    if topics:
+        mqtt.client.subscribe([(topic, 0) for topic in topics])
+
+
+async def _async_swap_transport(
+    hass: HomeAssistant, entry: ConfigEntry, inels_data: dict[str, Any]
+) -> bool:
+    """Move the existing hubs and entities to a new broker connection.
+
+    The old client keeps running until the devices exist on the new one.
+    """
+    start = time.monotonic()
+    hubs: dict[str, InelsDeviceHub] = inels_data[DEVICE_HUBS]
+
+    mqtt: InelsMqtt | None = await hass.async_add_executor_job(
+        _reconnect, inels_data[BROKER_CONFIG], inels_data[TLS_CONTEXT]
+    )
+    if mqtt is None:
+        LOGGER.error("Cannot connect to the reconfigured MQTT broker")
+        return False
+
+    try:
+        devices: list[Device] = await hass.async_add_executor_job(
+            _recreate_devices, mqtt, inels_data[DEVICES]
+        )
+    except Exception as exc:  # pylint: disable=broad-except
+        LOGGER.error("Cannot create devices on the reconfigured broker: %s", exc)
+        await hass.async_add_executor_job(_close, mqtt)
+        return False
+
+    # frames queued for the old devices go out before their client is closed
+    try:
+        await asyncio.wait_for(inels_data[SCHEDULER].async_flush(), SWAP_FLUSH_TIMEOUT)
+    except asyncio.TimeoutError:
+        LOGGER.warning("Swapping the broker with outbound frames still queued")
+    inels_data[DELIVERY].async_cancel()
+
+    old_mqtt: InelsMqtt = inels_data[BROKER]
+    inels_data[BROKER] = mqtt
+    inels_data[DEVICES] = devices
+    for device in devices:
+        inels_data[AVAILABILITY].async_set_device(device)
+        hubs[device_key(device)].async_set_device(device)
+    async_dispatcher_send(hass, SIGNAL_DEVICES_CHANGED.format(entry.entry_id))
+    await hass.async_add_executor_job(_close, old_mqtt)
+
+    await hass.async_add_executor_job(
+        _resubscribe, mqtt, [hub.device for hub in hubs.values() if hub.subscribed]
+    )
+    await hass.async_add_executor_job(
+        _subscribe_gateways,
+        mqtt,
+        inels_data[AVAILABILITY].async_listen_gateways(mqtt),
+    )
+    await async_refresh_hubs(inels_data[SCHEDULER], list(hubs.values()))
+
+    LOGGER.info(
+        "Moved %d devices to the reconfigured MQTT broker in %.2f s",
+        len(hubs),
+        time.monotonic() - start,
+    )
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -40,13 +245,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     inels_data: "dict[str, Any]" = {
         BROKER_CONFIG: entry.data,
+        ENTRY_OPTIONS: _entity_options(entry.options),
+        RECONFIGURE_LOCK: asyncio.Lock(),
     }
 
     if hass.data.get(DOMAIN) is None:
         hass.data.setdefault(DOMAIN, {})[entry.entry_id] = inels_data
 
+    try:
+        inels_data[TLS_CONTEXT] = await hass.async_add_executor_job(
+            build_tls_context, entry.data
+        )
+    except (OSError, ValueError) as exc:
+        LOGGER.error("Cannot load TLS certificates: %s", exc)
+        return False
+
     mqtt: InelsMqtt = await hass.async_add_executor_job(
-        InelsMqtt, inels_data[BROKER_CONFIG]
+        _connect, inels_data[BROKER_CONFIG], inels_data[TLS_CONTEXT]
     )
 
     inels_data[BROKER] = mqtt
@@ -56,6 +271,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if await hass.async_add_executor_job(inels_data[BROKER].test_connection) is False:
         return False
 
+    start = time.monotonic()
     try:
         i_disc = InelsDiscovery(inels_data[BROKER])
         await hass.async_add_executor_job(i_disc.discovery)
@@ -64,32 +280,202 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     except Exception as exc:
         await hass.async_add_executor_job(mqtt.close)
         raise ConfigEntryNotReady from exc
+    discovered = time.monotonic()
 
-    LOGGER.info("Finished discovery, setting up platform.")
+    inels_data[DEVICE_VALUES] = await hass.async_add_executor_job(
+        _snapshot_values, inels_data[DEVICES]
+    )
+    decoded = time.monotonic()
+
+    _async_register_devices(hass, entry, inels_data)
+    registered = time.monotonic()
+
+    LOGGER.info(
+        "Finished discovery of %d devices in %.2f s, initial state in %.2f s, "
+        "device registry in %.2f s, setting up platform.",
+        len(inels_data[DEVICES]),
+        discovered - start,
+        decoded - discovered,
+        registered - decoded,
+    )
+
+    inels_data[TOPOLOGY] = InelsTopology(inels_data[DEVICES])
+    inels_data[SCHEDULER] = InelsOutboundScheduler(hass)
+    inels_data[AVAILABILITY] = InelsAvailability(
+        hass, inels_data[DEVICES], inels_data[TOPOLOGY], inels_data[SCHEDULER]
+    )
+    inels_data[INBOUND_QUEUE] = InelsInboundQueue(
+        hass,
+        inels_data[AVAILABILITY].async_seen,
+        decode_worker=entry.options.get(CONF_DECODE_WORKER, False),
+    )
+    inels_data[DEVICE_HUBS] = {
+        device_key(device): InelsDeviceHub(device, inels_data[INBOUND_QUEUE])
+        for device in inels_data[DEVICES]
+    }
+    inels_data[COMMAND_TRACKER] = InelsCommandTracker(hass, inels_data[DEVICE_HUBS])
+    inels_data[DELIVERY] = InelsDelivery(
+        hass, inels_data[COMMAND_TRACKER], inels_data[SCHEDULER]
+    )
+    inels_data[SCENES] = InelsSceneStore(hass, entry.entry_id)
+    await inels_data[SCENES].async_load()
+    inels_data[METRICS] = InelsMetrics(hass, entry.entry_id)
+    await inels_data[METRICS].async_load()
 
     hass.data[DOMAIN][entry.entry_id] = inels_data
+    hubs = inels_data[DEVICE_HUBS]
+    inels_data[METRICS].async_start(hubs)
+    inels_data[AVAILABILITY].async_start(
+        lambda keys: hass.async_create_task(
+            async_refresh_hubs(inels_data[SCHEDULER], [hubs[key] for key in keys])
+        )
+    )
+    # gateways drive availability of the devices behind them
+    await hass.async_add_executor_job(
+        _subscribe_gateways, mqtt, inels_data[AVAILABILITY].async_listen_gateways(mqtt)
+    )
     hass.config_entries.async_setup_platforms(entry, PLATFORMS)
+    async_setup_services(hass)
+    async_setup_websocket(hass)
 
     LOGGER.info("Platform setup complete.")
 
     return True
 
 
+def _snapshot_values(devices: list[Device]) -> dict[str, Any]:
+    """Decode the retained status of all devices in one pass."""
+    values: dict[str, Any] = {}
+
+    for device in devices:
+        try:
+            values[device_key(device)] = device.get_value()
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.debug("No retained status of %s: %s", device_key(device), exc)
+
+    return values
+
+
+def _async_register_devices(
+    hass: HomeAssistant, entry: ConfigEntry, inels_data: dict[str, Any]
+) -> None:
+    """Build device info once per device and fill the device registry in one pass."""
+    devices = inels_data[DEVICES]
+
+    inels_data[DEVICE_INFO] = {
+        device_key(device): build_device_info(device) for device in devices
+    }
+
+    registry = dr.async_get(hass)
+    # gateways first so the via device exists for the devices behind them
+    for mac in dict.fromkeys(device.parent_id for device in devices):
+        registry.async_get_or_create(
+            config_entry_id=entry.entry_id, **build_gateway_info(mac)
+        )
+    for device in devices:
+        registry.async_get_or_create(
+            config_entry_id=entry.entry_id,
+            **inels_data[DEVICE_INFO][device_key(device)],
+        )
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload all devices."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Swap the transport when only the broker changed, else reload all devices.
+
+    The options form updates the data and the options one after another,
+    the second update waits for the swap the first one started.
+    """
+    inels_data = hass.data[DOMAIN][entry.entry_id]
+
+    async with inels_data[RECONFIGURE_LOCK]:
+        if hass.data.get(DOMAIN, {}).get(entry.entry_id) is not inels_data:
+            # reloaded meanwhile, the new setup has the current settings
+            return
+
+        if _entity_options(entry.options) != inels_data[ENTRY_OPTIONS]:
+            await hass.config_entries.async_reload(entry.entry_id)
+            return
+
+        if _transport(entry.data) != _transport(inels_data[BROKER_CONFIG]):
+            await _async_reconfigure_transport(hass, entry, inels_data)
+
+
+async def _async_reconfigure_transport(
+    hass: HomeAssistant, entry: ConfigEntry, inels_data: dict[str, Any]
+) -> None:
+    """Swap the broker connection, keep the old one when the new fails."""
+    old_config = inels_data[BROKER_CONFIG]
+    old_context = inels_data[TLS_CONTEXT]
+    inels_data[BROKER_CONFIG] = entry.data
+
+    if tls_settings(entry.data) != tls_settings(old_config):
+        try:
+            inels_data[TLS_CONTEXT] = await hass.async_add_executor_job(
+                build_tls_context, entry.data
+            )
+        except (OSError, ValueError) as exc:
+            LOGGER.error("Cannot load TLS certificates: %s", exc)
+            inels_data[BROKER_CONFIG] = old_config
+            return
+
+    if not await _async_swap_transport(hass, entry, inels_data):
+        # still on the old broker, the next change retries the swap
+        inels_data[BROKER_CONFIG] = old_config
+        inels_data[TLS_CONTEXT] = old_context
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Unload a config entry."""
+    """Unload a config entry within the deadline."""
+    start = time.monotonic()
+
+    # nothing is torn down until the entities are gone
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
+
     hass_data = hass.data[DOMAIN][entry.entry_id]
     broker: InelsMqtt = hass_data[BROKER]
+    delivery: InelsDelivery = hass_data[DELIVERY]
+    scheduler: InelsOutboundScheduler = hass_data[SCHEDULER]
 
-    broker.unsubscribe_listeners()
-    broker.disconnect()
+    hass_data[AVAILABILITY].async_stop()
+
+    try:
+        await asyncio.gather(
+            _async_deadline(scheduler.async_flush(), start, "queued commands"),
+            _async_deadline(delivery.async_flush(), start, "pending commands"),
+            _async_deadline(hass_data[METRICS].async_save(), start, "metrics"),
+        )
+        if delivery.pending:
+            LOGGER.warning(
+                "Dropped %d unconfirmed commands on unload", delivery.pending
+            )
+        if dropped := scheduler.async_stop():
+            LOGGER.warning("Dropped %d queued outbound frames on unload", dropped)
+        delivery.async_cancel()
+    finally:
+        hass_data[INBOUND_QUEUE].stop()
+        await _async_deadline(
+            hass.async_add_executor_job(_close, broker), start, "broker disconnect"
+        )
 
     hass.data[DOMAIN].pop(entry.entry_id)
     if not hass.data[DOMAIN]:
         hass.data.pop(DOMAIN)
+        await async_unload_services(hass)
 
+    LOGGER.info("Unloaded iNELS in %.2f s", time.monotonic() - start)
     return True
+
+
+async def _async_deadline(aw: Awaitable[Any], start: float, name: str) -> None:
+    """Await until the unload deadline."""
+    try:
+        await asyncio.wait_for(aw, max(start + UNLOAD_DEADLINE - time.monotonic(), 0))
+    except asyncio.TimeoutError:
+        LOGGER.warning("Unload deadline reached waiting for %s", name)
+
+
+def _close(broker: InelsMqtt) -> None:
+    """Remove listeners and disconnect the broker. Blocking."""
+    broker.unsubscribe_listeners()
+    broker.disconnect()
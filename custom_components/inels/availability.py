@@ -0,0 +1,296 @@
+"""Stale device detection driving availability of the entities."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import partial
+import heapq
+import time
+from typing import Any
+
+from inelsmqtt import InelsMqtt
+from inelsmqtt.const import DEVICE_CONNCTED, Element
+from inelsmqtt.devices import Device
+
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .base_class import device_key
+from .const import LOGGER
+from .scheduler import PRIORITY_BACKGROUND, InelsOutboundScheduler
+from .topology import InelsTopology
+
+# seconds of silence after which the device is stale, None never expires
+BUS_SILENCE_BUDGET = 900.0
+RF_BATTERY_SILENCE_BUDGET = 7200.0
+RF_BATTERY_TYPES = (Element.RFTI_10B,)
+RF_BATTERY_PLATFORMS = (Platform.CLIMATE, Platform.WATER_HEATER)
+
+
+def silence_budget(device: Device) -> float | None:
+    """Return silence budget of the device type."""
+    if device.device_type == "bus":
+        return BUS_SILENCE_BUDGET
+    if (
+        device.inels_type in RF_BATTERY_TYPES
+        or device.device_type in RF_BATTERY_PLATFORMS
+    ):
+        return RF_BATTERY_SILENCE_BUDGET
+    # mains powered RF units report changes only
+    return None
+
+
+class InelsAvailability:
+    """Last seen timestamps with one heap scheduled timer for all devices."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        devices: list[Device],
+        topology: InelsTopology,
+        scheduler: InelsOutboundScheduler,
+    ) -> None:
+        """Init availability of the devices."""
+        self.hass = hass
+        self.topology = topology
+        self.scheduler = scheduler
+        self.devices = {device_key(device): device for device in devices}
+        self.budgets = {key: silence_budget(dev) for key, dev in self.devices.items()}
+        self.last_seen: dict[str, float] = {}
+        self.stale: set[str] = set()
+        # online state of the gateways by MAC, online until they report otherwise
+        self.gateways: dict[str, bool] = {}
+
+        self._available: dict[str, bool] = {}
+        self._listeners: dict[str, list[Callable[[bool], None]]] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._changed: set[str] = set()
+        self._flush_scheduled = False
+        self._timer: CALLBACK_TYPE | None = None
+        self._timer_deadline: float | None = None
+        self._refresh: Callable[[list[str]], Any] | None = None
+
+    @callback
+    def async_start(self, refresh: Callable[[list[str]], Any]) -> None:
+        """Start budgets of all devices from the retained status.
+
+        Refresh is called with the devices of a gateway when it comes back.
+        """
+        self._refresh = refresh
+        now = time.monotonic()
+
+        for key, device in self.devices.items():
+            self.last_seen[key] = now
+            self._available[key] = device.is_available is not False
+            if self.budgets[key] is not None:
+                self._heap.append((now + self.budgets[key], key))
+            self._listen_connected(key, device)
+
+        heapq.heapify(self._heap)
+        self._async_schedule()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the timer."""
+        if self._timer is not None:
+            self._timer()
+            self._timer = None
+
+    @callback
+    def async_set_device(self, device: Device) -> None:
+        """Follow the device created again on a new broker connection."""
+        key = device_key(device)
+        self.devices[key] = device
+        self._listen_connected(key, device)
+        self._async_update(key)
+
+    def _listen_connected(self, key: str, device: Device) -> None:
+        """Listen to the connected topic the gateway publishes for the device.
+
+        The gateway reports a lost device there, its status topic stays silent.
+        """
+        device.mqtt.subscribe_listener(
+            device.connected_topic, partial(self._connected_received, key)
+        )
+
+    def _connected_received(self, key: str, payload: Any) -> None:
+        """Get the connected frame from the broker thread to the loop."""
+        self.hass.loop.call_soon_threadsafe(self._async_update, key)
+
+    @callback
+    def async_listen_gateways(self, mqtt: InelsMqtt) -> list[str]:
+        """Listen to the connected topics of the gateways, return them to subscribe.
+
+        Gateways publish no status frames, only whether they are online.
+        """
+        for mac, topic in self.topology.connected_topics.items():
+            mqtt.subscribe_listener(topic, partial(self._gateway_received, mac))
+
+        return list(self.topology.connected_topics.values())
+
+    def _gateway_received(self, mac: str, payload: Any) -> None:
+        """Get the gateway connected frame from the broker thread to the loop."""
+        if isinstance(payload, (bytes, bytearray)):
+            payload = payload.decode()
+        online = DEVICE_CONNCTED.get(payload) is not False
+        self.hass.loop.call_soon_threadsafe(self._async_gateway, mac, online)
+
+    @callback
+    def _async_gateway(self, mac: str, online: bool) -> None:
+        """Take down or restore the devices behind the gateway."""
+        was_online = self.gateways.get(mac, True)
+        self.gateways[mac] = online
+
+        if online and not was_online:
+            self._async_subtree_up(mac)
+        elif was_online and not online:
+            self._async_subtree_down(mac)
+
+    def is_available(self, key: str) -> bool:
+        """Return cached availability of the device."""
+        return self._available.get(key, True)
+
+    @callback
+    def async_add_listener(
+        self, key: str, update_callback: Callable[[bool], None]
+    ) -> CALLBACK_TYPE:
+        """Add listener of availability changes of the device."""
+        self._listeners.setdefault(key, []).append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners[key].remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_seen(self, key: str) -> None:
+        """Record status frame of the device."""
+        now = time.monotonic()
+        self.last_seen[key] = now
+
+        if key in self.stale:
+            self.stale.discard(key)
+            heapq.heappush(self._heap, (now + self.budgets[key], key))
+            self._async_schedule()
+
+        self._async_update(key)
+
+    @callback
+    def _async_update(self, key: str) -> None:
+        """Set availability from the device status and its gateway."""
+        self._async_set(
+            key,
+            key not in self.stale
+            and self.devices[key].is_available is not False
+            and self.gateways.get(self.topology.gateway(key), True),
+        )
+
+    @callback
+    def _async_subtree_down(self, mac: str) -> None:
+        """Gateway went offline, all devices behind it are unavailable."""
+        subtree = self.topology.subtree(mac)
+        LOGGER.debug("Gateway %s is offline, %d devices behind it", mac, len(subtree))
+
+        for child in subtree:
+            self._async_set(child, False)
+
+    @callback
+    def _async_subtree_up(self, mac: str) -> None:
+        """Gateway is back, restore and refresh the devices behind it only."""
+        subtree = self.topology.subtree(mac)
+        LOGGER.debug("Gateway %s is back, refreshing %d devices", mac, len(subtree))
+
+        for child in subtree:
+            self._async_update(child)
+
+        if self._refresh is not None and subtree:
+            self._refresh(subtree)
+
+    @callback
+    def _async_set(self, key: str, available: bool) -> None:
+        """Queue availability change for the next batch."""
+        if self._available.get(key) is available:
+            return
+
+        self._available[key] = available
+        self._changed.add(key)
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.hass.loop.call_soon(self._async_flush)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Push all availability changes to the entities in one pass."""
+        changed = self._changed
+        self._changed = set()
+        self._flush_scheduled = False
+
+        for key in changed:
+            for update_callback in tuple(self._listeners.get(key, ())):
+                update_callback(self._available[key])
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Arm the timer for the earliest deadline."""
+        if not self._heap:
+            return
+
+        deadline = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer_deadline is not None and self._timer_deadline <= deadline:
+                return
+            self._timer()
+
+        self._timer_deadline = deadline
+        self._timer = async_call_later(
+            self.hass, max(deadline - time.monotonic(), 0), self._async_expire
+        )
+
+    @callback
+    def _async_expire(self, _: Any) -> None:
+        """Expire devices silent for longer than their budget."""
+        self._timer = None
+        self._timer_deadline = None
+        now = time.monotonic()
+
+        while self._heap and self._heap[0][0] <= now:
+            _, key = heapq.heappop(self._heap)
+            deadline = self.last_seen[key] + self.budgets[key]
+
+            if deadline > now:
+                heapq.heappush(self._heap, (deadline, key))
+                continue
+
+            self.stale.add(key)
+            self._async_set(key, False)
+            self._async_resubscribe(self.devices[key])
+
+        if self.stale:
+            LOGGER.debug("%d devices are stale", len(self.stale))
+
+        self._async_schedule()
+
+    @callback
+    def _async_resubscribe(self, device: Device) -> None:
+        """Subscribe the state topic again when the broker lost it."""
+        if device.is_subscribed is False:
+            self.scheduler.async_post(
+                device,
+                partial(device.mqtt.subscribe, device.state_topic),
+                PRIORITY_BACKGROUND,
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return offline gateways, stale devices and seconds since their last frame."""
+        now = time.monotonic()
+        return {
+            "tracked": sum(budget is not None for budget in self.budgets.values()),
+            "offline_gateways": sorted(
+                mac for mac, online in self.gateways.items() if not online
+            ),
+            "stale": {
+                key: round(now - self.last_seen[key]) for key in sorted(self.stale)
+            },
+        }
@@ -1,45 +1,121 @@
 """Base class for Inels components."""
 from __future__ import annotations
 
+from collections.abc import Callable
 from typing import Any
 
+from inelsmqtt.const import MANUFACTURER
 from inelsmqtt.devices import Device
 
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo, Entity
 
-from .const import DOMAIN
+from .const import AVAILABILITY, DELIVERY, DEVICE_HUBS, DEVICE_INFO, DOMAIN, TITLE
+from .scheduler import context_priority
+
+
+def device_key(device: Device) -> str:
+    """Key of the device, same as the unique id of its main entity."""
+    return f"{device.parent_id}-{device.unique_id}"
+
+
+def build_device_info(device: Device) -> DeviceInfo:
+    """Build device info of the physical device."""
+    info = device.info()
+    return DeviceInfo(
+        identifiers={(DOMAIN, device.unique_id)},
+        manufacturer=info.manufacturer,
+        model=info.model_number,
+        name=device.title,
+        sw_version=info.sw_version,
+        via_device=(DOMAIN, device.parent_id),
+    )
+
+
+def build_gateway_info(mac: str) -> DeviceInfo:
+    """Build device info of the gateway, the via device of the devices behind it."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, mac)},
+        manufacturer=MANUFACTURER,
+        name=f"{TITLE} gateway {mac}",
+    )
 
 
 class InelsBaseEntity(Entity):
     """Base Inels device."""
 
+    # decodes the state decoded by the hub for _callback, off the loop with the
+    # decode worker
+    _decode: Callable[[Any], Any] | None = None
+    # shared until the device info of the entry is looked up
+    _device_info: DeviceInfo | None = None
+
     def __init__(
         self,
         device: Any,
     ) -> None:
-        """Init base entity."""
+        """Init base entity, ids of the device are read from it, not copied."""
         self._device: Any = device
-        self._device_id = self._device.unique_id
         self._attr_name = self._device.title
+        self._attr_unique_id = device_key(self._device)
+
+    @property
+    def _device_id(self) -> str:
+        """Unique id of the device."""
+        return self._device.unique_id
+
+    @property
+    def _parent_id(self) -> str:
+        """MAC of the gateway of the device."""
+        return self._device.parent_id
 
-        self._parent_id = self._device.parent_id
-        self._attr_unique_id = f"{self._parent_id}-{self._device_id}"
+    @property
+    def _device_key(self) -> str:
+        """Key of the device hub and availability."""
+        return device_key(self._device)
+
+    @property
+    def _inels_data(self) -> dict[str, Any]:
+        """Data of the config entry the entity belongs to."""
+        return self.hass.data[DOMAIN][self.platform.config_entry.entry_id]
 
     async def async_added_to_hass(self) -> None:
-        """Add subscription of the data listenere."""
+        """Add listeners of the device hub and of the device availability."""
+        hub = self._inels_data[DEVICE_HUBS][self._device_key]
+        self.async_on_remove(hub.async_add_listener(self._callback, self._decode))
+        self.async_on_remove(hub.async_add_device_listener(self._async_device_changed))
+
+        availability = self._inels_data[AVAILABILITY]
+        self._attr_available = availability.is_available(self._device_key)
         self.async_on_remove(
-            self._device.mqtt.subscribe_listener(
-                # self._device.state_topic,
-                # self._callback,
-                self._attr_unique_id,
-                self._callback,
+            availability.async_add_listener(
+                self._device_key, self._async_availability_changed
             )
         )
 
+    @callback
+    def _async_device_changed(self, device: Device) -> None:
+        """Use the device of the new broker connection."""
+        self._device = device
+
+    @callback
+    def _async_availability_changed(self, available: bool) -> None:
+        """Write availability pushed by the stale device detection."""
+        self._attr_available = available
+        self.async_write_ha_state()
+
+    async def _async_set_ha_value(
+        self, ha_value: Any, confirm: Callable[[Any], bool] | None = None
+    ) -> None:
+        """Publish the ha value with delivery tracking, user commands go first."""
+        await self._inels_data[DELIVERY].async_set_ha_value(
+            self._device, ha_value, context_priority(self._context), confirm
+        )
+
+    @callback
     def _callback(self, new_value: Any) -> None:
-        """Get data from broker into the HA."""
-        # self._device.update_value(new_value)
-        self.schedule_update_ha_state()
+        """Get data from the device hub into the HA."""
+        self.async_write_ha_state()
 
     @property
     def should_poll(self) -> bool:
@@ -48,21 +124,14 @@ class InelsBaseEntity(Entity):
 
     @property
     def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        info = self._device.info()
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._device.unique_id)},
-            manufacturer=info.manufacturer,
-            model=info.model_number,
-            name=self._device.title,
-            sw_version=info.sw_version,
-            via_device=(DOMAIN, self._parent_id),
-        )
+        """Return device info shared by all entities of the device."""
+        if self._device_info is None:
+            if self.hass is not None and self.platform is not None:
+                self._device_info = self._inels_data.get(DEVICE_INFO, {}).get(
+                    self._device_key
+                )
 
-    @property
-    def available(self) -> bool:
-        """Return if entity si available."""
-        if self._device.is_subscribed is False:
-            self._device.mqtt.subscribe(self._device.state_topic)
+            if self._device_info is None:
+                self._device_info = build_device_info(self._device)
 
-        return self._device.is_available and super().available
\ No newline at end of file
+        return self._device_info
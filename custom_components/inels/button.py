@@ -14,12 +14,12 @@ from homeassistant.components.button import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_ENTITY_ID, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .base_class import InelsBaseEntity
-from .const import DEVICES, DOMAIN, ICON_BUTTON
+from .base_class import InelsBaseEntity, device_key
+from .const import DEVICE_VALUES, DEVICES, DOMAIN, ICON_BUTTON
 
 
 @dataclass
@@ -33,15 +33,17 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Load Inels water heater from config entry."""
-    device_list: "list[Device]" = hass.data[DOMAIN][config_entry.entry_id][DEVICES]
+    inels_data = hass.data[DOMAIN][config_entry.entry_id]
+    device_list: "list[Device]" = inels_data[DEVICES]
+    device_values = inels_data[DEVICE_VALUES]
 
     entities = []
 
     for device in device_list:
         if device.device_type == Platform.BUTTON:
             index = 1
-            val = device.get_value()
-            if val.ha_value is not None:
+            val = device_values.get(device_key(device))
+            if val is not None and val.ha_value is not None:
                 while index <= val.ha_value.amount:
                     entities.append(
                         InelsButton(
@@ -75,18 +77,20 @@ class InelsButton(InelsBaseEntity, ButtonEntity):
         if description.name:
             self._attr_name = f"{self._attr_name}-{description.name}"
 
+    @callback
     def _callback(self, new_value: Any) -> None:
         # super()._callback(new_value)
         # self.__process_state()
-        entity_id = f"{Platform.BUTTON}.{self._device_id}_btn_{self._device.values.ha_value.number}"
-
-        if self._device.values.ha_value.pressing:
-            self.hass.services.call(
-                Platform.BUTTON,
-                SERVICE_PRESS,
-                {ATTR_ENTITY_ID: entity_id},
-                True,
-                self._context,
+        entity_id = f"{Platform.BUTTON}.{self._device_id}_btn_{new_value.state.number}"
+
+        if new_value.state.pressing:
+            self.hass.async_create_task(
+                self.hass.services.async_call(
+                    Platform.BUTTON,
+                    SERVICE_PRESS,
+                    {ATTR_ENTITY_ID: entity_id},
+                    context=self._context,
+                )
             )
 
         super()._callback(new_value)
@@ -4,7 +4,6 @@ from __future__ import annotations
 from typing import Any
 
 from inelsmqtt.devices import Device
-import inelsmqtt.util as InelsUtil
 
 from homeassistant.components.climate import (
     STATE_OFF,
@@ -19,6 +18,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .base_class import InelsBaseEntity
+from .commands import setpoint_confirm, setpoint_value
 from .const import DEFAULT_MAX_TEMP, DEFAULT_MIN_TEMP, DEVICES, DOMAIN
 
 OPERATION_LIST = [
@@ -75,12 +75,6 @@ class InelsClimate(InelsBaseEntity, ClimateEntity):
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set required temperature."""
-        _s = self._device.state
-
-        new_value = InelsUtil.new_object(
-            battery=_s.battery,
-            current=_s.current,
-            required=kwargs.get(ATTR_TEMPERATURE),
-            open_in_percentage=_s.open_in_percentage,
-        )
-        await self.hass.async_add_executor_job(self._device.set_ha_value, new_value)
+        temperature = kwargs.get(ATTR_TEMPERATURE)
+        new_value = setpoint_value(self._device, temperature)
+        await self._async_set_ha_value(new_value, setpoint_confirm(temperature))
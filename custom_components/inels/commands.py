@@ -0,0 +1,258 @@
+"""Command encoding and batched publishing for iNELS devices."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from copy import deepcopy
+from dataclasses import dataclass
+from functools import partial
+import time
+from typing import Any
+
+from inelsmqtt.devices import Device
+import inelsmqtt.util as InelsUtil
+
+from homeassistant.core import HomeAssistant, callback
+
+from .base_class import device_key
+from .const import LOGGER
+from .hub import InelsDeviceHub, InelsDeviceState
+from .scheduler import PRIORITY_AUTOMATION, InelsOutboundScheduler
+
+DEFAULT_PACE = 0.02  # s
+DEFAULT_TIMEOUT = 10.0  # s
+DEFAULT_WINDOW = 8
+SETPOINT_STEP = 0.5  # °C, resolution of the required temperature in the frame
+
+
+@dataclass
+class InelsCommand:
+    """Pre-encoded frame for a device."""
+
+    device: Device
+    topic: str
+    payload: Any
+    confirm: Callable[[InelsDeviceState], bool] | None = None
+
+
+def ha_value_matches(expected: Any, actual: Any) -> bool:
+    """Return true when the decoded ha value shows the requested one."""
+    if hasattr(expected, "__dict__"):
+        fields = getattr(actual, "__dict__", None)
+        return fields is not None and all(
+            key in fields and ha_value_matches(value, fields[key])
+            for key, value in vars(expected).items()
+        )
+    if isinstance(expected, (list, tuple)):
+        return (
+            isinstance(actual, (list, tuple))
+            and len(actual) == len(expected)
+            and all(map(ha_value_matches, expected, actual))
+        )
+    return bool(expected == actual)
+
+
+def value_confirm(ha_value: Any) -> Callable[[InelsDeviceState], bool]:
+    """Confirm by the status frame showing the requested ha value."""
+    expected = deepcopy(ha_value)
+    return lambda device: ha_value_matches(expected, device.values.ha_value)
+
+
+def setpoint_confirm(
+    temperature: float, step: float = SETPOINT_STEP
+) -> Callable[[InelsDeviceState], bool]:
+    """Confirm by the status frame showing the required temperature.
+
+    The frame holds the temperature quantised to the step.
+    """
+    return lambda device: abs(device.state.required - temperature) <= step / 2
+
+
+def frame_confirm(device: InelsDeviceState) -> bool:
+    """Confirm by any status frame, for covers reporting travel states."""
+    return True
+
+
+def encode_command(
+    device: Device,
+    ha_value: Any,
+    confirm: Callable[[InelsDeviceState], bool] | None = None,
+) -> InelsCommand:
+    """Encode ha value of the device into the frame published on set topic."""
+    value = InelsUtil.DeviceValue(
+        device.device_type,
+        device.inels_type,
+        ha_value=ha_value,
+    )
+    return InelsCommand(device, device.set_topic, value.inels_set_value, confirm)
+
+
+def setpoint_value(device: Device, temperature: float) -> Any:
+    """Create ha value of the thermostat with new required temperature."""
+    _s = device.state
+
+    return InelsUtil.new_object(
+        battery=_s.battery,
+        current=_s.current,
+        required=temperature,
+        open_in_percentage=_s.open_in_percentage,
+    )
+
+
+def publish_command(command: InelsCommand) -> bool:
+    """Publish encoded frame. Blocking."""
+    try:
+        return command.device.mqtt.publish(command.topic, command.payload) is not False
+    except Exception as exc:  # pylint: disable=broad-except
+        LOGGER.warning("Publish to %s failed: %s", command.topic, exc)
+        return False
+
+
+class InelsCommandTracker:
+    """Wait for the status frames confirming published commands."""
+
+    def __init__(self, hass: HomeAssistant, hubs: dict[str, InelsDeviceHub]) -> None:
+        """Init tracker."""
+        self.hass = hass
+        self._hubs = hubs
+        self._waiters: dict[str, list[tuple[asyncio.Future, InelsCommand]]] = {}
+        self._listening: set[str] = set()
+        self._frames: dict[str, float] = {}
+
+    @callback
+    def async_expect(self, command: InelsCommand) -> asyncio.Future:
+        """Return future resolved by the next confirming frame of the device."""
+        key = device_key(command.device)
+
+        if key not in self._listening:
+            self._hubs[key].async_add_listener(partial(self._async_confirm, key))
+            self._listening.add(key)
+
+        future: asyncio.Future = self.hass.loop.create_future()
+        self._waiters.setdefault(key, []).append((future, command))
+        return future
+
+    def last_frame(self, key: str) -> float:
+        """Return monotonic time of the last status frame of the tracked device."""
+        return self._frames.get(key, 0.0)
+
+    @callback
+    def _async_confirm(self, key: str, state: InelsDeviceState) -> None:
+        """Resolve waiters confirmed by the device state decoded from the frame."""
+        self._frames[key] = time.monotonic()
+        if key not in self._waiters:
+            return
+
+        waiting = []
+
+        for future, command in self._waiters.pop(key, []):
+            if future.done():
+                continue
+            if command.confirm is None or command.confirm(state):
+                future.set_result(True)
+            else:
+                waiting.append((future, command))
+
+        if waiting:
+            self._waiters[key] = waiting
+
+    @callback
+    def async_release(self, commands: list[InelsCommand]) -> None:
+        """Drop finished waiters of the commands."""
+        for key in {device_key(command.device) for command in commands}:
+            waiting = [
+                item for item in self._waiters.get(key, []) if not item[0].done()
+            ]
+            if waiting:
+                self._waiters[key] = waiting
+            else:
+                self._waiters.pop(key, None)
+
+
+async def async_publish_commands(
+    scheduler: InelsOutboundScheduler,
+    commands: list[InelsCommand],
+    pace: float = DEFAULT_PACE,
+    priority: int = PRIORITY_AUTOMATION,
+) -> list[bool]:
+    """Publish commands through the scheduler, submitted at least pace apart."""
+    tasks: list[asyncio.Task] = []
+
+    for index, command in enumerate(commands):
+        if index and pace:
+            await asyncio.sleep(pace)
+
+        tasks.append(
+            asyncio.create_task(
+                scheduler.async_submit(
+                    command.device, partial(publish_command, command), priority
+                )
+            )
+        )
+
+    return list(await asyncio.gather(*tasks))
+
+
+async def async_send_commands(
+    scheduler: InelsOutboundScheduler,
+    tracker: InelsCommandTracker,
+    commands: list[InelsCommand],
+    pace: float = DEFAULT_PACE,
+    timeout: float = DEFAULT_TIMEOUT,
+    priority: int = PRIORITY_AUTOMATION,
+) -> list[bool]:
+    """Publish commands in one burst and wait for confirmation or timeout."""
+    if not commands:
+        return []
+
+    futures = [tracker.async_expect(command) for command in commands]
+    published = await async_publish_commands(scheduler, commands, pace, priority)
+
+    pending = [
+        future for future, sent in zip(futures, published) if sent and not future.done()
+    ]
+    if pending:
+        await asyncio.wait(pending, timeout=timeout)
+
+    for future in futures:
+        if not future.done():
+            future.cancel()
+    tracker.async_release(commands)
+
+    return [
+        sent and future.done() and not future.cancelled()
+        for future, sent in zip(futures, published)
+    ]
+
+
+async def async_send_pipelined(
+    scheduler: InelsOutboundScheduler,
+    tracker: InelsCommandTracker,
+    commands: list[InelsCommand],
+    window: int = DEFAULT_WINDOW,
+    timeout: float = DEFAULT_TIMEOUT,
+    priority: int = PRIORITY_AUTOMATION,
+) -> list[bool]:
+    """Publish commands with at most window of them waiting for confirmation."""
+    semaphore = asyncio.Semaphore(window)
+
+    async def _async_send(command: InelsCommand) -> bool:
+        async with semaphore:
+            future = tracker.async_expect(command)
+
+            if not await scheduler.async_submit(
+                command.device, partial(publish_command, command), priority
+            ):
+                future.cancel()
+                return False
+
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return False
+            return True
+
+    try:
+        return list(await asyncio.gather(*(_async_send(cmd) for cmd in commands)))
+    finally:
+        tracker.async_release(commands)
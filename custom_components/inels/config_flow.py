@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from collections import OrderedDict
+from collections.abc import Mapping
 from typing import Any
 
 from inelsmqtt import InelsMqtt
@@ -13,14 +14,51 @@ from homeassistant.components.hassio.discovery import HassioServiceInfo
 from homeassistant.const import (
     CONF_DISCOVERY,
     CONF_HOST,
+    CONF_NAME,
     CONF_PASSWORD,
     CONF_PORT,
     CONF_USERNAME,
+    CONF_VERIFY_SSL,
 )
+from homeassistant.const import Platform
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-
-from .const import DOMAIN, TITLE
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.util import slugify
+
+from .const import (
+    CONF_CA_CERT,
+    CONF_CLIENT_CERT,
+    CONF_CLIENT_KEY,
+    CONF_COVER,
+    CONF_COVER_TRAVEL,
+    CONF_DEADBAND,
+    CONF_DEADBAND_RELATIVE,
+    CONF_DECODE_WORKER,
+    CONF_GROUP_NAME,
+    CONF_GROUPS,
+    CONF_HEARTBEAT,
+    CONF_KEEPALIVE,
+    CONF_MEMBERS,
+    CONF_MIN_INTERVAL,
+    CONF_RECONNECT_MAX,
+    CONF_RECONNECT_MIN,
+    CONF_SENSOR,
+    CONF_SENSOR_THROTTLE,
+    CONF_TLS,
+    CONF_TRAVEL_DOWN,
+    CONF_TRAVEL_UP,
+    DOMAIN,
+    TITLE,
+)
+from .transport import (
+    DEFAULT_KEEPALIVE,
+    DEFAULT_RECONNECT_MAX,
+    DEFAULT_RECONNECT_MIN,
+    TRANSPORT_OPTIONS,
+    build_tls_context,
+    configure_client,
+)
 
 CONNECTION_TIMEOUT = 5
 
@@ -64,6 +102,7 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 user_input.get(CONF_USERNAME),
                 user_input.get(CONF_PASSWORD),
                 user_input.get(MQTT_TRANSPORT),
+                user_input,
             )
 
             if test_connect:
@@ -76,6 +115,7 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_USERNAME: user_input.get(CONF_USERNAME),
                         CONF_PASSWORD: user_input.get(CONF_PASSWORD),
                         MQTT_TRANSPORT: user_input.get(MQTT_TRANSPORT),
+                        **_transport_options(user_input),
                         CONF_DISCOVERY: True,
                         # MQTT_TIMEOUT: CONNECTION_TIMEOUT,
                     },
@@ -100,6 +140,7 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         fields[vol.Required(MQTT_TRANSPORT, default="tcp")] = vol.In(
             ["tcp", "websockets"]
         )
+        _transport_fields(fields, user_input)
 
         return self.async_show_form(
             step_id="setup", data_schema=vol.Schema(fields), errors=errors
@@ -129,6 +170,7 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 data.get(CONF_USERNAME),
                 data.get(CONF_PASSWORD),
                 data.get(MQTT_TRANSPORT),
+                data,
             )
 
             if test_connect:
@@ -163,8 +205,11 @@ class InelsOptionsFlowHandler(config_entries.OptionsFlow):
         self.options = dict(config_entry.options)
 
     async def async_step_init(self, user_input: None = None) -> FlowResult:
-        """Manage the MQTT setup."""
-        return await self.async_step_setup()
+        """Manage the iNELS options."""
+        return self.async_show_menu(
+            step_id="init",
+            menu_options=["setup", "sensor_throttle", "cover_travel", "groups"],
+        )
 
     async def async_step_setup(
         self, user_input: dict[str, Any] | None = None
@@ -182,6 +227,7 @@ class InelsOptionsFlowHandler(config_entries.OptionsFlow):
                 user_input.get(CONF_USERNAME),
                 user_input.get(CONF_PASSWORD),
                 user_input.get(MQTT_TRANSPORT),
+                user_input,
             )
 
             if test_connect:
@@ -192,11 +238,14 @@ class InelsOptionsFlowHandler(config_entries.OptionsFlow):
                 return self.async_create_entry(
                     title=TITLE,
                     data={
+                        **self.options,
                         CONF_HOST: user_input[CONF_HOST],
                         CONF_PORT: user_input[CONF_PORT],
                         CONF_USERNAME: user_input.get(CONF_USERNAME),
                         CONF_PASSWORD: user_input.get(CONF_PASSWORD),
                         MQTT_TRANSPORT: user_input.get(MQTT_TRANSPORT),
+                        **_transport_options(user_input),
+                        CONF_DECODE_WORKER: user_input.get(CONF_DECODE_WORKER, False),
                         CONF_DISCOVERY: True,
                     },
                 )
@@ -226,6 +275,13 @@ class InelsOptionsFlowHandler(config_entries.OptionsFlow):
         fields[vol.Required(MQTT_TRANSPORT, default=current_transport)] = vol.In(
             ["tcp", "websockets"]
         )
+        _transport_fields(fields, current_config)
+        fields[
+            vol.Optional(
+                CONF_DECODE_WORKER,
+                default=self.options.get(CONF_DECODE_WORKER, False),
+            )
+        ] = bool
 
         return self.async_show_form(
             step_id="setup",
@@ -234,8 +290,182 @@ class InelsOptionsFlowHandler(config_entries.OptionsFlow):
             last_step=True,
         )
 
+    async def async_step_sensor_throttle(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the deadband and publish interval of a sensor."""
+        throttles: dict[str, dict[str, float]] = dict(
+            self.options.get(CONF_SENSOR_THROTTLE, {})
+        )
+
+        if user_input is not None:
+            unique_id = user_input.pop(CONF_SENSOR)
+            settings = {key: val for key, val in user_input.items() if val}
+
+            if settings:
+                throttles[unique_id] = settings
+            else:
+                throttles.pop(unique_id, None)
+
+            self.options[CONF_SENSOR_THROTTLE] = throttles
+            return self.async_create_entry(title="", data=self.options)
+
+        sensors = self._entities(Platform.SENSOR)
+
+        if not sensors:
+            return self.async_abort(reason="no_sensors")
+
+        fields = OrderedDict()
+        fields[vol.Required(CONF_SENSOR)] = vol.In(sensors)
+        fields[vol.Optional(CONF_DEADBAND, default=0.0)] = vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        )
+        fields[vol.Optional(CONF_DEADBAND_RELATIVE, default=0.0)] = vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=100)
+        )
+        fields[vol.Optional(CONF_MIN_INTERVAL, default=0)] = vol.All(
+            vol.Coerce(int), vol.Range(min=0)
+        )
+        fields[vol.Optional(CONF_HEARTBEAT, default=0)] = vol.All(
+            vol.Coerce(int), vol.Range(min=0)
+        )
+
+        return self.async_show_form(
+            step_id="sensor_throttle",
+            data_schema=vol.Schema(fields),
+            last_step=True,
+        )
+
+    async def async_step_cover_travel(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the calibrated travel times of a cover."""
+        travels: dict[str, dict[str, float]] = dict(
+            self.options.get(CONF_COVER_TRAVEL, {})
+        )
+
+        if user_input is not None:
+            unique_id = user_input.pop(CONF_COVER)
+
+            if user_input[CONF_TRAVEL_UP] and user_input[CONF_TRAVEL_DOWN]:
+                travels[unique_id] = user_input
+            else:
+                travels.pop(unique_id, None)
+
+            self.options[CONF_COVER_TRAVEL] = travels
+            return self.async_create_entry(title="", data=self.options)
+
+        covers = self._entities(Platform.COVER)
+
+        if not covers:
+            return self.async_abort(reason="no_covers")
+
+        fields = OrderedDict()
+        fields[vol.Required(CONF_COVER)] = vol.In(covers)
+        fields[vol.Required(CONF_TRAVEL_UP, default=0.0)] = vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        )
+        fields[vol.Required(CONF_TRAVEL_DOWN, default=0.0)] = vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        )
+
+        return self.async_show_form(
+            step_id="cover_travel",
+            data_schema=vol.Schema(fields),
+            last_step=True,
+        )
+
+    async def async_step_groups(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the members of a group switched with one batch of frames."""
+        groups: dict[str, dict[str, Any]] = dict(self.options.get(CONF_GROUPS, {}))
+
+        if user_input is not None:
+            name = user_input[CONF_GROUP_NAME]
+            group_id = slugify(name)
+
+            if user_input[CONF_MEMBERS]:
+                groups[group_id] = {
+                    CONF_NAME: name,
+                    CONF_MEMBERS: user_input[CONF_MEMBERS],
+                }
+            else:
+                groups.pop(group_id, None)
+
+            self.options[CONF_GROUPS] = groups
+            return self.async_create_entry(title="", data=self.options)
+
+        group_prefix = f"{self.config_entry.entry_id}-group-"
+        outputs = {
+            unique_id: name
+            for domain in (Platform.LIGHT, Platform.SWITCH)
+            for unique_id, name in self._entities(domain).items()
+            if not unique_id.startswith(group_prefix)
+        }
+
+        if not outputs:
+            return self.async_abort(reason="no_outputs")
+
+        fields = OrderedDict()
+        fields[vol.Required(CONF_GROUP_NAME)] = str
+        fields[vol.Optional(CONF_MEMBERS, default=[])] = cv.multi_select(outputs)
+
+        return self.async_show_form(
+            step_id="groups",
+            data_schema=vol.Schema(fields),
+            last_step=True,
+        )
+
+    def _entities(self, domain: str) -> dict[str, str]:
+        """Get unique id and name of the entry entities in the domain."""
+        registry = er.async_get(self.hass)
+        return {
+            entry.unique_id: entry.name or entry.original_name or entry.entity_id
+            for entry in er.async_entries_for_config_entry(
+                registry, self.config_entry.entry_id
+            )
+            if entry.domain == domain
+        }
+
+
+def _transport_options(user_input: dict[str, Any]) -> dict[str, Any]:
+    """Get TLS, keepalive and reconnect settings of the form."""
+    return {key: user_input.get(key) for key in TRANSPORT_OPTIONS}
+
+
+def _transport_fields(fields: OrderedDict, current: Mapping[str, Any]) -> None:
+    """Add TLS, keepalive and reconnect fields to the broker form."""
+    fields[vol.Optional(CONF_TLS, default=current.get(CONF_TLS) or False)] = bool
+    for key in (CONF_CA_CERT, CONF_CLIENT_CERT, CONF_CLIENT_KEY):
+        fields[
+            vol.Optional(key, description={"suggested_value": current.get(key)})
+        ] = str
+    fields[
+        vol.Optional(CONF_VERIFY_SSL, default=current.get(CONF_VERIFY_SSL) is not False)
+    ] = bool
+    fields[
+        vol.Optional(
+            CONF_KEEPALIVE, default=current.get(CONF_KEEPALIVE) or DEFAULT_KEEPALIVE
+        )
+    ] = vol.All(vol.Coerce(int), vol.Range(min=5, max=3600))
+    fields[
+        vol.Optional(
+            CONF_RECONNECT_MIN,
+            default=current.get(CONF_RECONNECT_MIN) or DEFAULT_RECONNECT_MIN,
+        )
+    ] = vol.All(vol.Coerce(int), vol.Range(min=1))
+    fields[
+        vol.Optional(
+            CONF_RECONNECT_MAX,
+            default=current.get(CONF_RECONNECT_MAX) or DEFAULT_RECONNECT_MAX,
+        )
+    ] = vol.All(vol.Coerce(int), vol.Range(min=1))
+
 
-def try_connection(hass, host, port, username, password, transfer="tcp"):
+def try_connection(
+    hass, host, port, username, password, transfer="tcp", transport=None
+):
     """Test if we can connect to an MQTT broker."""
     entry_config = {
         CONF_HOST: host,
@@ -243,8 +473,13 @@ def try_connection(hass, host, port, username, password, transfer="tcp"):
         CONF_USERNAME: username,
         CONF_PASSWORD: password,
         MQTT_TRANSPORT: transfer,
+        **_transport_options(transport or {}),
     }
     client = InelsMqtt(entry_config)
+    try:
+        configure_client(client, entry_config, build_tls_context(entry_config))
+    except (OSError, ValueError):
+        return False
     ret = client.test_connection()
     client.disconnect()
 
@@ -1,5 +1,6 @@
 """Constants for the iNels integration."""
 import logging
+from typing import NamedTuple
 
 from homeassistant.const import Platform
 
@@ -7,15 +8,74 @@ DOMAIN = "inels"
 
 BROKER_CONFIG = "inels_mqtt_broker_config"
 BROKER = "inels_mqtt_broker"
+ENTRY_OPTIONS = "entry_options"
+RECONFIGURE_LOCK = "reconfigure_lock"
+TLS_CONTEXT = "tls_context"
 DEVICES = "devices"
+DEVICE_INFO = "device_info"
+DEVICE_HUBS = "device_hubs"
+INBOUND_QUEUE = "inbound_queue"
+AVAILABILITY = "availability"
+TOPOLOGY = "topology"
+METRICS = "metrics"
+DEVICE_VALUES = "device_values"
+SENSOR_THROTTLE = "sensor_throttle"
+SENSOR_HISTORY = "sensor_history"
+BUS_HEALTH = "bus_health"
+DELIVERY = "delivery"
+SCHEDULER = "scheduler"
+COMMAND_TRACKER = "command_tracker"
+SCENES = "scenes"
+
+SIGNAL_SCENE_ADDED = "inels_scene_added_{}"
+SIGNAL_SCENE_REMOVED = "inels_scene_removed_{}"
+SIGNAL_DEVICES_CHANGED = "inels_devices_changed_{}"
 
 CONF_DISCOVERY_PREFIX = "discovery_prefix"
 
+CONF_TLS = "tls"
+CONF_CA_CERT = "ca_cert"
+CONF_CLIENT_CERT = "client_cert"
+CONF_CLIENT_KEY = "client_key"
+CONF_KEEPALIVE = "keepalive"
+CONF_RECONNECT_MIN = "reconnect_min"
+CONF_RECONNECT_MAX = "reconnect_max"
+CONF_DECODE_WORKER = "decode_worker"
+
+CONF_SENSOR = "sensor"
+CONF_SENSOR_THROTTLE = "sensor_throttle"
+CONF_DEADBAND = "deadband"
+CONF_DEADBAND_RELATIVE = "deadband_relative"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_HEARTBEAT = "heartbeat"
+
+CONF_COVER = "cover"
+CONF_COVER_TRAVEL = "cover_travel"
+CONF_TRAVEL_UP = "travel_up"
+CONF_TRAVEL_DOWN = "travel_down"
+
+CONF_GROUPS = "groups"
+CONF_GROUP_NAME = "group_name"
+CONF_MEMBERS = "members"
+
 TITLE = "iNELS"
 DESCRIPTION = ""
 INELS_VERSION = 1
 LOGGER = logging.getLogger(__package__)
 
+
+class InelsLightChannelDescription(NamedTuple):
+    """Inels light channel description."""
+
+    channel_number: int
+    channel_index: int
+
+
+DA3_22M_CHANNELS: "tuple[InelsLightChannelDescription, ...]" = (
+    InelsLightChannelDescription(2, 0),
+    InelsLightChannelDescription(2, 1),
+)
+
 DEFAULT_MIN_TEMP = 10.0  # °C
 DEFAULT_MAX_TEMP = 50.0  # °C
 
@@ -29,6 +89,11 @@ ICON_BUTTON = "mdi:button-pointer"
 ICON_LIGHT_IN = "mdi:brightness-4"
 ICON_HUMIDITY = "mdi:water-percent"
 ICON_DEW_POINT = "mdi:tailwind"
+ICON_BUS_HEALTH = "mdi:lan-disconnect"
+ICON_METRIC = "mdi:counter"
+ICON_LIGHT_GROUP = "mdi:lightbulb-group"
+
+UNIT_ERRORS_PER_MINUTE = "errors/min"
 
 ICON_WATER_HEATER_DICT = {
     "on": "mdi:valve-open",
@@ -52,5 +117,29 @@ ICONS = {
 
 MANUAL_SETUP = "manual"
 
+SERVICE_SET_SETPOINTS = "set_setpoints"
+SERVICE_SET_MANY = "set_many"
+SERVICE_CREATE_SCENE = "create_scene"
+SERVICE_DELETE_SCENE = "delete_scene"
+SERVICE_PROFILE_START = "profile_start"
+SERVICE_PROFILE_STOP = "profile_stop"
+
+ATTR_SETPOINTS = "setpoints"
+ATTR_PACE = "pace"
+ATTR_TIMEOUT = "timeout"
+ATTR_DURATION = "duration"
+ATTR_INTERVAL = "interval"
+ATTR_TOP = "top"
+ATTR_ITEMS = "items"
+ATTR_VALUE = "value"
+ATTR_WINDOW = "window"
+ATTR_RESULTS = "results"
+
+EVENT_SET_MANY_RESULT = "inels_set_many_result"
+
+PROFILER = "inels_profiler"
+
+ATTR_BUS_ERROR = "bus_error"
+
 BUTTON_PRESS_STATE = "press"
 BUTTON_NO_ACTION_STATE = "no_action"
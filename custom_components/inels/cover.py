@@ -1,19 +1,44 @@
 """Inels cover entity."""
 from __future__ import annotations
 
+from collections.abc import Callable, Mapping
+from datetime import timedelta
+import time
 from typing import Any
 
 from inelsmqtt.const import SHUTTER_STATE_LIST, STOP_DOWN, STOP_UP, Element
 from inelsmqtt.devices import Device
 
-from homeassistant.components.cover import CoverDeviceClass, CoverEntity
+from homeassistant.components.cover import (
+    ATTR_CURRENT_POSITION,
+    ATTR_POSITION,
+    CoverDeviceClass,
+    CoverEntity,
+    CoverEntityFeature,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_CLOSED, STATE_OPEN, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.restore_state import RestoreEntity
 
-from .base_class import InelsBaseEntity
-from .const import DEVICES, DOMAIN, ICON_SHUTTER_CLOSED, ICON_SHUTTER_OPEN
+from .base_class import InelsBaseEntity, device_key
+from .commands import frame_confirm
+from .const import (
+    CONF_COVER_TRAVEL,
+    CONF_TRAVEL_DOWN,
+    CONF_TRAVEL_UP,
+    DEVICES,
+    DOMAIN,
+    ICON_SHUTTER_CLOSED,
+    ICON_SHUTTER_OPEN,
+)
+
+POSITION_UPDATE_INTERVAL = timedelta(seconds=1)
+
+DIRECTION_UP = 1
+DIRECTION_DOWN = -1
 
 
 async def async_setup_entry(
@@ -23,20 +48,102 @@ async def async_setup_entry(
 ) -> None:
     """Load Inels cover from config entry."""
     device_list: "list[Device]" = hass.data[DOMAIN][config_entry.entry_id][DEVICES]
+    travel_options = config_entry.options.get(CONF_COVER_TRAVEL, {})
 
     async_add_entities(
         [
-            InelsCover(device)
+            InelsCover(
+                device,
+                travel=travel_options.get(device_key(device)),
+            )
             for device in device_list
             if device.device_type.value == Platform.COVER
         ],
     )
 
 
-class InelsCover(InelsBaseEntity, CoverEntity):
+class InelsCoverPosition:
+    """Time based position estimation of the cover."""
+
+    __slots__ = (
+        "travel_up",
+        "travel_down",
+        "_position",
+        "_direction",
+        "_start",
+    )
+
+    def __init__(
+        self, travel_up: float, travel_down: float, position: float | None = None
+    ) -> None:
+        """Init position with full travel times in seconds."""
+        self.travel_up = travel_up
+        self.travel_down = travel_down
+        self._position = position
+        self._direction = 0
+        self._start = 0.0
+
+    @property
+    def direction(self) -> int:
+        """Direction of the running movement, 0 when stopped."""
+        return self._direction
+
+    def current(self, now: float) -> int | None:
+        """Estimated position in percent, 100 is fully open."""
+        if self._position is None:
+            return None
+
+        if self._direction == DIRECTION_UP:
+            position = self._position + (now - self._start) / self.travel_up * 100
+        elif self._direction == DIRECTION_DOWN:
+            position = self._position - (now - self._start) / self.travel_down * 100
+        else:
+            position = self._position
+
+        return round(min(max(position, 0.0), 100.0))
+
+    def start(self, direction: int, now: float) -> None:
+        """Start movement. Unknown position starts from the opposite end."""
+        self.stop(now)
+
+        if self._position is None:
+            self._position = 0.0 if direction == DIRECTION_UP else 100.0
+
+        self._direction = direction
+        self._start = now
+
+    def stop(self, now: float, position: float | None = None) -> None:
+        """Stop movement and keep the reached position."""
+        if position is None:
+            position = self.current(now)
+
+        self._position = position
+        self._direction = 0
+
+    def time_to(self, position: int, now: float) -> float:
+        """Return travel time in seconds from current position to the target."""
+        current = self.current(now)
+        if current is None:
+            current = 0 if position > 50 else 100
+
+        travel = self.travel_up if position > current else self.travel_down
+        return abs(position - current) / 100 * travel
+
+    def time_to_end(self, now: float) -> float:
+        """Return travel time in seconds until the running movement reaches the end."""
+        if self._direction == DIRECTION_UP:
+            return self.time_to(100, now)
+        if self._direction == DIRECTION_DOWN:
+            return self.time_to(0, now)
+        return 0.0
+
+
+class InelsCover(InelsBaseEntity, CoverEntity, RestoreEntity):
     """Cover class for Home assistant."""
 
-    def __init__(self, device: Device) -> None:
+    def __init__(
+        self, device: Device, travel: Mapping[str, float] | None = None
+    ) -> None:
         """Initialize a cover."""
         super().__init__(device=device)
 
@@ -45,14 +152,70 @@ class InelsCover(InelsBaseEntity, CoverEntity):
         else:
             self._attr_device_class = CoverDeviceClass.SHUTTER
 
+        self._attr_supported_features = (
+            CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE | CoverEntityFeature.STOP
+        )
+        self._movement_unsubs: list[Callable[[], None]] = []
+        self._pending_target: int | None = None
+
+        self.position: InelsCoverPosition | None = None
+        if travel is not None:
+            self.position = InelsCoverPosition(
+                travel[CONF_TRAVEL_UP], travel[CONF_TRAVEL_DOWN]
+            )
+            self._attr_supported_features |= CoverEntityFeature.SET_POSITION
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the estimated position."""
+        await super().async_added_to_hass()
+
+        if self.position is None:
+            return
+
+        self.async_on_remove(self._async_cancel_movement)
+
+        last_state = await self.async_get_last_state()
+        if last_state is not None:
+            position = last_state.attributes.get(ATTR_CURRENT_POSITION)
+            if position is not None:
+                self.position.stop(time.monotonic(), position)
+
     @property
     def icon(self) -> str | None:
         """Cover icon."""
         return ICON_SHUTTER_CLOSED if self.is_closed is True else ICON_SHUTTER_OPEN
 
+    @property
+    def current_cover_position(self) -> int | None:
+        """Estimated position of the cover."""
+        if self.position is None:
+            return None
+
+        return self.position.current(time.monotonic())
+
+    @property
+    def is_opening(self) -> bool | None:
+        """Cover is opening."""
+        if self.position is None:
+            return None
+
+        return self.position.direction == DIRECTION_UP
+
+    @property
+    def is_closing(self) -> bool | None:
+        """Cover is closing."""
+        if self.position is None:
+            return None
+
+        return self.position.direction == DIRECTION_DOWN
+
     @property
     def is_closed(self) -> bool | None:
         """Cover is closed."""
+        position = self.current_cover_position
+        if position is not None:
+            return position == 0
+
         dev = self._device
         state = dev.state if dev.state in SHUTTER_STATE_LIST else dev.values.ha_value
 
@@ -60,15 +223,126 @@ class InelsCover(InelsBaseEntity, CoverEntity):
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover."""
-        await self.hass.async_add_executor_job(self._device.set_ha_value, STATE_OPEN)
+        await self._async_set_ha_value(STATE_OPEN, frame_confirm)
+        self._async_start_movement(DIRECTION_UP)
 
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Close cover."""
-        await self.hass.async_add_executor_job(self._device.set_ha_value, STATE_CLOSED)
+        await self._async_set_ha_value(STATE_CLOSED, frame_confirm)
+        self._async_start_movement(DIRECTION_DOWN)
 
     async def async_stop_cover(self, **kwargs: Any) -> None:
         """Stop cover."""
-        await self.hass.async_add_executor_job(
-            self._device.set_ha_value,
-            STOP_UP if self.is_closed is False else STOP_DOWN,
+        if self.position is not None and self.position.direction:
+            stop = STOP_UP if self.position.direction == DIRECTION_UP else STOP_DOWN
+        else:
+            stop = STOP_UP if self.is_closed is False else STOP_DOWN
+
+        await self._async_set_ha_value(stop, frame_confirm)
+        self._async_stop_movement()
+
+    async def async_set_cover_position(self, **kwargs: Any) -> None:
+        """Move the cover and stop it after the estimated travel time."""
+        if self.position is None:
+            return
+
+        target: int = kwargs[ATTR_POSITION]
+
+        if target == 100:
+            await self.async_open_cover()
+            return
+        if target == 0:
+            await self.async_close_cover()
+            return
+
+        now = time.monotonic()
+        current = self.position.current(now)
+        if current == target:
+            return
+
+        if current is None:
+            # unknown start, reach the end nearer to the target first
+            if target > 50:
+                await self.async_open_cover()
+            else:
+                await self.async_close_cover()
+            self._pending_target = target
+            return
+
+        travel_time = self.position.time_to(target, now)
+        if target > current:
+            await self.async_open_cover()
+        else:
+            await self.async_close_cover()
+
+        self._movement_unsubs.append(
+            async_call_later(self.hass, travel_time, self._timed_stop(target))
         )
+
+    def _timed_stop(self, target: int) -> Callable[[Any], Any]:
+        """Create timed stop of the cover at the target position."""
+
+        async def _async_timed_stop(now: Any) -> None:
+            stop = STOP_UP if self.position.direction == DIRECTION_UP else STOP_DOWN
+            self._async_stop_movement(target)
+            await self._async_set_ha_value(stop, frame_confirm)
+
+        return _async_timed_stop
+
+    @callback
+    def _async_start_movement(self, direction: int) -> None:
+        """Start the position timeline of the movement."""
+        if self.position is None:
+            return
+
+        self._async_cancel_movement()
+
+        now = time.monotonic()
+        self.position.start(direction, now)
+
+        self._movement_unsubs.append(
+            async_track_time_interval(
+                self.hass, self._async_movement_tick, POSITION_UPDATE_INTERVAL
+            )
+        )
+        self._movement_unsubs.append(
+            async_call_later(
+                self.hass,
+                self.position.time_to_end(now),
+                self._async_movement_end,
+            )
+        )
+        self.async_write_ha_state()
+
+    @callback
+    def _async_stop_movement(self, position: int | None = None) -> None:
+        """Stop the position timeline of the movement."""
+        if self.position is None:
+            return
+
+        self._async_cancel_movement()
+        self.position.stop(time.monotonic(), position)
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_movement(self) -> None:
+        """Cancel timers of the running movement."""
+        self._pending_target = None
+        while self._movement_unsubs:
+            self._movement_unsubs.pop()()
+
+    @callback
+    def _async_movement_tick(self, now: Any) -> None:
+        """Write the estimated position while the cover moves."""
+        self.async_write_ha_state()
+
+    @callback
+    def _async_movement_end(self, now: Any) -> None:
+        """Cover reached the end of the travel, continue to the pending target."""
+        target = self._pending_target
+        self._async_stop_movement()
+
+        if target is not None:
+            self.hass.async_create_task(
+                self.async_set_cover_position(**{ATTR_POSITION: target})
+            )
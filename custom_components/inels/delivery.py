@@ -0,0 +1,263 @@
+"""Delivery tracking of the commands set by the entities."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from copy import deepcopy
+from functools import partial
+import time
+from typing import Any
+
+from inelsmqtt.devices import Device
+
+from homeassistant.core import HomeAssistant, callback
+
+from .base_class import device_key
+from .commands import InelsCommand, InelsCommandTracker, value_confirm
+from .const import LOGGER
+from .hub import InelsDeviceState
+from .scheduler import PRIORITY_AUTOMATION, InelsOutboundScheduler
+
+CONFIRM_TIMEOUT = 5.0  # s
+RETRY_BACKOFF = 1.0  # s
+MAX_RETRIES = 2
+
+COUNTERS = ("sent", "published", "confirmed", "retried", "overridden", "failed")
+
+
+class InelsDeliveryStats:
+    """Delivery counters of one device or inels type."""
+
+    __slots__ = ("counts", "publish_time", "confirm_time")
+
+    def __init__(self) -> None:
+        """Init empty counters."""
+        self.counts: "Counter[str]" = Counter()
+        self.publish_time = 0.0
+        self.confirm_time = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return counters with average publish and confirmation time in ms."""
+        published = self.counts["published"]
+        confirmed = self.counts["confirmed"]
+        return {
+            **{name: self.counts[name] for name in COUNTERS},
+            "publish_ms": round(self.publish_time / published * 1000, 1)
+            if published
+            else None,
+            "confirm_ms": round(self.confirm_time / confirmed * 1000, 1)
+            if confirmed
+            else None,
+        }
+
+
+class InelsDelivery:
+    """Publish ha values, wait for the status frame and retry unconfirmed ones."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        tracker: InelsCommandTracker,
+        scheduler: InelsOutboundScheduler,
+    ) -> None:
+        """Init delivery tracking."""
+        self.hass = hass
+        self._tracker = tracker
+        self._scheduler = scheduler
+        self._retries: dict[str, asyncio.Task] = {}
+        self._sending: set[asyncio.Task] = set()
+        self.devices: dict[str, InelsDeliveryStats] = {}
+        self.types: dict[str, InelsDeliveryStats] = {}
+
+    def _stats(self, device: Device) -> tuple[InelsDeliveryStats, ...]:
+        """Return counters of the device and of its inels type."""
+        key = device_key(device)
+        if key not in self.devices:
+            self.devices[key] = InelsDeliveryStats()
+
+        inels_type = str(device.inels_type.value)
+        if inels_type not in self.types:
+            self.types[inels_type] = InelsDeliveryStats()
+
+        return self.devices[key], self.types[inels_type]
+
+    def _count(self, device: Device, name: str, elapsed: float | None = None) -> None:
+        """Increment counter of the device and of its inels type."""
+        for stats in self._stats(device):
+            stats.counts[name] += 1
+            if name == "published" and elapsed is not None:
+                stats.publish_time += elapsed
+            elif name == "confirmed" and elapsed is not None:
+                stats.confirm_time += elapsed
+
+    async def _async_publish(
+        self, device: Device, publish: Callable[[], Any], priority: int
+    ) -> bool:
+        """Publish through the scheduler and count the publish time."""
+        start = time.monotonic()
+        try:
+            await self._scheduler.async_submit(device, publish, priority)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning("Publish to %s failed: %s", device.set_topic, exc)
+            return False
+
+        self._count(device, "published", time.monotonic() - start)
+        return True
+
+    async def async_set_ha_value(
+        self,
+        device: Device,
+        ha_value: Any,
+        priority: int = PRIORITY_AUTOMATION,
+        confirm: Callable[[InelsDeviceState], bool] | None = None,
+    ) -> None:
+        """Publish the ha value, confirmation and retries run in the background.
+
+        The status frame confirms the command when it shows the requested ha value,
+        or when it passes the confirm predicate if given.
+        """
+        command = InelsCommand(
+            device,
+            device.set_topic,
+            deepcopy(ha_value),
+            confirm or value_confirm(ha_value),
+        )
+        await self._async_deliver(
+            command, partial(device.set_ha_value, ha_value), priority
+        )
+
+    async def async_send_commands(
+        self, commands: list[InelsCommand], priority: int = PRIORITY_AUTOMATION
+    ) -> None:
+        """Publish encoded frames, confirmation and retries run in the background."""
+        await asyncio.gather(
+            *(
+                self._async_deliver(
+                    command,
+                    partial(
+                        command.device.mqtt.publish, command.topic, command.payload
+                    ),
+                    priority,
+                )
+                for command in commands
+            )
+        )
+
+    async def _async_deliver(
+        self, command: InelsCommand, publish: Callable[[], Any], priority: int
+    ) -> None:
+        """Publish the command and start waiting for its confirmation."""
+        device = command.device
+        key = device_key(device)
+        if (task := self._retries.pop(key, None)) is not None:
+            task.cancel()
+
+        self._count(device, "sent")
+        future = self._tracker.async_expect(command)
+        start = time.monotonic()
+
+        sending = asyncio.current_task()
+        if sending is not None:
+            self._sending.add(sending)
+        try:
+            published = await self._async_publish(device, publish, priority)
+        finally:
+            self._sending.discard(sending)
+
+        if not published:
+            future.cancel()
+            self._tracker.async_release([command])
+            self._count(device, "failed")
+            return
+
+        task = self.hass.async_create_task(
+            self._async_confirm(command, publish, future, start, priority)
+        )
+        self._retries[key] = task
+        task.add_done_callback(lambda _: self._async_task_done(key, task))
+
+    @callback
+    def _async_task_done(self, key: str, task: asyncio.Task) -> None:
+        """Forget finished delivery of the device."""
+        if self._retries.get(key) is task:
+            self._retries.pop(key)
+
+    async def _async_confirm(
+        self,
+        command: InelsCommand,
+        publish: Callable[[], Any],
+        future: asyncio.Future,
+        start: float,
+        priority: int,
+    ) -> None:
+        """Wait for the status frame, republish with backoff when it does not come.
+
+        A newer status frame showing another value, e.g. after a change at the
+        wall, ends the delivery instead of republishing the stale value.
+        """
+        device = command.device
+        key = device_key(device)
+        published = time.monotonic()
+
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                if attempt:
+                    await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+                    self._count(device, "retried")
+                    future = self._tracker.async_expect(command)
+                    if not await self._async_publish(device, publish, priority):
+                        future.cancel()
+                        continue
+                    published = time.monotonic()
+
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), CONFIRM_TIMEOUT)
+                except asyncio.TimeoutError:
+                    future.cancel()
+                    if self._tracker.last_frame(key) > published:
+                        self._count(device, "overridden")
+                        LOGGER.debug("Command to %s overridden by the device", key)
+                        return
+                    continue
+
+                self._count(device, "confirmed", time.monotonic() - start)
+                return
+
+            self._count(device, "failed")
+            LOGGER.warning(
+                "Command to %s not confirmed after %d retries",
+                device_key(device),
+                MAX_RETRIES,
+            )
+        finally:
+            if not future.done():
+                future.cancel()
+            self._tracker.async_release([command])
+
+    @property
+    def pending(self) -> int:
+        """Return number of commands waiting for publish or confirmation."""
+        return len(self._sending) + len(self._retries)
+
+    async def async_flush(self) -> None:
+        """Wait for queued and pending deliveries to be confirmed or to fail."""
+        while self._sending or self._retries:
+            await asyncio.wait([*self._sending, *self._retries.values()])
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel pending retries."""
+        for task in self._retries.values():
+            task.cancel()
+        self._retries.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return delivery counters by device and inels type."""
+        return {
+            "pending": self.pending,
+            "devices": {key: stats.as_dict() for key, stats in self.devices.items()},
+            "inels_types": {
+                name: stats.as_dict() for name, stats in self.types.items()
+            },
+        }
@@ -0,0 +1,61 @@
+"""Diagnostics support for iNELS."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_CLIENT_KEY,
+    AVAILABILITY,
+    BUS_HEALTH,
+    DELIVERY,
+    DOMAIN,
+    INBOUND_QUEUE,
+    SCENES,
+    SCHEDULER,
+    SENSOR_HISTORY,
+    SENSOR_THROTTLE,
+    TLS_CONTEXT,
+    TOPOLOGY,
+)
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, CONF_CLIENT_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    inels_data = hass.data[DOMAIN][entry.entry_id]
+    health = inels_data.get(BUS_HEALTH)
+    delivery = inels_data.get(DELIVERY)
+    scheduler = inels_data.get(SCHEDULER)
+    queue = inels_data.get(INBOUND_QUEUE)
+    availability = inels_data.get(AVAILABILITY)
+    topology = inels_data.get(TOPOLOGY)
+    tls_context = inels_data.get(TLS_CONTEXT)
+    history = inels_data.get(SENSOR_HISTORY)
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        SENSOR_THROTTLE: {
+            unique_id: throttle.as_dict()
+            for unique_id, throttle in inels_data.get(SENSOR_THROTTLE, {}).items()
+        },
+        BUS_HEALTH: health.as_dict() if health is not None else None,
+        DELIVERY: delivery.as_dict() if delivery is not None else None,
+        SCHEDULER: scheduler.as_dict() if scheduler is not None else None,
+        INBOUND_QUEUE: queue.as_dict() if queue is not None else None,
+        AVAILABILITY: availability.as_dict() if availability is not None else None,
+        TOPOLOGY: topology.as_dict() if topology is not None else None,
+        TLS_CONTEXT: tls_context.as_dict() if tls_context is not None else None,
+        SCENES: inels_data[SCENES].as_dict() if SCENES in inels_data else None,
+        SENSOR_HISTORY: history.as_dict() if history is not None else None,
+    }
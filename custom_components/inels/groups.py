@@ -0,0 +1,218 @@
+"""Groups of iNELS outputs switched with one batch of frames."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from copy import deepcopy
+from functools import partial
+from typing import Any
+
+from inelsmqtt.devices import Device
+
+from homeassistant.const import CONF_NAME, Platform
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+
+from .base_class import device_key
+from .commands import InelsCommand, encode_command, value_confirm
+from .const import CONF_GROUPS, CONF_MEMBERS, DEVICES, LOGGER
+from .delivery import InelsDelivery
+from .hub import InelsDeviceHub, InelsDeviceState, current_state
+from .scheduler import context_priority
+
+
+class InelsGroupMember:
+    """Output of a device in the group, channel of the multi channel ones."""
+
+    __slots__ = ("unique_id", "device", "channel")
+
+    def __init__(self, unique_id: str, device: Device, channel: int | None) -> None:
+        """Init member."""
+        self.unique_id = unique_id
+        self.device = device
+        self.channel = channel
+
+    @property
+    def dimmable(self) -> bool:
+        """Return true when the output has a brightness."""
+        return self.channel is not None or self.device.device_type == Platform.LIGHT
+
+    def level(self, device: InelsDeviceState) -> int:
+        """Read level of the output in 0..100."""
+        if self.channel is not None:
+            return int(device.state.out[self.channel])
+        if device.device_type == Platform.LIGHT:
+            return int(device.state)
+        return 100 if device.state.on else 0
+
+
+def _read_levels(
+    members: list[InelsGroupMember], device: InelsDeviceState
+) -> dict[str, int]:
+    """Read levels of the group members of the device."""
+    levels: dict[str, int] = {}
+
+    for member in members:
+        try:
+            levels[member.unique_id] = member.level(device)
+        except (AttributeError, IndexError, TypeError) as exc:
+            LOGGER.debug("No level of group member %s: %s", member.unique_id, exc)
+
+    return levels
+
+
+class InelsGroup:
+    """Members of the group by device with the cached aggregate state."""
+
+    def __init__(
+        self, group_id: str, name: str, members: list[InelsGroupMember]
+    ) -> None:
+        """Init group."""
+        self.group_id = group_id
+        self.name = name
+        self.devices: dict[str, list[InelsGroupMember]] = {}
+        for member in members:
+            self.devices.setdefault(device_key(member.device), []).append(member)
+
+        self.dimmable = any(member.dimmable for member in members)
+        self.levels: dict[str, int] = {}
+        self.on = 0
+        self.total = 0
+
+    @classmethod
+    def from_options(
+        cls, group_id: str, options: Mapping[str, Any], devices: dict[str, Device]
+    ) -> InelsGroup:
+        """Create group resolving the member unique ids to the devices."""
+        members: list[InelsGroupMember] = []
+
+        for unique_id in options[CONF_MEMBERS]:
+            if unique_id in devices:
+                members.append(InelsGroupMember(unique_id, devices[unique_id], None))
+                continue
+
+            # channels of multi channel devices have their index appended
+            key, _, suffix = unique_id.rpartition("-")
+            if suffix.isdigit() and key in devices:
+                members.append(InelsGroupMember(unique_id, devices[key], int(suffix)))
+            else:
+                LOGGER.warning("Group %s member %s not found", group_id, unique_id)
+
+        return cls(group_id, options[CONF_NAME], members)
+
+    @property
+    def is_on(self) -> bool:
+        """Return true when any member is on."""
+        return self.on > 0
+
+    @property
+    def level(self) -> int:
+        """Return average level of the members which are on."""
+        return round(self.total / self.on) if self.on else 0
+
+    @callback
+    def async_update(self, levels: dict[str, int]) -> None:
+        """Update the aggregate with the changed levels of a device."""
+        for unique_id, level in levels.items():
+            old = self.levels.get(unique_id, 0)
+            self.levels[unique_id] = level
+            self.on += (level > 0) - (old > 0)
+            self.total += level - old
+
+    def commands(self, level: int) -> list[InelsCommand]:
+        """Encode one frame per device setting all its members to the level."""
+        commands: list[InelsCommand] = []
+
+        for members in self.devices.values():
+            device = members[0].device
+
+            if members[0].channel is not None:
+                ha_value = deepcopy(device.values.ha_value)
+                for member in members:
+                    ha_value.out[member.channel] = level
+            elif device.device_type == Platform.LIGHT:
+                ha_value = level
+            else:
+                ha_value = level > 0
+
+            commands.append(encode_command(device, ha_value, value_confirm(ha_value)))
+
+        return commands
+
+
+def _set_device(members: list[InelsGroupMember], device: Device) -> None:
+    """Point the members to the device of the new broker connection."""
+    for member in members:
+        member.device = device
+
+
+def entry_groups(
+    inels_data: dict[str, Any], options: Mapping[str, Any]
+) -> list[InelsGroup]:
+    """Create the groups of the config entry options having members."""
+    devices = {device_key(device): device for device in inels_data[DEVICES]}
+    groups = [
+        InelsGroup.from_options(group_id, group, devices)
+        for group_id, group in options.get(CONF_GROUPS, {}).items()
+    ]
+    return [group for group in groups if group.devices]
+
+
+class InelsGroupEntity(Entity):
+    """Group entity publishing the member frames as one batch."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        entry_id: str,
+        group: InelsGroup,
+        hubs: dict[str, InelsDeviceHub],
+        delivery: InelsDelivery,
+    ) -> None:
+        """Init group entity."""
+        self._group = group
+        self._hubs = hubs
+        self._delivery = delivery
+
+        self._attr_unique_id = f"{entry_id}-group-{group.group_id}"
+        self._attr_name = group.name
+        self._attr_extra_state_attributes = {
+            "members": [
+                member.unique_id
+                for members in group.devices.values()
+                for member in members
+            ]
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Listen to the devices of the members and seed the aggregate."""
+        for key, members in self._group.devices.items():
+            decoder: Callable[[InelsDeviceState], Any] = partial(_read_levels, members)
+            self.async_on_remove(
+                self._hubs[key].async_add_listener(self._async_levels, decoder)
+            )
+            self.async_on_remove(
+                self._hubs[key].async_add_device_listener(partial(_set_device, members))
+            )
+            self._group.async_update(decoder(current_state(members[0].device)))
+
+    @callback
+    def _async_levels(self, levels: dict[str, int]) -> None:
+        """Update the aggregate and write the state."""
+        self._group.async_update(levels)
+        self.async_write_ha_state()
+
+    async def _async_set_level(self, level: int) -> None:
+        """Publish the frames of all members, delivery tracks the confirmations."""
+        await self._delivery.async_send_commands(
+            self._group.commands(level), context_priority(self._context)
+        )
+
+    @property
+    def is_on(self) -> bool:
+        """Return true when any member is on."""
+        return self._group.is_on
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Turn all members off."""
+        await self._async_set_level(0)
@@ -0,0 +1,87 @@
+"""Bus health monitor aggregating iNELS bus errors."""
+from __future__ import annotations
+
+from collections import Counter, defaultdict, deque
+import threading
+import time
+from typing import Any
+
+HEALTH_WINDOWS: "tuple[int, ...]" = (300, 3600)  # seconds
+HEALTH_MAX_EVENTS = 100000
+HEALTH_TOP = 10
+
+
+class InelsBusHealth:
+    """Rolling bus error counts per device and per parent gateway."""
+
+    def __init__(self, windows: "tuple[int, ...]" = HEALTH_WINDOWS) -> None:
+        """Init health monitor."""
+        self.windows = windows
+        self._lock = threading.Lock()
+        self._events: "deque[tuple[float, str, str, str]]" = deque(
+            maxlen=HEALTH_MAX_EVENTS
+        )
+        self._codes: "Counter[str]" = Counter()
+        self._devices: "defaultdict[str, Counter[str]]" = defaultdict(Counter)
+        self._parents: "defaultdict[str, Counter[str]]" = defaultdict(Counter)
+
+    @property
+    def total(self) -> int:
+        """Return count of all recorded errors."""
+        return sum(self._codes.values())
+
+    def record(
+        self, device_id: str, parent_id: str, error: str, now: float | None = None
+    ) -> None:
+        """Record a bus error reported by a device. Safe to call from any thread."""
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            self._events.append((now, device_id, parent_id, error))
+            self._codes[error] += 1
+            self._devices[device_id][error] += 1
+            self._parents[parent_id][error] += 1
+
+    def _window(self, window: int, now: float) -> "list[tuple[float, str, str, str]]":
+        """Return events recorded in the sliding window."""
+        limit = now - window
+        max_window = max(self.windows)
+
+        with self._lock:
+            while self._events and self._events[0][0] < now - max_window:
+                self._events.popleft()
+            return [event for event in self._events if event[0] >= limit]
+
+    def rate(self, window: int, now: float | None = None) -> float:
+        """Return error rate per minute in the sliding window."""
+        now = time.monotonic() if now is None else now
+        return round(len(self._window(window, now)) * 60 / window, 2)
+
+    def window_summary(
+        self, window: int, now: float | None = None
+    ) -> "dict[str, dict[str, int]]":
+        """Return error counts per parent and the worst devices in the window."""
+        now = time.monotonic() if now is None else now
+        events = self._window(window, now)
+
+        parents = Counter(parent_id for _, _, parent_id, _ in events)
+        devices = Counter(device_id for _, device_id, _, _ in events)
+
+        return {
+            "parents": dict(parents.most_common(HEALTH_TOP)),
+            "devices": dict(devices.most_common(HEALTH_TOP)),
+        }
+
+    def devices_in_error(self, window: int, now: float | None = None) -> int:
+        """Return number of devices reporting errors in the window."""
+        now = time.monotonic() if now is None else now
+        return len({device_id for _, device_id, _, _ in self._window(window, now)})
+
+    def as_dict(self) -> "dict[str, Any]":
+        """Return cumulative counts per error, device and parent."""
+        with self._lock:
+            return {
+                "errors": dict(self._codes),
+                "devices": {key: dict(val) for key, val in self._devices.items()},
+                "parents": {key: dict(val) for key, val in self._parents.items()},
+            }
@@ -0,0 +1,70 @@
+"""Recent values of the sensors kept in fixed size ring buffers."""
+from __future__ import annotations
+
+from array import array
+import math
+import time
+from typing import Any
+
+HISTORY_SIZE = 256
+
+
+class InelsSensorHistory:
+    """Last decoded values of a sensor in two preallocated arrays."""
+
+    __slots__ = ("stamps", "values", "index", "count")
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        """Init empty ring buffer of the size."""
+        self.stamps = array("d", bytes(8 * size))
+        self.values = array("d", bytes(8 * size))
+        self.index = 0
+        self.count = 0
+
+    def append(self, value: Any, stamp: float | None = None) -> None:
+        """Store the value, overwriting the oldest one when full."""
+        try:
+            number = math.nan if value is None else float(value)
+        except (TypeError, ValueError):
+            number = math.nan
+
+        self.stamps[self.index] = time.time() if stamp is None else stamp
+        self.values[self.index] = number
+        self.index = (self.index + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def as_list(self, limit: int | None = None) -> list[tuple[float, float | None]]:
+        """Return timestamps and values, oldest first, unknown values as None."""
+        size = len(self.values)
+        count = self.count if limit is None else min(limit, self.count)
+        start = (self.index - count) % size
+
+        items: list[tuple[float, float | None]] = []
+        for offset in range(count):
+            position = (start + offset) % size
+            value = self.values[position]
+            items.append((self.stamps[position], None if math.isnan(value) else value))
+
+        return items
+
+
+class InelsHistory:
+    """Ring buffers of the sensors of a config entry keyed by unique id."""
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        """Init history."""
+        self.size = size
+        self.sensors: dict[str, InelsSensorHistory] = {}
+
+    def sensor(self, unique_id: str) -> InelsSensorHistory:
+        """Return ring buffer of the sensor, created on first use."""
+        if unique_id not in self.sensors:
+            self.sensors[unique_id] = InelsSensorHistory(self.size)
+        return self.sensors[unique_id]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return values of all sensors."""
+        return {
+            unique_id: history.as_list()
+            for unique_id, history in self.sensors.items()
+        }
@@ -0,0 +1,344 @@
+"""Device level hub fanning status frames out to the entities."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from collections.abc import Callable
+import threading
+from typing import Any, Optional
+
+from inelsmqtt.devices import Device
+import inelsmqtt.util as InelsUtil
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .base_class import device_key
+from .const import LOGGER
+from .scheduler import PRIORITY_BACKGROUND, InelsOutboundScheduler
+
+INBOUND_MAX_FRAMES = 1024
+DECODE_CADENCE = 0.1  # s
+
+
+class InelsDeviceState:
+    """Status of the device decoded once from a frame, shared by its listeners.
+
+    Other attributes are read from the device, its current state never is, so
+    the decode worker does not race the broker thread updating it.
+    """
+
+    __slots__ = ("device", "values", "_fields")
+
+    def __init__(self, device: Device, values: InelsUtil.DeviceValue) -> None:
+        """Init state of the device."""
+        self.device = device
+        self.values = values
+        self._fields: tuple[str, ...] | None = None
+
+    @property
+    def state(self) -> Any:
+        """Return ha value decoded from the frame."""
+        return self.values.ha_value
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Return lines of the status frame, split once for all its readers."""
+        if self._fields is None:
+            self._fields = tuple(self.values.inels_value.split("\n")[:-1])
+        return self._fields
+
+    def __getattr__(self, name: str) -> Any:
+        """Read the attributes not changing with the frames from the device."""
+        return getattr(self.device, name)
+
+
+def decode_frame(device: Device, new_value: Any) -> InelsDeviceState:
+    """Decode the status frame of the device without touching the device."""
+    return InelsDeviceState(
+        device,
+        InelsUtil.DeviceValue(
+            device.device_type,
+            device.inels_type,
+            inels_value=new_value.decode() if new_value is not None else None,
+        ),
+    )
+
+
+def current_state(device: Device) -> InelsDeviceState:
+    """Return the last decoded status of the device. Called on the event loop."""
+    if device.values is None:
+        device.get_value()
+    return InelsDeviceState(device, device.values)
+
+
+# decoder runs on the decode worker when enabled, its result goes to the listener
+Decoder = Callable[[InelsDeviceState], Any]
+Listener = tuple[Callable[[Any], None], Optional[Decoder]]
+
+
+async def async_refresh_hubs(
+    scheduler: InelsOutboundScheduler, hubs: list[InelsDeviceHub]
+) -> None:
+    """Re-read status of the devices in the background class, push it to entities."""
+    values = await asyncio.gather(
+        *(
+            scheduler.async_submit(
+                hub.device, hub.device.get_value, PRIORITY_BACKGROUND
+            )
+            for hub in hubs
+        ),
+        return_exceptions=True,
+    )
+
+    for hub, new_value in zip(hubs, values):
+        if isinstance(new_value, BaseException):
+            LOGGER.debug("Refresh of %s failed: %s", hub.key, new_value)
+            continue
+        hub.async_deliver(hub.decode_state(InelsDeviceState(hub.device, new_value)))
+
+
+class InelsInboundQueue:
+    """Bounded queue of status frames between the broker thread and the loop."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        seen: Callable[[str], None],
+        max_frames: int = INBOUND_MAX_FRAMES,
+        decode_worker: bool = False,
+    ) -> None:
+        """Init queue, seen is called on the loop with key of every framed device.
+
+        With the decode worker, frames are decoded in a thread and delivered
+        to the loop in batches every DECODE_CADENCE.
+        """
+        self.hass = hass
+        self._seen = seen
+        self.max_frames = max_frames
+        self.high_water = 0
+        self.merged = 0
+        self.dropped: "Counter[str]" = Counter()
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._frames: "deque[tuple[InelsDeviceHub, Any]]" = deque()
+        self._scheduled = False
+        self._stop = threading.Event()
+        self._worker: threading.Thread | None = None
+
+        if decode_worker:
+            self._worker = threading.Thread(
+                target=self._decode_loop, name="inels_decode", daemon=True
+            )
+            self._worker.start()
+
+    def stop(self) -> None:
+        """Stop the decode worker."""
+        self._stop.set()
+
+    def put(self, hub: InelsDeviceHub, new_value: Any) -> None:
+        """Queue the frame from the broker thread, drain in one loop hop."""
+        with self._lock:
+            if len(self._frames) >= self.max_frames:
+                self._merge()
+
+            self._frames.append((hub, new_value))
+            self.high_water = max(self.high_water, len(self._frames))
+
+            if self._scheduled or self._worker is not None:
+                return
+            self._scheduled = True
+
+        self.hass.loop.call_soon_threadsafe(self._async_drain)
+
+    def _decode_loop(self) -> None:
+        """Decode queued frames off the loop and hand them over in batches."""
+        while not self._stop.wait(DECODE_CADENCE):
+            with self._lock:
+                frames = self._frames
+                self._frames = deque()
+
+            if not frames:
+                continue
+
+            batch = [(hub, hub.decode(new_value)) for hub, new_value in frames]
+            self.batches += 1
+            self.hass.loop.call_soon_threadsafe(self._async_deliver, batch)
+
+    @callback
+    def _async_deliver(
+        self, batch: list[tuple[InelsDeviceHub, list[tuple[Listener, Any]]]]
+    ) -> None:
+        """Deliver the decoded batch."""
+        for hub, decoded in batch:
+            self._seen(hub.key)
+            hub.async_deliver(decoded)
+
+    def _merge(self) -> None:
+        """Keep only the newest frame per topic. Called with the lock held."""
+        newest: dict[str, tuple[InelsDeviceHub, Any]] = {}
+
+        for hub, new_value in self._frames:
+            topic = hub.device.state_topic
+            if topic in newest:
+                self.dropped[topic] += 1
+            newest.pop(topic, None)
+            newest[topic] = (hub, new_value)
+
+        self._frames = deque(newest.values())
+        self.merged += 1
+
+        # more topics than the queue holds, drop the oldest ones
+        while len(self._frames) >= self.max_frames:
+            hub, _ = self._frames.popleft()
+            self.dropped[hub.device.state_topic] += 1
+
+    @callback
+    def _async_drain(self) -> None:
+        """Dispatch all queued frames."""
+        with self._lock:
+            frames = self._frames
+            self._frames = deque()
+            self._scheduled = False
+
+        for hub, new_value in frames:
+            self._seen(hub.key)
+            hub.async_dispatch(new_value)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return queue size, high-water mark and dropped frames per topic."""
+        with self._lock:
+            return {
+                "queued": len(self._frames),
+                "max_frames": self.max_frames,
+                "high_water": self.high_water,
+                "merged": self.merged,
+                "dropped": sum(self.dropped.values()),
+                "dropped_topics": dict(self.dropped.most_common(10)),
+                "decode_worker": self._worker is not None,
+                "batches": self.batches,
+            }
+
+
+class InelsDeviceHub:
+    """Single broker listener of a physical device."""
+
+    __slots__ = (
+        "device",
+        "key",
+        "_queue",
+        "_listeners",
+        "_device_listeners",
+        "_subscribed",
+    )
+
+    def __init__(self, device: Device, queue: InelsInboundQueue) -> None:
+        """Init hub of the device."""
+        self.device = device
+        self.key = device_key(device)
+        self._queue = queue
+        self._listeners: list[Listener] = []
+        self._device_listeners: list[Callable[[Device], None]] = []
+        self._subscribed = False
+
+    @callback
+    def async_add_listener(
+        self, update_callback: Callable[[Any], None], decoder: Decoder | None = None
+    ) -> CALLBACK_TYPE:
+        """Add entity listener. Listeners are called on the event loop.
+
+        Listener gets the decoded device state, or the result of its decoder run
+        on it.
+        """
+        self.async_subscribe()
+        listener: Listener = (update_callback, decoder)
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def async_add_device_listener(
+        self, update_callback: Callable[[Device], None]
+    ) -> CALLBACK_TYPE:
+        """Add listener of the device created again on a new broker connection."""
+        self._device_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._device_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @property
+    def subscribed(self) -> bool:
+        """Return True when the hub listens to the device."""
+        return self._subscribed
+
+    @callback
+    def async_set_device(self, device: Device) -> None:
+        """Take the device of the new broker connection and pass it on."""
+        self.device = device
+        if self._subscribed:
+            self._subscribed = False
+            self.async_subscribe()
+
+        for update_callback in tuple(self._device_listeners):
+            update_callback(device)
+
+    @callback
+    def async_subscribe(self) -> None:
+        """Listen to the device status, also without entities."""
+        if not self._subscribed:
+            self.device.subscribe_listener(self.key, self._frame_received)
+            self._subscribed = True
+
+    def _frame_received(self, new_value: Any) -> None:
+        """Get frame from the broker thread into the inbound queue."""
+        self._queue.put(self, new_value)
+
+    def decode(self, new_value: Any) -> list[tuple[Listener, Any]]:
+        """Decode the frame once for all listeners. Called from the decode worker."""
+        try:
+            state = decode_frame(self.device, new_value)
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception("Decoding frame of %s failed", self.key)
+            return []
+
+        return self.decode_state(state)
+
+    def decode_state(self, state: InelsDeviceState) -> list[tuple[Listener, Any]]:
+        """Run decoders of the listeners on the decoded state."""
+        decoded: list[tuple[Listener, Any]] = []
+
+        for listener in tuple(self._listeners):
+            decoder = listener[1]
+            if decoder is None:
+                decoded.append((listener, state))
+                continue
+
+            try:
+                decoded.append((listener, decoder(state)))
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception("Decoding frame of %s failed", self.key)
+
+        return decoded
+
+    @callback
+    def async_deliver(self, decoded: list[tuple[Listener, Any]]) -> None:
+        """Push decoded values to the listeners still registered."""
+        for listener, value in decoded:
+            if listener not in self._listeners:
+                continue
+
+            try:
+                listener[0](value)
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception("Listener of %s failed", self.key)
+
+    @callback
+    def async_dispatch(self, new_value: Any) -> None:
+        """Decode and push the frame to all entities of the device in one pass."""
+        self.async_deliver(self.decode(new_value))
@@ -20,7 +20,18 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.core import logging
 
 from .base_class import InelsBaseEntity
-from .const import DEVICES, DOMAIN, ICON_LIGHT, LOGGER
+from .const import (
+    DA3_22M_CHANNELS,
+    DELIVERY,
+    DEVICE_HUBS,
+    DEVICES,
+    DOMAIN,
+    ICON_LIGHT,
+    ICON_LIGHT_GROUP,
+    LOGGER,
+    InelsLightChannelDescription,
+)
+from .groups import InelsGroupEntity, entry_groups
 
 from .coordinator import InelsDeviceUpdateCoordinator2
 
@@ -40,20 +51,33 @@ async def async_setup_entry(
             entities.append(InelsLight(device))
         elif device.device_type == "bus":
             if device.inels_type == Element.DA3_22M:
-                entities.append(
-                    InelsLightChannel(
-                        device, description=InelsLightChannelDescription(2, 0)
-                    )
-                )
-                entities.append(
-                    InelsLightChannel(
-                        device, description=InelsLightChannelDescription(2, 1)
-                    )
+                for description in DA3_22M_CHANNELS:
+                    entities.append(InelsLightChannel(device, description=description))
+
+    inels_data = hass.data[DOMAIN][config_entry.entry_id]
+    for group in entry_groups(inels_data, config_entry.options):
+        if group.dimmable:
+            entities.append(
+                InelsGroupLight(
+                    config_entry.entry_id,
+                    group,
+                    inels_data[DEVICE_HUBS],
+                    inels_data[DELIVERY],
                 )
+            )
 
     async_add_entities(entities)
 
 
+_COLOR_MODES: "dict[frozenset, frozenset[ColorMode]]" = {}
+
+
+def supported_color_modes(features: list[str]) -> frozenset[ColorMode]:
+    """Color modes shared by all lights with the same features."""
+    key = frozenset(features)
+    return _COLOR_MODES.setdefault(key, key)
+
+
 class InelsLight(InelsBaseEntity, LightEntity):
     """Light class for HA."""
 
@@ -61,10 +85,7 @@ class InelsLight(InelsBaseEntity, LightEntity):
         """Initialize a light."""
         super().__init__(device=device)
 
-        self._attr_supported_color_modes: set[ColorMode] = set()
-
-        for feature in self._device.features:
-            self._attr_supported_color_modes.add(feature)
+        self._attr_supported_color_modes = supported_color_modes(self._device.features)
 
     @property
     def is_on(self) -> bool:
@@ -95,7 +116,7 @@ class InelsLight(InelsBaseEntity, LightEntity):
             transition = int(kwargs[ATTR_TRANSITION]) / 0.065
             print(transition)
         else:
-            await self.hass.async_add_executor_job(self._device.set_ha_value, 0)
+            await self._async_set_ha_value(0)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Light to turn on."""
@@ -106,19 +127,30 @@ class InelsLight(InelsBaseEntity, LightEntity):
             brightness = int(kwargs[ATTR_BRIGHTNESS] / 2.55)
             brightness = min(brightness, 100)
 
-            await self.hass.async_add_executor_job(
-                self._device.set_ha_value, brightness
-            )
+            await self._async_set_ha_value(brightness)
         else:
-            await self.hass.async_add_executor_job(self._device.set_ha_value, 100)
+            await self._async_set_ha_value(100)
+
+
+class InelsGroupLight(InelsGroupEntity, LightEntity):
+    """Group of lights and channels dimmed with one batch of frames."""
+
+    _attr_icon = ICON_LIGHT_GROUP
+    _attr_color_mode = ColorMode.BRIGHTNESS
+    _attr_supported_color_modes = {ColorMode.BRIGHTNESS}
 
+    @property
+    def brightness(self) -> int | None:
+        """Average brightness of the members which are on."""
+        return round(self._group.level * 255 / 100)
 
-class InelsLightChannelDescription:
-    """Inels light channel description."""
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Turn all members on."""
+        brightness = 100
+        if ATTR_BRIGHTNESS in kwargs:
+            brightness = min(round(kwargs[ATTR_BRIGHTNESS] * 100 / 255), 100)
 
-    def __init__(self, channel_number: int, channel_index: int):
-        self.channel_number = channel_number
-        self.channel_index = channel_index
+        await self._async_set_level(brightness)
 
 
 class InelsLightChannel(InelsBaseEntity, LightEntity):
@@ -136,9 +168,7 @@ class InelsLightChannel(InelsBaseEntity, LightEntity):
         self._attr_unique_id = f"{self._attr_unique_id}-{description.channel_index}"
         self._attr_name = f"{self._attr_name}-{description.channel_index}"
 
-        self._attr_supported_color_modes: set[ColorMode] = set()
-        for feature in self._device.features:
-            self._attr_supported_color_modes.add(feature)
+        self._attr_supported_color_modes = supported_color_modes(self._device.features)
 
     @property
     def is_on(self) -> bool:
@@ -177,7 +207,7 @@ class InelsLightChannel(InelsBaseEntity, LightEntity):
             # mount device ha value
             ha_val = self._device.get_value().ha_value
             ha_val.out[self._entity_description.channel_index] = 0
-            await self.hass.async_add_executor_job(self._device.set_ha_value, ha_val)
+            await self._async_set_ha_value(ha_val)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Light to turn on"""
@@ -191,12 +221,12 @@ class InelsLightChannel(InelsBaseEntity, LightEntity):
             ha_val = self._device.get_value().ha_value
             ha_val.out[self._entity_description.channel_index] = brightness
 
-            await self.hass.async_add_executor_job(self._device.set_ha_value, ha_val)
+            await self._async_set_ha_value(ha_val)
         else:
             ha_val = self._device.get_value().ha_value
             ha_val.out[self._entity_description.channel_index] = 100
 
-            await self.hass.async_add_executor_job(self._device.set_ha_value, ha_val)
+            await self._async_set_ha_value(ha_val)
 
 
 class CoordinatorEntityInheritance(CoordinatorEntity):
@@ -233,9 +263,7 @@ class InelsLightChannel2(
         self._attr_unique_id = f"{self._attr_unique_id}-{description.channel_index}"
         self._attr_name = f"{self._attr_name}-{description.channel_index}"
 
-        self._attr_supported_color_modes: set[ColorMode] = set()
-        for feature in self._device.features:
-            self._attr_supported_color_modes.add(feature)
+        self._attr_supported_color_modes = supported_color_modes(self._device.features)
 
     @property
     def is_on(self) -> bool:
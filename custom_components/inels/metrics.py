@@ -0,0 +1,205 @@
+"""Derived metrics maintained incrementally from the status frames."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import partial
+import math
+import time
+
+from inelsmqtt.const import Element
+from inelsmqtt.devices import Device
+
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DA3_22M_CHANNELS, DOMAIN, LOGGER
+from .hub import InelsDeviceHub, InelsDeviceState, current_state
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60  # s
+DUTY_TIME_CONSTANT = 86400.0  # s
+
+METRIC_CYCLES = "cycles"
+METRIC_ON_TIME = "on_time"
+METRIC_OPEN_TIME = "open_time"
+METRIC_DUTY_CYCLE = "duty_cycle"
+
+# level of the output in 0..1 read from the decoded device state
+LevelReader = Callable[[InelsDeviceState], float]
+
+
+def _relay_level(device: InelsDeviceState) -> float:
+    """Level of the relay output."""
+    return 1.0 if device.state.on else 0.0
+
+
+def _dimmer_level(device: InelsDeviceState) -> float:
+    """Level of the dimmer output."""
+    return device.state / 100
+
+
+def _channel_level(index: int, device: InelsDeviceState) -> float:
+    """Level of the dimmer channel output."""
+    return device.state.out[index] / 100
+
+
+def _valve_level(device: InelsDeviceState) -> float:
+    """Level of the valve opening."""
+    return device.state.open_in_percentage / 100
+
+
+def metric_channels(device: Device) -> dict[str, LevelReader]:
+    """Return level readers of the device outputs keyed by channel suffix."""
+    if device.device_type == Platform.SWITCH or device.inels_type == Element.SA3_01B:
+        return {"": _relay_level}
+    if device.device_type == Platform.LIGHT:
+        return {"": _dimmer_level}
+    if device.inels_type == Element.DA3_22M:
+        return {
+            f"-{channel.channel_index}": partial(_channel_level, channel.channel_index)
+            for channel in DA3_22M_CHANNELS
+        }
+    if device.device_type in (Platform.CLIMATE, Platform.WATER_HEATER):
+        return {"": _valve_level}
+    return {}
+
+
+def _read_levels(
+    readers: dict[str, LevelReader], device: InelsDeviceState
+) -> dict[str, float]:
+    """Read levels of the device outputs."""
+    levels: dict[str, float] = {}
+
+    for channel, reader in readers.items():
+        try:
+            levels[channel] = reader(device)
+        except (AttributeError, IndexError, TypeError) as exc:
+            LOGGER.debug("No output level of %s: %s", channel, exc)
+
+    return levels
+
+
+class InelsChannelMetrics:
+    """Counters of one output updated on every level change."""
+
+    __slots__ = ("level", "since", "cycles", "on_time", "open_time", "duty")
+
+    def __init__(self, data: dict[str, float] | None = None) -> None:
+        """Init counters, restored ones continue from the stored values."""
+        data = data or {}
+        self.level: float | None = data.get("level")
+        self.since: float | None = None
+        self.cycles = int(data.get(METRIC_CYCLES, 0))
+        self.on_time = data.get(METRIC_ON_TIME, 0.0)
+        self.open_time = data.get(METRIC_OPEN_TIME, 0.0)
+        self.duty = data.get(METRIC_DUTY_CYCLE, 0.0)
+
+    def update(self, level: float, now: float) -> None:
+        """Account the elapsed time at the previous level and take the new one."""
+        self.on_time, self.open_time, self.duty = self._totals(now)
+
+        if level > 0 and self.level == 0:
+            self.cycles += 1
+
+        self.level = level
+        self.since = now
+
+    def _totals(self, now: float) -> tuple[float, float, float]:
+        """Return on time, open time and duty cycle at the time."""
+        elapsed = 0.0 if self.since is None else now - self.since
+        level = self.level or 0.0
+
+        decay = 1 - math.exp(-elapsed / DUTY_TIME_CONSTANT)
+        return (
+            self.on_time + (elapsed if level > 0 else 0.0),
+            self.open_time + level * elapsed,
+            self.duty + ((1.0 if level > 0 else 0.0) - self.duty) * decay,
+        )
+
+    def value(self, metric: str, now: float) -> float:
+        """Return current value of the metric."""
+        if metric == METRIC_CYCLES:
+            return self.cycles
+
+        on_time, open_time, duty = self._totals(now)
+        if metric == METRIC_ON_TIME:
+            return round(on_time / 3600, 3)
+        if metric == METRIC_OPEN_TIME:
+            return round(open_time / 3600, 3)
+        return round(duty * 100, 1)
+
+    def as_dict(self, now: float) -> dict[str, float]:
+        """Return stored form of the counters."""
+        on_time, open_time, duty = self._totals(now)
+        return {
+            "level": self.level,
+            METRIC_CYCLES: self.cycles,
+            METRIC_ON_TIME: round(on_time, 1),
+            METRIC_OPEN_TIME: round(open_time, 1),
+            METRIC_DUTY_CYCLE: round(duty, 4),
+        }
+
+
+class InelsMetrics:
+    """Derived metrics of all device outputs, persisted with a delayed save."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Init metrics of the config entry."""
+        self.hass = hass
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.metrics")
+        self._stored: dict[str, dict[str, float]] = {}
+        self.channels: dict[str, InelsChannelMetrics] = {}
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        """Load stored counters."""
+        self._stored = await self._store.async_load() or {}
+
+    @callback
+    def async_start(self, hubs: dict[str, InelsDeviceHub]) -> None:
+        """Listen to the devices with outputs before their entities do."""
+        for key, hub in hubs.items():
+            readers = {
+                f"{key}{suffix}": reader
+                for suffix, reader in metric_channels(hub.device).items()
+            }
+            if not readers:
+                continue
+
+            for channel in readers:
+                self.channels[channel] = InelsChannelMetrics(self._stored.get(channel))
+
+            decoder = partial(_read_levels, readers)
+            hub.async_add_listener(self._async_levels, decoder)
+            self._async_levels(decoder(current_state(hub.device)))
+
+    @callback
+    def _async_levels(self, levels: dict[str, float]) -> None:
+        """Update counters of the device outputs from the decoded levels."""
+        now = time.monotonic()
+
+        for channel, level in levels.items():
+            self.channels[channel].update(level, now)
+
+        # re-arming on every frame would postpone the save forever
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def value(self, channel: str, metric: str) -> float | None:
+        """Return current value of the channel metric."""
+        if channel not in self.channels:
+            return None
+        return self.channels[channel].value(metric, time.monotonic())
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, float]]:
+        """Return counters to store, the next frame arms a new delayed save."""
+        self._save_pending = False
+        now = time.monotonic()
+        return {key: metrics.as_dict(now) for key, metrics in self.channels.items()}
+
+    async def async_save(self) -> None:
+        """Store counters now."""
+        await self._store.async_save(self._data_to_save())
@@ -0,0 +1,117 @@
+"""Sampling profiler limited to the iNELS integration code paths."""
+from __future__ import annotations
+
+from collections import Counter
+import os
+import sys
+import threading
+from types import FrameType
+
+import inelsmqtt
+
+PROFILE_PATHS: "tuple[str, ...]" = (
+    os.path.dirname(__file__),
+    os.path.dirname(inelsmqtt.__file__),
+)
+MAX_STACK_DEPTH = 64
+
+
+def _package_prefixes(paths: "tuple[str, ...]") -> "dict[str, str]":
+    """Map profiled package paths to their relative prefix."""
+    return {path: f"{os.path.basename(path)}/" for path in paths}
+
+
+class InelsProfiler:
+    """Sample stacks of all threads and keep those running iNELS code."""
+
+    def __init__(
+        self, interval: float, paths: "tuple[str, ...]" = PROFILE_PATHS
+    ) -> None:
+        """Init profiler with sampling interval in seconds."""
+        self.interval = interval
+        self.paths = paths
+        self.prefixes = _package_prefixes(paths)
+        self.samples = 0
+        self.stacks: "Counter[str]" = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Return True while sampling."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start sampling thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="inels_profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling thread and wait for it. Blocking."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        own_id = threading.get_ident()
+
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            # pylint: disable-next=protected-access
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._sample(frame)
+
+    def _sample(self, frame: FrameType | None) -> None:
+        """Record the stack when it runs iNELS code."""
+        stack: list[FrameType] = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append(frame)
+            frame = frame.f_back
+
+        if not any(fr.f_code.co_filename.startswith(self.paths) for fr in stack):
+            return
+
+        self.stacks[";".join(self._frame_name(fr) for fr in reversed(stack))] += 1
+
+    def _frame_name(self, frame: FrameType) -> str:
+        """Name of the frame, profiled files are prefixed with their package."""
+        code = frame.f_code
+        file_name = code.co_filename
+
+        for path, prefix in self.prefixes.items():
+            if file_name.startswith(path):
+                file_name = prefix + os.path.relpath(file_name, path)
+                break
+        else:
+            file_name = os.path.basename(file_name)
+
+        return f"{file_name}:{code.co_name}:{code.co_firstlineno}"
+
+    def write_folded(self, path: str) -> None:
+        """Write stacks in the folded format read by flamegraph tools. Blocking."""
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+    def top(self, count: int) -> "list[tuple[str, int, int]]":
+        """Return iNELS functions with the most own and total samples."""
+        own: "Counter[str]" = Counter()
+        total: "Counter[str]" = Counter()
+
+        for stack, samples in self.stacks.items():
+            frames = stack.split(";")
+            for name in set(frames):
+                total[name] += samples
+            own[frames[-1]] += samples
+
+        prefixes = tuple(self.prefixes.values())
+        names = {name for name in total if name.startswith(prefixes)}
+        return sorted(
+            ((name, own[name], total[name]) for name in names),
+            key=lambda item: (item[1], item[2]),
+            reverse=True,
+        )[:count]
@@ -0,0 +1,199 @@
+"""iNELS scenes with pre-encoded frames."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from inelsmqtt.devices import Device
+
+from homeassistant.components.scene import Scene
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.storage import Store
+
+from .base_class import device_key
+from .commands import InelsCommand, async_publish_commands
+from .const import (
+    DEVICES,
+    DOMAIN,
+    LOGGER,
+    SCENES,
+    SCHEDULER,
+    SIGNAL_DEVICES_CHANGED,
+    SIGNAL_SCENE_ADDED,
+    SIGNAL_SCENE_REMOVED,
+    TITLE,
+)
+from .scheduler import InelsOutboundScheduler, context_priority
+
+STORAGE_VERSION = 1
+SCENE_PACE = 0.0  # s
+
+ATTR_FRAMES = "frames"
+ATTR_DEVICE = "device"
+ATTR_TOPIC = "topic"
+ATTR_PAYLOAD = "payload"
+
+
+class InelsSceneStore:
+    """Persisted frames of the iNELS scenes."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Init scene store of the config entry."""
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.scenes")
+        self.scenes: dict[str, dict[str, Any]] = {}
+        self.latency: dict[str, float] = {}
+
+    async def async_load(self) -> None:
+        """Load scenes from the storage."""
+        self.scenes = await self._store.async_load() or {}
+
+    @callback
+    def async_set(self, scene_id: str, name: str, commands: list[InelsCommand]) -> None:
+        """Store encoded frames of the scene."""
+        self.scenes[scene_id] = {
+            "name": name,
+            ATTR_FRAMES: [
+                {
+                    ATTR_DEVICE: device_key(command.device),
+                    ATTR_TOPIC: command.topic,
+                    ATTR_PAYLOAD: command.payload,
+                }
+                for command in commands
+            ],
+        }
+        self._store.async_delay_save(lambda: self.scenes, 1)
+
+    @callback
+    def async_delete(self, scene_id: str) -> None:
+        """Remove the scene from the storage."""
+        self.scenes.pop(scene_id, None)
+        self.latency.pop(scene_id, None)
+        self._store.async_delay_save(lambda: self.scenes, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return scene sizes and the last activation latency."""
+        return {
+            scene_id: {
+                "frames": len(scene[ATTR_FRAMES]),
+                "latency": self.latency.get(scene_id),
+            }
+            for scene_id, scene in self.scenes.items()
+        }
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Load iNELS scenes from the storage."""
+    inels_data = hass.data[DOMAIN][config_entry.entry_id]
+    store: InelsSceneStore = inels_data[SCENES]
+    scheduler: InelsOutboundScheduler = inels_data[SCHEDULER]
+    devices = {device_key(device): device for device in inels_data[DEVICES]}
+    scenes: dict[str, InelsScene] = {}
+
+    @callback
+    def _async_add_scene(scene_id: str) -> None:
+        if scene_id in scenes and scenes[scene_id].hass is not None:
+            scenes[scene_id].load_frames(devices)
+            return
+
+        scenes[scene_id] = InelsScene(
+            store, scheduler, config_entry.entry_id, scene_id, devices
+        )
+        async_add_entities([scenes[scene_id]])
+
+    @callback
+    def _async_remove_scene(scene_id: str) -> None:
+        # the entity itself is removed with its registry entry
+        scenes.pop(scene_id, None)
+
+    @callback
+    def _async_devices_changed() -> None:
+        # devices were created again on a new broker connection
+        devices.clear()
+        devices.update({device_key(device): device for device in inels_data[DEVICES]})
+        for scene in scenes.values():
+            scene.load_frames(devices)
+
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_SCENE_ADDED.format(config_entry.entry_id),
+            _async_add_scene,
+        )
+    )
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_SCENE_REMOVED.format(config_entry.entry_id),
+            _async_remove_scene,
+        )
+    )
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_DEVICES_CHANGED.format(config_entry.entry_id),
+            _async_devices_changed,
+        )
+    )
+
+    for scene_id in store.scenes:
+        scenes[scene_id] = InelsScene(
+            store, scheduler, config_entry.entry_id, scene_id, devices
+        )
+    async_add_entities(list(scenes.values()))
+
+
+class InelsScene(Scene):
+    """Scene publishing its cached frames."""
+
+    def __init__(
+        self,
+        store: InelsSceneStore,
+        scheduler: InelsOutboundScheduler,
+        entry_id: str,
+        scene_id: str,
+        devices: dict[str, Device],
+    ) -> None:
+        """Initialize a scene."""
+        self._store = store
+        self._scheduler = scheduler
+        self._scene_id = scene_id
+
+        self._attr_unique_id = f"{entry_id}-scene-{scene_id}"
+        self._attr_name = f"{TITLE}-{store.scenes[scene_id]['name']}"
+        self.load_frames(devices)
+
+    def load_frames(self, devices: dict[str, Device]) -> None:
+        """Build the commands from the stored frames."""
+        self._commands = [
+            InelsCommand(
+                devices[frame[ATTR_DEVICE]], frame[ATTR_TOPIC], frame[ATTR_PAYLOAD]
+            )
+            for frame in self._store.scenes[self._scene_id][ATTR_FRAMES]
+            if frame[ATTR_DEVICE] in devices
+        ]
+
+    async def async_activate(self, **kwargs: Any) -> None:
+        """Publish the cached frames of the scene."""
+        start = time.monotonic()
+        await async_publish_commands(
+            self._scheduler,
+            self._commands,
+            SCENE_PACE,
+            context_priority(self._context),
+        )
+        latency = time.monotonic() - start
+
+        self._store.latency[self._scene_id] = round(latency, 4)
+        LOGGER.debug(
+            "Scene %s published %d frames in %.1f ms",
+            self._scene_id,
+            len(self._commands),
+            latency * 1000,
+        )
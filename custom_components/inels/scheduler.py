@@ -0,0 +1,299 @@
+"""Outbound scheduler sharing the gateway bandwidth by priority."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import time
+from typing import Any
+
+from inelsmqtt.devices import Device
+
+from homeassistant.core import Context, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import LOGGER
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_AUTOMATION = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = ("interactive", "automation", "background")
+
+# frames per second and burst size of a gateway
+BUS_RATE = 20.0
+BUS_BURST = 10
+RF_RATE = 5.0
+RF_BURST = 3
+
+
+def context_priority(context: Context | None) -> int:
+    """Return priority of the command by the context it was issued in."""
+    if context is not None and context.user_id is not None:
+        return PRIORITY_INTERACTIVE
+    return PRIORITY_AUTOMATION
+
+
+class InelsTokenBucket:
+    """Token bucket of a parent gateway."""
+
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Init full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens for the elapsed time."""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def take(self, now: float) -> bool:
+        """Take a token when there is one."""
+        self._refill(now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def wait_time(self, now: float) -> float:
+        """Return seconds until the next token."""
+        self._refill(now)
+        return max(1 - self.tokens, 0) / self.rate
+
+
+@dataclass
+class InelsJob:
+    """Blocking job waiting for a token of its gateway."""
+
+    gateway: str
+    job: Callable[[], Any]
+    future: asyncio.Future | None
+    queued: float = field(default_factory=time.monotonic)
+
+
+class InelsPriorityStats:
+    """Queue and latency counters of a priority class."""
+
+    __slots__ = ("submitted", "done", "max_queued", "wait", "max_wait")
+
+    def __init__(self) -> None:
+        """Init empty counters."""
+        self.submitted = 0
+        self.done = 0
+        self.max_queued = 0
+        self.wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self, queued: int) -> dict[str, Any]:
+        """Return counters with average and maximum queue wait in ms."""
+        return {
+            "queued": queued,
+            "max_queued": self.max_queued,
+            "submitted": self.submitted,
+            "done": self.done,
+            "wait_ms": round(self.wait / self.done * 1000, 1) if self.done else None,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+class InelsOutboundScheduler:
+    """Run blocking publishes in priority order within the gateway budgets.
+
+    Gateways with queued jobs and a token are kept ready in one deque per
+    priority, gateways out of tokens wait for their next token off the deques.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init scheduler."""
+        self.hass = hass
+        self.buckets: dict[str, InelsTokenBucket] = {}
+        self._jobs: dict[str, tuple[deque[InelsJob], ...]] = {}
+        self._ready: tuple[deque[str], ...] = tuple(deque() for _ in PRIORITY_NAMES)
+        self._waiting: dict[str, float] = {}
+        self._queued = [0 for _ in PRIORITY_NAMES]
+        self.stats = tuple(InelsPriorityStats() for _ in PRIORITY_NAMES)
+        self._timer: asyncio.TimerHandle | None = None
+        self._stopped = False
+        self._running: set[asyncio.Task] = set()
+
+    @property
+    def queued(self) -> int:
+        """Return number of jobs waiting for a token."""
+        return sum(self._queued)
+
+    async def async_flush(self) -> None:
+        """Wait until the queued and running jobs are done."""
+        while self._running or self.queued:
+            if self._running:
+                await asyncio.wait(list(self._running))
+            else:
+                await asyncio.sleep(self._wait_time(time.monotonic()) or 0)
+
+    @callback
+    def async_stop(self) -> int:
+        """Cancel the dispatch timer, fail the queued jobs and return their count."""
+        self._stopped = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        dropped = 0
+        for queues in self._jobs.values():
+            for queue in queues:
+                while queue:
+                    dropped += 1
+                    future = queue.popleft().future
+                    if future is not None and not future.done():
+                        future.set_exception(HomeAssistantError("iNELS entry unloaded"))
+
+        for ready in self._ready:
+            ready.clear()
+        self._waiting.clear()
+        self._queued = [0 for _ in PRIORITY_NAMES]
+        return dropped
+
+    def _bucket(self, device: Device) -> InelsTokenBucket:
+        """Return bucket of the parent gateway of the device."""
+        if device.parent_id not in self.buckets:
+            if device.device_type == "bus":
+                bucket = InelsTokenBucket(BUS_RATE, BUS_BURST)
+            else:
+                bucket = InelsTokenBucket(RF_RATE, RF_BURST)
+            self.buckets[device.parent_id] = bucket
+            self._jobs[device.parent_id] = tuple(deque() for _ in PRIORITY_NAMES)
+
+        return self.buckets[device.parent_id]
+
+    @callback
+    def _async_queue(self, item: InelsJob, priority: int) -> None:
+        """Queue the job and wake the dispatch task."""
+        if self._stopped:
+            if item.future is not None:
+                item.future.set_exception(HomeAssistantError("iNELS entry unloaded"))
+            return
+
+        queue = self._jobs[item.gateway][priority]
+        queue.append(item)
+        if len(queue) == 1 and item.gateway not in self._waiting:
+            self._ready[priority].append(item.gateway)
+
+        self._queued[priority] += 1
+        stats = self.stats[priority]
+        stats.submitted += 1
+        stats.max_queued = max(stats.max_queued, self._queued[priority])
+
+        self._async_dispatch()
+
+    async def async_submit(
+        self, device: Device, job: Callable[[], Any], priority: int
+    ) -> Any:
+        """Queue blocking job for the device and return its result."""
+        self._bucket(device)
+        item = InelsJob(device.parent_id, job, self.hass.loop.create_future())
+        self._async_queue(item, priority)
+        return await item.future
+
+    @callback
+    def async_post(self, device: Device, job: Callable[[], Any], priority: int) -> None:
+        """Queue blocking job for the device without waiting for it."""
+        self._bucket(device)
+        self._async_queue(InelsJob(device.parent_id, job, None), priority)
+
+    def _wake(self, now: float) -> None:
+        """Make the gateways whose next token is due ready again."""
+        for gateway, due in list(self._waiting.items()):
+            if due > now:
+                continue
+            del self._waiting[gateway]
+            for ready, queue in zip(self._ready, self._jobs[gateway]):
+                if queue:
+                    ready.append(gateway)
+
+    def _block(self, gateway: str, now: float) -> None:
+        """Take the gateway out of the ready deques until its next token."""
+        self._waiting[gateway] = now + self.buckets[gateway].wait_time(now)
+        for ready, queue in zip(self._ready, self._jobs[gateway]):
+            if queue:
+                ready.remove(gateway)
+
+    def _next(self, now: float) -> tuple[int, InelsJob] | None:
+        """Pop the first job of the highest priority with a token of its gateway."""
+        self._wake(now)
+
+        for priority, ready in enumerate(self._ready):
+            while ready:
+                gateway = ready[0]
+                if not self.buckets[gateway].take(now):
+                    self._block(gateway, now)
+                    continue
+
+                queue = self._jobs[gateway][priority]
+                item = queue.popleft()
+                if not queue:
+                    ready.popleft()
+                self._queued[priority] -= 1
+                return priority, item
+
+        return None
+
+    def _wait_time(self, now: float) -> float | None:
+        """Return seconds until a queued job gets a token."""
+        if not self._waiting:
+            return None
+        return max(min(self._waiting.values()) - now, 0)
+
+    @callback
+    def _async_dispatch(self) -> None:
+        """Start the jobs having tokens, re-arm the timer for the next token."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._stopped:
+            return
+
+        now = time.monotonic()
+        while (picked := self._next(now)) is not None:
+            priority, item = picked
+            waited = now - item.queued
+            stats = self.stats[priority]
+            stats.wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+
+            task = self.hass.async_create_task(self._async_execute(stats, item))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+        if (wait := self._wait_time(now)) is not None:
+            self._timer = self.hass.loop.call_later(wait, self._async_dispatch)
+
+    async def _async_execute(self, stats: InelsPriorityStats, item: InelsJob) -> None:
+        """Run the job in the executor and resolve its future."""
+        try:
+            result = await self.hass.async_add_executor_job(item.job)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.debug("Outbound job for %s failed: %s", item.gateway, exc)
+            if item.future is not None and not item.future.done():
+                item.future.set_exception(exc)
+            return
+        finally:
+            stats.done += 1
+
+        if item.future is not None and not item.future.done():
+            item.future.set_result(result)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return counters of the priority classes and gateway tokens."""
+        return {
+            "priorities": {
+                name: stats.as_dict(queued)
+                for name, stats, queued in zip(PRIORITY_NAMES, self.stats, self._queued)
+            },
+            "gateways": {
+                gateway: round(bucket.tokens, 1)
+                for gateway, bucket in self.buckets.items()
+            },
+        }
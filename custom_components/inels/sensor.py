@@ -4,6 +4,8 @@ from __future__ import annotations
 from collections.abc import Callable
 from dataclasses import dataclass
 from operator import itemgetter
+from datetime import timedelta
+import time
 from typing import Any
 
 from inelsmqtt.const import (
@@ -34,30 +36,61 @@ from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, TEMP_CELSIUS, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    LIGHT_LUX,
+    PERCENTAGE,
+    TEMP_CELSIUS,
+    TIME_HOURS,
+    Platform,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 
 from .base_class import InelsBaseEntity
 from .const import (
+    ATTR_BUS_ERROR,
+    BUS_HEALTH,
+    CONF_SENSOR_THROTTLE,
     DEVICES,
     DOMAIN,
     ICON_BATTERY,
+    ICON_BUS_HEALTH,
     ICON_TEMPERATURE,
     ICON_HUMIDITY,
     ICON_DEW_POINT,
     ICON_LIGHT_IN,
+    ICON_METRIC,
     LOGGER,
+    METRICS,
+    SENSOR_HISTORY,
+    SENSOR_THROTTLE,
+    TITLE,
+    UNIT_ERRORS_PER_MINUTE,
+)
+from .health import InelsBusHealth
+from .hub import InelsDeviceState, current_state
+from .history import InelsHistory, InelsSensorHistory
+from .metrics import (
+    METRIC_CYCLES,
+    METRIC_DUTY_CYCLE,
+    METRIC_ON_TIME,
+    METRIC_OPEN_TIME,
+    InelsMetrics,
+    metric_channels,
 )
+from .throttle import InelsSensorThrottle
 
 
 @dataclass
 class InelsSensorEntityDescriptionMixin:
     """Mixin keys."""
 
-    value: Callable[[Device], Any | None]
+    value: Callable[[InelsDeviceState], Any | None]
 
 
 @dataclass
@@ -66,17 +99,34 @@ class InelsSensorEntityDescription(
 ):
     """Class for describing inels entities."""
 
+    error: Callable[[InelsDeviceState], str | None] | None = None
+
+
+@dataclass
+class InelsBusHealthEntityDescriptionMixin:
+    """Mixin keys."""
+
+    value: Callable[[InelsBusHealth], Any]
+
+
+@dataclass
+class InelsBusHealthEntityDescription(
+    SensorEntityDescription, InelsBusHealthEntityDescriptionMixin
+):
+    """Class for describing bus health entities."""
+
+    attributes: Callable[[InelsBusHealth], dict[str, Any]] | None = None
 
-def _process_data(data: str, indexes: list) -> str:
+
+def _process_data(device: InelsDeviceState, indexes: list) -> str:
     """Process data for specific type of measurements."""
-    array = data.split("\n")[:-1]
-    data_range = itemgetter(*indexes)(array)
+    data_range = itemgetter(*indexes)(device.fields)
     range_joined = "".join(data_range)
 
     return f"0x{range_joined}"
 
 
-def __get_battery_level(device: Device) -> int | None:
+def __get_battery_level(device: InelsDeviceState) -> int | None:
     """Get battery level of the device."""
     if device.is_available is False:
         return None
@@ -86,7 +136,7 @@ def __get_battery_level(device: Device) -> int | None:
         100
         if int(
             _process_data(
-                device.state,
+                device,
                 INELS_DEVICE_TYPE_DATA_STRUCT_DATA[device.inels_type][BATTERY],
             ),
             16,
@@ -96,7 +146,7 @@ def __get_battery_level(device: Device) -> int | None:
     )
 
 
-def __get_temperature_in(device: Device) -> float | None:
+def __get_temperature_in(device: InelsDeviceState) -> float | None:
     """Get temperature inside."""
     if device.is_available is False:
         return None
@@ -104,7 +154,7 @@ def __get_temperature_in(device: Device) -> float | None:
     return (
         int(
             _process_data(
-                device.state,
+                device,
                 INELS_DEVICE_TYPE_DATA_STRUCT_DATA[device.inels_type][TEMP_IN],
             ),
             16,
@@ -113,7 +163,7 @@ def __get_temperature_in(device: Device) -> float | None:
     )
 
 
-def __get_temperature_out(device: Device) -> float | None:
+def __get_temperature_out(device: InelsDeviceState) -> float | None:
     """Get temperature outside."""
     if device.is_available is False:
         return None
@@ -121,7 +171,7 @@ def __get_temperature_out(device: Device) -> float | None:
     return (
         int(
             _process_data(
-                device.state,
+                device,
                 INELS_DEVICE_TYPE_DATA_STRUCT_DATA[device.inels_type][TEMP_OUT],
             ),
             16,
@@ -132,201 +182,135 @@ def __get_temperature_out(device: Device) -> float | None:
 
 # BUS
 
-
-def __get_temperature_from_object(device: Device) -> str | None:
-    """Get temperature from generic model."""
+BUS_2B_ERRORS: "dict[int, str]" = {
+    BusErrors.BUS_2B_NOT_CALIBRATED: "Sensor not calibrated",
+    BusErrors.BUS_2B_NO_VALUE: "No value",
+    BusErrors.BUS_2B_NOT_CONFIGURED: "Sensor not configured",
+    BusErrors.BUS_2B_OUT_OF_RANGE: "Sensor value out of range",
+    BusErrors.BUS_2B_MEASURE: "Sensor measurement error",
+    BusErrors.BUS_2B_NO_SENSOR: "No sensor connected",
+    BusErrors.BUS_2B_NOT_COMMUNICATING: "Sensor not communicating",
+}
+
+BUS_4B_ERRORS: "dict[int, str]" = {
+    BusErrors.BUS_4B_NOT_CALIBRATED: "Sensor not calibrated",
+    BusErrors.BUS_4B_NO_VALUE: "No value",
+    BusErrors.BUS_4B_NOT_CONFIGURED: "Sensor not configured",
+    BusErrors.BUS_4B_OUT_OF_RANGE: "Sensor value out of range",
+    BusErrors.BUS_4B_MEASURE: "Sensor measurement error",
+    BusErrors.BUS_4B_NO_SENSOR: "No sensor connected",
+    BusErrors.BUS_4B_NOT_COMMUNICATING: "Sensor not communicating",
+}
+
+
+# attributes are shared by all sensors reporting the same error
+_BUS_ERROR_ATTRIBUTES: "dict[str | None, dict[str, str | None]]" = {
+    error: {ATTR_BUS_ERROR: error}
+    for error in (None, *BUS_2B_ERRORS.values(), *BUS_4B_ERRORS.values())
+}
+
+
+def _get_bus_raw(device: InelsDeviceState, data_type: str) -> int | None:
+    """Get raw value of the bus device data type."""
     if device.is_available is False:
         return None
 
-    val = int(device.state.temp, 16)
-    if val == BusErrors.BUS_2B_NOT_CALIBRATED:
-        return "Sensor not calibrated"
-    elif val == BusErrors.BUS_2B_NO_VALUE:
-        return "No value"
-    elif val == BusErrors.BUS_2B_NOT_CONFIGURED:
-        return "Sensor not configured"
-    elif val == BusErrors.BUS_2B_OUT_OF_RANGE:
-        return "Sensor value out of range"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_2B_NO_SENSOR:
-        return "No sensor connected"
-    elif val == BusErrors.BUS_2B_NOT_COMMUNICATING:
-        return "Sensor not communicating"
-
-    return f"{val / 100}"
-
-
-def __get_temperature_in_str(device: Device) -> str | None:
-    # 2 byte val
-    """Get temperature inside."""
-    if device.is_available is False:
-        return None
-
-    val = int(
+    return int(
         _process_data(
-            device.state, INELS_DEVICE_TYPE_DATA_STRUCT_DATA[device.inels_type][TEMP_IN]
+            device,
+            INELS_DEVICE_TYPE_DATA_STRUCT_DATA[device.inels_type][data_type],
         ),
         16,
     )
 
-    if val == BusErrors.BUS_2B_NOT_CALIBRATED:
-        return "Sensor not calibrated"
-    elif val == BusErrors.BUS_2B_NO_VALUE:
-        return "No value"
-    elif val == BusErrors.BUS_2B_NOT_CONFIGURED:
-        return "Sensor not configured"
-    elif val == BusErrors.BUS_2B_OUT_OF_RANGE:
-        return "Sensor value out of range"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_2B_NO_SENSOR:
-        return "No sensor connected"
-    elif val == BusErrors.BUS_2B_NOT_COMMUNICATING:
-        return "Sensor not communicating"
-
-    return f"{val / 100}"
-
-
-def __get_light_intensity(
-    device: Device,
-) -> float | None:
-    # 4 byte val
-    """Get light intensity."""
+
+def _bus_value(val: int | None, errors: dict[int, str]) -> float | None:
+    """Convert raw bus value into measurement. Error codes have no value."""
+    if val is None or val in errors:
+        return None
+
+    return val / 100
+
+
+def _bus_error(val: int | None, errors: dict[int, str]) -> str | None:
+    """Convert raw bus value into error description."""
+    if val is None:
+        return None
+
+    return errors.get(val)
+
+
+def __get_temperature_from_object_raw(device: InelsDeviceState) -> int | None:
+    """Get raw temperature from generic model."""
     if device.is_available is False:
         return None
 
-    val = int(
-        _process_data(
-            device.state,
-            INELS_DEVICE_TYPE_DATA_STRUCT_DATA[device.inels_type][LIGHT_IN],
-        ),
-        16,
-    )
+    return int(device.state.temp, 16)
 
-    if val == BusErrors.BUS_4B_NOT_CALIBRATED:
-        return "Sensor not calibrated"
-    elif val == BusErrors.BUS_4B_NO_VALUE:
-        return "No value"
-    elif val == BusErrors.BUS_4B_NOT_CONFIGURED:
-        return "Sensor not configured"
-    elif val == BusErrors.BUS_4B_OUT_OF_RANGE:
-        return "Sensor value out of range"
-    elif val == BusErrors.BUS_4B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_4B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_4B_NO_SENSOR:
-        return "No sensor connected"
-    elif val == BusErrors.BUS_4B_NOT_COMMUNICATING:
-        return "Sensor not communicating"
-
-    return f"{val / 100}"
-
-
-def __get_analog_temperature(device: Device) -> str | None:
+
+def __get_temperature_from_object(device: InelsDeviceState) -> float | None:
+    """Get temperature from generic model."""
+    return _bus_value(__get_temperature_from_object_raw(device), BUS_2B_ERRORS)
+
+
+def __get_temperature_from_object_error(device: InelsDeviceState) -> str | None:
+    """Get temperature error from generic model."""
+    return _bus_error(__get_temperature_from_object_raw(device), BUS_2B_ERRORS)
+
+
+def __get_temperature_in_bus(device: InelsDeviceState) -> float | None:
+    # 2 byte val
+    """Get temperature inside."""
+    return _bus_value(_get_bus_raw(device, TEMP_IN), BUS_2B_ERRORS)
+
+
+def __get_temperature_in_bus_error(device: InelsDeviceState) -> str | None:
+    """Get temperature inside error."""
+    return _bus_error(_get_bus_raw(device, TEMP_IN), BUS_2B_ERRORS)
+
+
+def __get_light_intensity(device: InelsDeviceState) -> float | None:
+    # 4 byte val
+    """Get light intensity."""
+    return _bus_value(_get_bus_raw(device, LIGHT_IN), BUS_4B_ERRORS)
+
+
+def __get_light_intensity_error(device: InelsDeviceState) -> str | None:
+    """Get light intensity error."""
+    return _bus_error(_get_bus_raw(device, LIGHT_IN), BUS_4B_ERRORS)
+
+
+def __get_analog_temperature(device: InelsDeviceState) -> float | None:
     # 2 byte val
     """Get analog temperature."""
-    if device.is_available is False:
-        return None
+    return _bus_value(_get_bus_raw(device, AIN), BUS_2B_ERRORS)
+
+
+def __get_analog_temperature_error(device: InelsDeviceState) -> str | None:
+    """Get analog temperature error."""
+    return _bus_error(_get_bus_raw(device, AIN), BUS_2B_ERRORS)
 
-    val = int(
-        _process_data(
-            device.state, INELS_DEVICE_TYPE_DATA_STRUCT_DATA[device.inels_type][AIN]
-        ),
-        16,
-    )
 
-    if val == BusErrors.BUS_2B_NOT_CALIBRATED:
-        return "Sensor not calibrated"
-    elif val == BusErrors.BUS_2B_NO_VALUE:
-        return "No value"
-    elif val == BusErrors.BUS_2B_NOT_CONFIGURED:
-        return "Sensor not configured"
-    elif val == BusErrors.BUS_2B_OUT_OF_RANGE:
-        return "Sensor value out of range"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_2B_NO_SENSOR:
-        return "No sensor connected"
-    elif val == BusErrors.BUS_2B_NOT_COMMUNICATING:
-        return "Sensor not communicating"
-
-    return f"{val / 100}"
-
-
-def __get_humidity(device: Device) -> str | None:
+def __get_humidity(device: InelsDeviceState) -> float | None:
     # 2 byte val
     """Get humidity."""
-    if device.is_available is False:
-        return None
+    return _bus_value(_get_bus_raw(device, HUMIDITY), BUS_2B_ERRORS)
+
+
+def __get_humidity_error(device: InelsDeviceState) -> str | None:
+    """Get humidity error."""
+    return _bus_error(_get_bus_raw(device, HUMIDITY), BUS_2B_ERRORS)
 
-    val = int(
-        _process_data(
-            device.state,
-            INELS_DEVICE_TYPE_DATA_STRUCT_DATA[device.inels_type][HUMIDITY],
-        ),
-        16,
-    )
 
-    if val == BusErrors.BUS_2B_NOT_CALIBRATED:
-        return "Sensor not calibrated"
-    elif val == BusErrors.BUS_2B_NO_VALUE:
-        return "No value"
-    elif val == BusErrors.BUS_2B_NOT_CONFIGURED:
-        return "Sensor not configured"
-    elif val == BusErrors.BUS_2B_OUT_OF_RANGE:
-        return "Sensor value out of range"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_2B_NO_SENSOR:
-        return "No sensor connected"
-    elif val == BusErrors.BUS_2B_NOT_COMMUNICATING:
-        return "Sensor not communicating"
-
-    return f"{val / 100}"
-
-
-def __get_dew_point(device: Device) -> str | None:
+def __get_dew_point(device: InelsDeviceState) -> float | None:
     # 2 byte val
     """Get dew point."""
-    if device.is_available is False:
-        return None
+    return _bus_value(_get_bus_raw(device, DEW_POINT), BUS_2B_ERRORS)
 
-    val = int(
-        _process_data(
-            device.state,
-            INELS_DEVICE_TYPE_DATA_STRUCT_DATA[device.inels_type][DEW_POINT],
-        ),
-        16,
-    )
 
-    if val == BusErrors.BUS_2B_NOT_CALIBRATED:
-        return "Sensor not calibrated"
-    elif val == BusErrors.BUS_2B_NO_VALUE:
-        return "No value"
-    elif val == BusErrors.BUS_2B_NOT_CONFIGURED:
-        return "Sensor not configured"
-    elif val == BusErrors.BUS_2B_OUT_OF_RANGE:
-        return "Sensor value out of range"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == BusErrors.BUS_2B_MEASURE:
-        return "Sensor measurement error"
-    elif val == int(BusErrors.BUS_2B_NO_SENSOR):
-        return "No sensor connected"
-    elif val == BusErrors.BUS_2B_NOT_COMMUNICATING:
-        return "Sensor not communicating"
-
-    return f"{val/100}"
+def __get_dew_point_error(device: InelsDeviceState) -> str | None:
+    """Get dew point error."""
+    return _bus_error(_get_bus_raw(device, DEW_POINT), BUS_2B_ERRORS)
 
 
 # RFTI_10B
@@ -336,6 +320,7 @@ SENSOR_DESCRIPTION_TEMPERATURE: "tuple[InelsSensorEntityDescription, ...]" = (
         key="battery_level",
         name="Battery",
         device_class=SensorDeviceClass.BATTERY,
+        state_class=SensorStateClass.MEASUREMENT,
         icon=ICON_BATTERY,
         native_unit_of_measurement=PERCENTAGE,
         value=__get_battery_level,
@@ -344,6 +329,7 @@ SENSOR_DESCRIPTION_TEMPERATURE: "tuple[InelsSensorEntityDescription, ...]" = (
         key="temp_in",
         name="Temperature In",
         device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
         icon=ICON_TEMPERATURE,
         native_unit_of_measurement=TEMP_CELSIUS,
         value=__get_temperature_in,
@@ -352,6 +338,7 @@ SENSOR_DESCRIPTION_TEMPERATURE: "tuple[InelsSensorEntityDescription, ...]" = (
         key="temp_out",
         name="Temperature Out",
         device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
         icon=ICON_TEMPERATURE,
         native_unit_of_measurement=TEMP_CELSIUS,
         value=__get_temperature_out,
@@ -364,10 +351,12 @@ SENSOR_DESCRIPTION_TEMPERATURE_GENERIC: "tuple[InelsSensorEntityDescription, ...
     InelsSensorEntityDescription(
         key="temp_in",
         name="Temperature",
-        # device_class=SensorDeviceClass.TEMPERATURE,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
         icon=ICON_TEMPERATURE,
         native_unit_of_measurement=TEMP_CELSIUS,
         value=__get_temperature_from_object,
+        error=__get_temperature_from_object_error,
     ),
 )
 
@@ -377,42 +366,134 @@ SENSOR_DESCRIPTION_MULTISENSOR: "tuple[InelsSensorEntityDescription, ...]" = (
     InelsSensorEntityDescription(
         key="temp_in",
         name="Temperature",
-        # device_class=SensorDeviceClass.TEMPERATURE,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
         icon=ICON_TEMPERATURE,
         native_unit_of_measurement=TEMP_CELSIUS,
-        value=__get_temperature_in_str,
+        value=__get_temperature_in_bus,
+        error=__get_temperature_in_bus_error,
     ),
     InelsSensorEntityDescription(
         key="light_in",
         name="Light intensity",
-        # device_class=SensorDeviceClass.ILLUMINANCE,
+        device_class=SensorDeviceClass.ILLUMINANCE,
+        state_class=SensorStateClass.MEASUREMENT,
         icon=ICON_LIGHT_IN,
-        native_unit_of_measurement="lux",
+        native_unit_of_measurement=LIGHT_LUX,
         value=__get_light_intensity,
+        error=__get_light_intensity_error,
     ),
     InelsSensorEntityDescription(
         key="ain",
         name="Analog temperature",
-        # device_class=SensorDeviceClass.TEMPERATURE,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
         icon=ICON_TEMPERATURE,
         native_unit_of_measurement=TEMP_CELSIUS,
         value=__get_analog_temperature,
+        error=__get_analog_temperature_error,
     ),
     InelsSensorEntityDescription(
         key="humidity",
         name="Humidity",
-        # device_class=SensorDeviceClass.HUMIDITY,
+        device_class=SensorDeviceClass.HUMIDITY,
+        state_class=SensorStateClass.MEASUREMENT,
         icon=ICON_HUMIDITY,
         native_unit_of_measurement=PERCENTAGE,
         value=__get_humidity,
+        error=__get_humidity_error,
     ),
     InelsSensorEntityDescription(
         key="dew_point",
         name="Dew point",
-        # device_class=SensorDeviceClass.TEMPERATURE,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
         icon=ICON_DEW_POINT,
         native_unit_of_measurement=TEMP_CELSIUS,
         value=__get_dew_point,
+        error=__get_dew_point_error,
+    ),
+)
+
+
+# Bus health summary
+BUS_HEALTH_DESCRIPTIONS: "tuple[InelsBusHealthEntityDescription, ...]" = (
+    InelsBusHealthEntityDescription(
+        key="bus_errors",
+        name="Bus errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon=ICON_BUS_HEALTH,
+        value=lambda health: health.total,
+        attributes=lambda health: {
+            key: val
+            for key, val in health.as_dict().items()
+            if key in ("errors", "parents")
+        },
+    ),
+    InelsBusHealthEntityDescription(
+        key="bus_error_rate_5m",
+        name="Bus error rate 5 min",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon=ICON_BUS_HEALTH,
+        native_unit_of_measurement=UNIT_ERRORS_PER_MINUTE,
+        value=lambda health: health.rate(300),
+        attributes=lambda health: health.window_summary(300),
+    ),
+    InelsBusHealthEntityDescription(
+        key="bus_error_rate_1h",
+        name="Bus error rate 1 h",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon=ICON_BUS_HEALTH,
+        native_unit_of_measurement=UNIT_ERRORS_PER_MINUTE,
+        value=lambda health: health.rate(3600),
+        attributes=lambda health: health.window_summary(3600),
+    ),
+    InelsBusHealthEntityDescription(
+        key="bus_devices_in_error",
+        name="Bus devices in error",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon=ICON_BUS_HEALTH,
+        value=lambda health: health.devices_in_error(3600),
+    ),
+)
+
+
+# Derived metrics, relays and dimmers
+OUTPUT_METRIC_DESCRIPTIONS: "tuple[SensorEntityDescription, ...]" = (
+    SensorEntityDescription(
+        key=METRIC_CYCLES,
+        name="Cycles",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon=ICON_METRIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key=METRIC_ON_TIME,
+        name="On time",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=TIME_HOURS,
+        entity_registry_enabled_default=False,
+    ),
+)
+
+# Derived metrics, thermovalves
+VALVE_METRIC_DESCRIPTIONS: "tuple[SensorEntityDescription, ...]" = (
+    SensorEntityDescription(
+        key=METRIC_OPEN_TIME,
+        name="Valve open time",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=TIME_HOURS,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key=METRIC_DUTY_CYCLE,
+        name="Duty cycle",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon=ICON_METRIC,
+        native_unit_of_measurement=PERCENTAGE,
+        entity_registry_enabled_default=False,
     ),
 )
 
@@ -423,7 +504,15 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Load Inels switch.."""
-    device_list: "list[Sensor]" = hass.data[DOMAIN][config_entry.entry_id][DEVICES]
+    inels_data = hass.data[DOMAIN][config_entry.entry_id]
+    device_list: "list[Sensor]" = inels_data[DEVICES]
+    throttle_options = config_entry.options.get(CONF_SENSOR_THROTTLE, {})
+    throttles: "dict[str, InelsSensorThrottle]" = inels_data.setdefault(
+        SENSOR_THROTTLE, {}
+    )
+    health: InelsBusHealth = inels_data.setdefault(BUS_HEALTH, InelsBusHealth())
+    history: InelsHistory = inels_data.setdefault(SENSOR_HISTORY, InelsHistory())
+    bus_sensors = False
 
     entities: "list[InelsSensor]" = []
 
@@ -444,21 +533,56 @@ async def async_setup_entry(
                 descriptions = SENSOR_DESCRIPTION_MULTISENSOR
 
         for description in descriptions:
+            sensor = InelsSensor(
+                # Device(device.mqtt, device.state_topic, title=device.title),
+                device,
+                description=description,
+            )
+            sensor.health = health
+            sensor.history = history.sensor(sensor.unique_id)
+            sensor.history.append(sensor.native_value)
+            sensor.throttle = InelsSensorThrottle.from_options(
+                throttle_options.get(sensor.unique_id)
+            )
+            if sensor.throttle is not None:
+                throttles[sensor.unique_id] = sensor.throttle
+
+            entities.append(sensor)
+
+            if description.error is not None:
+                bus_sensors = True
+
+    metrics: InelsMetrics = inels_data[METRICS]
+    for device in device_list:
+        if device.device_type in (Platform.CLIMATE, Platform.WATER_HEATER):
+            metric_descriptions = VALVE_METRIC_DESCRIPTIONS
+        else:
+            metric_descriptions = OUTPUT_METRIC_DESCRIPTIONS
+
+        for suffix in metric_channels(device):
+            entities.extend(
+                InelsMetricSensor(device, metrics, suffix, description)
+                for description in metric_descriptions
+            )
+
+    if bus_sensors:
+        for health_description in BUS_HEALTH_DESCRIPTIONS:
             entities.append(
-                InelsSensor(
-                    # Device(device.mqtt, device.state_topic, title=device.title),
-                    device,
-                    description=description,
+                InelsBusHealthSensor(
+                    health, config_entry.entry_id, description=health_description
                 )
             )
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class InelsSensor(InelsBaseEntity, SensorEntity):
     """The platform class required by Home Assistant."""
 
     entity_description: InelsSensorEntityDescription
+    throttle: InelsSensorThrottle | None = None
+    health: InelsBusHealth | None = None
+    history: InelsSensorHistory | None = None
 
     def __init__(
         self,
@@ -467,6 +591,8 @@ class InelsSensor(InelsBaseEntity, SensorEntity):
     ) -> None:
         """Initialize a sensor."""
         super().__init__(device=device)
+        self._trailing: CALLBACK_TYPE | None = None
+        self._held: tuple[Any, str | None] | None = None
 
         self.entity_description = description
         self._attr_unique_id = f"{self._attr_unique_id}-{description.key}"
@@ -474,21 +600,168 @@ class InelsSensor(InelsBaseEntity, SensorEntity):
         if description.name:
             self._attr_name = f"{self._attr_name}-{description.name}"
 
-        value = self.entity_description.value(self._device)
+        self._attr_native_value, error = self._decode(current_state(self._device))
+        self._update_error(error)
+
+    def _get_error(self, state: InelsDeviceState) -> str | None:
+        """Get bus error if the description reports errors."""
+        if self.entity_description.error is None:
+            return None
+
+        return self.entity_description.error(state)
+
+    def _update_error(self, error: str | None) -> None:
+        """Set bus error attribute if the description reports errors."""
+        if self.entity_description.error is None:
+            return
 
-        self._attr_native_value = value  # removed?
+        self._attr_extra_state_attributes = _BUS_ERROR_ATTRIBUTES.get(error) or {
+            ATTR_BUS_ERROR: error
+        }
 
     # TODO: GOLD MINE
     async def async_added_to_hass(self) -> None:
         """Add subscription of the data listener"""
-        self.async_on_remove(
-            self._device.subscribe_listener(self._attr_unique_id, self._callback)
-        )
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_trailing)
+
+        if self.throttle is not None and self.throttle.heartbeat:
+            self.async_on_remove(
+                async_track_time_interval(
+                    self.hass,
+                    self._async_heartbeat,
+                    timedelta(seconds=self.throttle.heartbeat),
+                )
+            )
 
-    def _callback(self, new_value: Any) -> None:
+    @callback
+    def _async_heartbeat(self, now: Any) -> None:
+        """Write the latest value when the sensor was silent too long."""
+        monotonic = time.monotonic()
+        if not self.throttle.is_silent(monotonic):
+            return
+
+        self._attr_native_value, error = self._decode(current_state(self._device))
+        self._update_error(error)
+        self.throttle.record_write(self._attr_native_value, monotonic)
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_trailing(self) -> None:
+        """Cancel the pending trailing write."""
+        if self._trailing is not None:
+            self._trailing()
+            self._trailing = None
+
+    @callback
+    def _async_trailing(self, now: Any) -> None:
+        """Write the last value held back by the minimum interval."""
+        self._trailing = None
+        if self._held is None:
+            return
+
+        new_value, self._held = self._held, None
+        if self.throttle.should_flush(new_value[0], time.monotonic()):
+            self._write(new_value)
+
+    def _decode(self, state: InelsDeviceState) -> tuple[Any, str | None]:
+        """Decode value and bus error of the sensor from the device state."""
+        return self.entity_description.value(state), self._get_error(state)
+
+    @callback
+    def _callback(self, new_value: tuple[Any, str | None]) -> None:
         """Refresh data."""
-        val = self.entity_description.value(self._device)
-        self._attr_native_value = val
+        value, error = new_value
+
+        if error is not None and self.health is not None:
+            self.health.record(self._device_id, self._parent_id, error)
+
+        if self.history is not None:
+            self.history.append(value)
+
+        monotonic = time.monotonic()
+        if self.throttle is not None:
+            if not self.throttle.should_write(value, monotonic):
+                # only a value held back by the interval gets a trailing write
+                self._held = new_value if self.throttle.pending else None
+                if self.throttle.pending and self._trailing is None:
+                    self._trailing = async_call_later(
+                        self.hass,
+                        self.throttle.remaining(monotonic),
+                        self._async_trailing,
+                    )
+                return
+            self._held = None
+
+        self._write(new_value)
+
+    @callback
+    def _write(self, new_value: tuple[Any, str | None]) -> None:
+        """Write the value and bus error."""
+        value, error = new_value
+        self._attr_native_value = value
+        self._update_error(error)
 
         # callback later after updating local val # what is this for?
         super()._callback(new_value)
+
+
+class InelsMetricSensor(InelsBaseEntity, SensorEntity):
+    """Derived metric of a device output."""
+
+    def __init__(
+        self,
+        device: Device,
+        metrics: InelsMetrics,
+        suffix: str,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize a metric sensor."""
+        super().__init__(device=device)
+
+        self.entity_description = description
+        self._metrics = metrics
+        self._channel = f"{self._device_key}{suffix}"
+
+        self._attr_unique_id = f"{self._channel}-{description.key}"
+        self._attr_name = f"{self._attr_name}{suffix}-{description.name}"
+
+    @property
+    def native_value(self) -> float | None:
+        """Value of the metric, written on every status frame of the device."""
+        return self._metrics.value(self._channel, self.entity_description.key)
+
+
+class InelsBusHealthSensor(SensorEntity):
+    """Summary of the bus errors across the installation."""
+
+    entity_description: InelsBusHealthEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        health: InelsBusHealth,
+        entry_id: str,
+        description: InelsBusHealthEntityDescription,
+    ) -> None:
+        """Initialize a bus health sensor."""
+        self._health = health
+        self.entity_description = description
+
+        self._attr_unique_id = f"{entry_id}-{description.key}"
+        self._attr_name = f"{TITLE}-{description.name}"
+
+        self._refresh()
+
+    async def async_update(self) -> None:
+        """Refresh the summary from the health monitor."""
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Read the summary from the health monitor."""
+        self._attr_native_value = self.entity_description.value(self._health)
+
+        if self.entity_description.attributes is not None:
+            self._attr_extra_state_attributes = self.entity_description.attributes(
+                self._health
+            )
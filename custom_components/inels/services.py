@@ -0,0 +1,510 @@
+"""Services of the iNELS integration."""
+from __future__ import annotations
+
+from copy import deepcopy
+from dataclasses import dataclass
+from datetime import timedelta
+import time
+from typing import Any
+
+from inelsmqtt.const import STOP_DOWN, STOP_UP
+from inelsmqtt.devices import Device
+import voluptuous as vol
+
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    ATTR_TEMPERATURE,
+    CONF_NAME,
+    STATE_CLOSED,
+    STATE_OPEN,
+    Platform,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import slugify
+import homeassistant.util.dt as dt_util
+
+from .base_class import device_key
+from .commands import (
+    DEFAULT_PACE,
+    DEFAULT_TIMEOUT,
+    DEFAULT_WINDOW,
+    InelsCommand,
+    async_send_commands,
+    async_send_pipelined,
+    encode_command,
+    frame_confirm,
+    setpoint_confirm,
+    setpoint_value,
+    value_confirm,
+)
+from .const import (
+    ATTR_DURATION,
+    ATTR_INTERVAL,
+    ATTR_ITEMS,
+    ATTR_PACE,
+    ATTR_RESULTS,
+    ATTR_SETPOINTS,
+    ATTR_TIMEOUT,
+    ATTR_TOP,
+    ATTR_VALUE,
+    ATTR_WINDOW,
+    COMMAND_TRACKER,
+    DEVICES,
+    DOMAIN,
+    EVENT_SET_MANY_RESULT,
+    LOGGER,
+    PROFILER,
+    SCENES,
+    SCHEDULER,
+    SERVICE_CREATE_SCENE,
+    SERVICE_DELETE_SCENE,
+    SERVICE_PROFILE_START,
+    SERVICE_PROFILE_STOP,
+    SERVICE_SET_MANY,
+    SERVICE_SET_SETPOINTS,
+    SIGNAL_SCENE_ADDED,
+    SIGNAL_SCENE_REMOVED,
+)
+from .profiler import InelsProfiler
+from .scheduler import context_priority
+
+SETPOINT_PLATFORMS = (Platform.CLIMATE, Platform.WATER_HEATER)
+
+SETPOINT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Required(ATTR_TEMPERATURE): vol.Coerce(float),
+    }
+)
+
+SET_SETPOINTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_SETPOINTS): vol.All(cv.ensure_list, [SETPOINT_SCHEMA]),
+        vol.Optional(ATTR_PACE, default=DEFAULT_PACE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=1)
+        ),
+        vol.Optional(ATTR_TIMEOUT, default=DEFAULT_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=300)
+        ),
+    }
+)
+
+
+SET_MANY_PLATFORMS = (Platform.SWITCH, Platform.LIGHT, Platform.COVER)
+
+COVER_VALUES = [STATE_OPEN, STATE_CLOSED, STOP_UP, STOP_DOWN]
+
+SET_MANY_ITEM_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Required(ATTR_VALUE): vol.Any(bool, vol.Coerce(float), cv.string),
+    }
+)
+
+SET_MANY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ITEMS): vol.All(cv.ensure_list, [SET_MANY_ITEM_SCHEMA]),
+        vol.Optional(ATTR_WINDOW, default=DEFAULT_WINDOW): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=64)
+        ),
+        vol.Optional(ATTR_TIMEOUT, default=DEFAULT_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=300)
+        ),
+    }
+)
+
+SCENE_PLATFORMS = (
+    Platform.SWITCH,
+    Platform.LIGHT,
+    Platform.COVER,
+    Platform.CLIMATE,
+    Platform.WATER_HEATER,
+)
+
+CREATE_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+
+DELETE_SCENE_SCHEMA = vol.Schema({vol.Required(ATTR_ENTITY_ID): cv.entity_ids})
+
+PROFILE_START_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=600)
+        ),
+        vol.Optional(ATTR_INTERVAL, default=0.005): vol.All(
+            vol.Coerce(float), vol.Range(min=0.001, max=1)
+        ),
+        vol.Optional(ATTR_TOP, default=20): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=200)
+        ),
+    }
+)
+
+
+@dataclass
+class InelsTarget:
+    """iNELS device behind an entity."""
+
+    entry_id: str
+    device: Device
+    domain: str
+    channel: int | None = None
+
+
+def _async_resolve_devices(
+    hass: HomeAssistant, entity_ids: list[str], platforms: tuple[str, ...]
+) -> dict[str, InelsTarget]:
+    """Map entity ids to config entry id and device of the iNELS entities."""
+    registry = er.async_get(hass)
+    indexes: dict[str, dict[str, Device]] = {}
+    resolved: dict[str, InelsTarget] = {}
+
+    for entity_id in entity_ids:
+        entry = registry.async_get(entity_id)
+
+        if (
+            entry is None
+            or entry.platform != DOMAIN
+            or entry.domain not in platforms
+            or entry.config_entry_id not in hass.data.get(DOMAIN, {})
+        ):
+            raise HomeAssistantError(
+                f"{entity_id} is not an iNELS entity of {', '.join(platforms)}"
+            )
+
+        if entry.config_entry_id not in indexes:
+            indexes[entry.config_entry_id] = {
+                device_key(device): device
+                for device in hass.data[DOMAIN][entry.config_entry_id][DEVICES]
+            }
+        index = indexes[entry.config_entry_id]
+
+        channel = None
+        device = index.get(entry.unique_id)
+        if device is None:
+            # channels of multi channel devices have their index appended
+            key, _, suffix = entry.unique_id.rpartition("-")
+            if suffix.isdigit():
+                device = index.get(key)
+                channel = int(suffix)
+
+        if device is None:
+            raise HomeAssistantError(f"{entity_id} has no iNELS device")
+
+        resolved[entity_id] = InelsTarget(
+            entry.config_entry_id, device, entry.domain, channel
+        )
+
+    return resolved
+
+
+async def async_set_setpoints(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Set required temperature of many thermostats in one burst."""
+    start = time.monotonic()
+    targets = [
+        (entity_id, setpoint[ATTR_TEMPERATURE])
+        for setpoint in call.data[ATTR_SETPOINTS]
+        for entity_id in setpoint[ATTR_ENTITY_ID]
+    ]
+    devices = _async_resolve_devices(
+        hass, [entity_id for entity_id, _ in targets], SETPOINT_PLATFORMS
+    )
+
+    batches: dict[str, list[InelsCommand]] = {}
+    for entity_id, temperature in targets:
+        device = devices[entity_id].device
+        batches.setdefault(devices[entity_id].entry_id, []).append(
+            encode_command(
+                device,
+                setpoint_value(device, temperature),
+                confirm=setpoint_confirm(temperature),
+            )
+        )
+
+    confirmed = 0
+    for entry_id, commands in batches.items():
+        results = await async_send_commands(
+            hass.data[DOMAIN][entry_id][SCHEDULER],
+            hass.data[DOMAIN][entry_id][COMMAND_TRACKER],
+            commands,
+            pace=call.data[ATTR_PACE],
+            timeout=call.data[ATTR_TIMEOUT],
+            priority=context_priority(call.context),
+        )
+        confirmed += sum(results)
+
+        for command, result in zip(commands, results):
+            if not result:
+                LOGGER.warning(
+                    "Setpoint of %s was not confirmed", device_key(command.device)
+                )
+
+    LOGGER.info(
+        "Set %d setpoints, %d confirmed in %.2f s",
+        len(targets),
+        confirmed,
+        time.monotonic() - start,
+    )
+
+
+def _set_many_value(target: InelsTarget, value: Any, ha_value: Any) -> Any:
+    """Convert service value into ha value of the target device."""
+    if target.domain == Platform.SWITCH:
+        return cv.boolean(value)
+
+    if target.domain == Platform.COVER:
+        return vol.In(COVER_VALUES)(value)
+
+    if isinstance(value, (bool, str)):
+        brightness = 100 if cv.boolean(value) else 0
+    else:
+        brightness = min(max(int(value), 0), 100)
+
+    if target.channel is None:
+        return brightness
+
+    ha_value.out[target.channel] = brightness
+    return ha_value
+
+
+async def async_set_many(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Send values to many switches, lights, channels and covers at once."""
+    start = time.monotonic()
+    items = call.data[ATTR_ITEMS]
+    targets = _async_resolve_devices(
+        hass, [item[ATTR_ENTITY_ID] for item in items], SET_MANY_PLATFORMS
+    )
+
+    # one frame per device, channels of the same device are merged into it
+    values: dict[tuple[str, str], Any] = {}
+    entities: dict[tuple[str, str], list[str]] = {}
+    for item in items:
+        target = targets[item[ATTR_ENTITY_ID]]
+        key = (target.entry_id, device_key(target.device))
+
+        if key not in values and target.channel is not None:
+            values[key] = deepcopy(target.device.values.ha_value)
+
+        try:
+            values[key] = _set_many_value(target, item[ATTR_VALUE], values.get(key))
+        except vol.Invalid as exc:
+            raise HomeAssistantError(
+                f"Invalid value {item[ATTR_VALUE]} for {item[ATTR_ENTITY_ID]}"
+            ) from exc
+        entities.setdefault(key, []).append(item[ATTR_ENTITY_ID])
+
+    batches: dict[str, list[tuple[tuple[str, str], InelsCommand]]] = {}
+    for key, ha_value in values.items():
+        device = targets[entities[key][0]].device
+        confirm = (
+            frame_confirm
+            if targets[entities[key][0]].domain == Platform.COVER
+            else value_confirm(ha_value)
+        )
+        batches.setdefault(key[0], []).append(
+            (key, encode_command(device, ha_value, confirm))
+        )
+
+    results: dict[str, bool] = {}
+    for entry_id, batch in batches.items():
+        sent = await async_send_pipelined(
+            hass.data[DOMAIN][entry_id][SCHEDULER],
+            hass.data[DOMAIN][entry_id][COMMAND_TRACKER],
+            [command for _, command in batch],
+            window=call.data[ATTR_WINDOW],
+            timeout=call.data[ATTR_TIMEOUT],
+            priority=context_priority(call.context),
+        )
+        for (key, _), result in zip(batch, sent):
+            for entity_id in entities[key]:
+                results[entity_id] = result
+
+    duration = time.monotonic() - start
+    hass.bus.async_fire(
+        EVENT_SET_MANY_RESULT,
+        {ATTR_RESULTS: results, ATTR_DURATION: round(duration, 3)},
+    )
+    LOGGER.info(
+        "Set %d entities in %d frames, %d confirmed in %.2f s",
+        len(items),
+        len(values),
+        sum(results.values()),
+        duration,
+    )
+
+
+async def async_create_scene(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Capture current state of the devices into the frames of a scene."""
+    targets = _async_resolve_devices(
+        hass, call.data[ATTR_ENTITY_ID], SCENE_PLATFORMS
+    )
+    entry_ids = {target.entry_id for target in targets.values()}
+    if len(entry_ids) != 1:
+        raise HomeAssistantError("Scene devices must belong to one iNELS broker")
+    entry_id = entry_ids.pop()
+
+    commands: dict[str, InelsCommand] = {}
+    for target in targets.values():
+        key = device_key(target.device)
+        if key not in commands:
+            commands[key] = encode_command(
+                target.device, deepcopy(target.device.values.ha_value)
+            )
+
+    scene_id = slugify(call.data[CONF_NAME])
+    hass.data[DOMAIN][entry_id][SCENES].async_set(
+        scene_id, call.data[CONF_NAME], list(commands.values())
+    )
+    async_dispatcher_send(hass, SIGNAL_SCENE_ADDED.format(entry_id), scene_id)
+
+
+async def async_delete_scene(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Delete iNELS scenes."""
+    registry = er.async_get(hass)
+
+    for entity_id in call.data[ATTR_ENTITY_ID]:
+        entry = registry.async_get(entity_id)
+        if (
+            entry is None
+            or entry.platform != DOMAIN
+            or entry.domain != Platform.SCENE
+            or entry.config_entry_id not in hass.data.get(DOMAIN, {})
+        ):
+            raise HomeAssistantError(f"{entity_id} is not an iNELS scene")
+
+        scene_id = entry.unique_id.split("-scene-", 1)[1]
+        hass.data[DOMAIN][entry.config_entry_id][SCENES].async_delete(scene_id)
+        async_dispatcher_send(
+            hass, SIGNAL_SCENE_REMOVED.format(entry.config_entry_id), scene_id
+        )
+        registry.async_remove(entity_id)
+
+
+async def async_profile_start(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Start sampling the iNELS code paths for a bounded window."""
+    if PROFILER in hass.data:
+        raise HomeAssistantError("iNELS profiler is already running")
+
+    profiler = InelsProfiler(call.data[ATTR_INTERVAL])
+    profiler.start()
+
+    async def _async_timeout(now: Any) -> None:
+        await async_profile_stop(hass, call.data[ATTR_TOP])
+
+    cancel: CALLBACK_TYPE = async_call_later(
+        hass, timedelta(seconds=call.data[ATTR_DURATION]), _async_timeout
+    )
+    hass.data[PROFILER] = (profiler, cancel, call.data[ATTR_TOP])
+
+    LOGGER.warning(
+        "iNELS profiler started for %.0f s, sampling every %.3f s",
+        call.data[ATTR_DURATION],
+        call.data[ATTR_INTERVAL],
+    )
+
+
+async def async_profile_stop(hass: HomeAssistant, top: int | None = None) -> None:
+    """Stop the profiler, write the flamegraph file and log the summary."""
+    if PROFILER not in hass.data:
+        return
+
+    profiler, cancel, default_top = hass.data.pop(PROFILER)
+    cancel()
+    await hass.async_add_executor_job(profiler.stop)
+
+    path = hass.config.path(
+        f"inels_profile_{dt_util.utcnow().strftime('%Y%m%d_%H%M%S')}.folded"
+    )
+    await hass.async_add_executor_job(profiler.write_folded, path)
+
+    summary = "\n".join(
+        f"{own:>8} {total:>8}  {name}"
+        for name, own, total in profiler.top(top or default_top)
+    )
+    LOGGER.warning(
+        "iNELS profiler took %d samples, %d stacks in iNELS code, written to %s\n"
+        "     own    total  function\n%s",
+        profiler.samples,
+        sum(profiler.stacks.values()),
+        path,
+        summary,
+    )
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the iNELS services."""
+    if hass.services.has_service(DOMAIN, SERVICE_SET_SETPOINTS):
+        return
+
+    async def _async_set_setpoints(call: ServiceCall) -> None:
+        await async_set_setpoints(hass, call)
+
+    async def _async_set_many(call: ServiceCall) -> None:
+        await async_set_many(hass, call)
+
+    async def _async_create_scene(call: ServiceCall) -> None:
+        await async_create_scene(hass, call)
+
+    async def _async_delete_scene(call: ServiceCall) -> None:
+        await async_delete_scene(hass, call)
+
+    async def _async_profile_start(call: ServiceCall) -> None:
+        await async_profile_start(hass, call)
+
+    async def _async_profile_stop(call: ServiceCall) -> None:
+        await async_profile_stop(hass)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_SETPOINTS,
+        _async_set_setpoints,
+        schema=SET_SETPOINTS_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_MANY,
+        _async_set_many,
+        schema=SET_MANY_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CREATE_SCENE,
+        _async_create_scene,
+        schema=CREATE_SCENE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DELETE_SCENE,
+        _async_delete_scene,
+        schema=DELETE_SCENE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_START,
+        _async_profile_start,
+        schema=PROFILE_START_SCHEMA,
+    )
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE_STOP, _async_profile_stop)
+
+
+async def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the iNELS services."""
+    await async_profile_stop(hass)
+
+    for service in (
+        SERVICE_SET_SETPOINTS,
+        SERVICE_SET_MANY,
+        SERVICE_CREATE_SCENE,
+        SERVICE_DELETE_SCENE,
+        SERVICE_PROFILE_START,
+        SERVICE_PROFILE_STOP,
+    ):
+        hass.services.async_remove(DOMAIN, service)
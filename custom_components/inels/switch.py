@@ -1,7 +1,6 @@
 """Inels switch entity."""
 from __future__ import annotations
 
-from collections.abc import Mapping
 from typing import Any
 
 from inelsmqtt.devices.switch import Switch
@@ -18,7 +17,8 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .base_class import InelsBaseEntity
-from .const import DEVICES, DOMAIN, ICON_SWITCH
+from .const import DELIVERY, DEVICE_HUBS, DEVICES, DOMAIN, ICON_SWITCH
+from .groups import InelsGroupEntity, entry_groups
 
 
 async def async_setup_entry(
@@ -38,18 +38,34 @@ async def async_setup_entry(
                 entities.append(InelsSwitch(device=device))
                 # LOGGER.info("Added SA3_01B (%s)", device.get_unique_id())
 
+    inels_data = hass.data[DOMAIN][config_entry.entry_id]
+    for group in entry_groups(inels_data, config_entry.options):
+        if not group.dimmable:
+            entities.append(
+                InelsGroupSwitch(
+                    config_entry.entry_id,
+                    group,
+                    inels_data[DEVICE_HUBS],
+                    inels_data[DELIVERY],
+                )
+            )
+
     async_add_entities(entities)
 
 
+def feature_attributes(device: Switch) -> dict[str, Any] | None:
+    """Build feature attributes from the device state."""
+    if device.features is None:
+        return None
+
+    state = device.state.__dict__
+    return {feature: state.get(feature) for feature in device.features}
+
+
 class InelsSwitch(InelsBaseEntity, SwitchEntity):
     """The platform class required by Home Assistant."""
 
-    def __init__(self, device: Switch) -> None:
-        """Initialize a switch."""
-        super().__init__(device=device)
-
-        self._state_attrs = {}
-        self.set_state_attrs(self._device.features)
+    _attr_icon = ICON_SWITCH
 
     @property
     def is_on(self) -> bool:
@@ -59,53 +75,27 @@ class InelsSwitch(InelsBaseEntity, SwitchEntity):
         return state.on
 
     @property
-    def icon(self) -> str | None:
-        """Switch icon."""
-        return ICON_SWITCH
-
-    @property
-    def extra_state_attributes(self) -> Mapping[str, Any] | None:
-        """Extra attributes if exists."""
-        if self._state_attrs is None:
-            return super().extra_state_attributes
-        return self._state_attrs
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Feature attributes, built only when the state is written."""
+        return feature_attributes(self._device)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Instruct the switch to turn off."""
         if not self._device.is_available:
             return None
-        await self.hass.async_add_executor_job(self._device.set_ha_value, False)
+        await self._async_set_ha_value(False)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Instruct the switch to turn on."""
         if not self._device.is_available:
             return None
-        await self.hass.async_add_executor_job(self._device.set_ha_value, True)
-
-    def set_state_attrs(self, features: dict[str, Any]) -> None:
-        """Set state attributes."""
-        if features is None:
-            return
-
-        for feature in features:
-            self._state_attrs[feature] = self._device.state.__dict__.get(feature)
-
-    def _callback(self, new_value: Any) -> None:
-        """Get callback data from the broker."""
-        self.set_state_attrs(self._device.features)  # set the new attribute values
-
-        super()._callback(new_value)
+        await self._async_set_ha_value(True)
 
 
 class InelsComplexSwitch(InelsBaseEntity, SwitchEntity):
     """The platform class required by Home Assistant."""
 
-    def __init__(self, device: Switch) -> None:
-        """Initialize a switch."""
-        super().__init__(device=device)
-
-        self._state_attrs = {}
-        self.set_state_attrs(self._device.features)
+    _attr_icon = ICON_SWITCH
 
     @property
     def is_on(self) -> bool:
@@ -115,16 +105,9 @@ class InelsComplexSwitch(InelsBaseEntity, SwitchEntity):
         return state.on
 
     @property
-    def icon(self) -> str | None:
-        """Switch icon."""
-        return ICON_SWITCH
-
-    @property
-    def extra_state_attributes(self) -> Mapping[str, Any] | None:
-        """Extra attributes if exists."""
-        if self._state_attrs is None:
-            return super().extra_state_attributes
-        return self._state_attrs
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Feature attributes, built only when the state is written."""
+        return feature_attributes(self._device)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Instruct the switch to turn off."""
@@ -133,7 +116,7 @@ class InelsComplexSwitch(InelsBaseEntity, SwitchEntity):
 
         ha_val = self._device.get_value().ha_value
         ha_val.on = False
-        await self.hass.async_add_executor_job(self._device.set_ha_value, ha_val)
+        await self._async_set_ha_value(ha_val)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Instruct the switch to turn on."""
@@ -142,18 +125,14 @@ class InelsComplexSwitch(InelsBaseEntity, SwitchEntity):
 
         ha_val = self._device.get_value().ha_value
         ha_val.on = True
-        await self.hass.async_add_executor_job(self._device.set_ha_value, ha_val)
+        await self._async_set_ha_value(ha_val)
 
-    def set_state_attrs(self, features: dict[str, Any]) -> None:
-        """Set state attributes."""
-        if features is None:
-            return
 
-        for feature in features:
-            self._state_attrs[feature] = self._device.state.__dict__.get(feature)
+class InelsGroupSwitch(InelsGroupEntity, SwitchEntity):
+    """Group of switches turned with one batch of frames."""
 
-    def _callback(self, new_value: Any) -> None:
-        """Get callback data from the broker."""
-        self.set_state_attrs(self._device.features)  # set the new attribute values
+    _attr_icon = ICON_SWITCH
 
-        super()._callback(new_value)
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Turn all members on."""
+        await self._async_set_level(100)
@@ -0,0 +1,153 @@
+"""Deadband and publish interval throttling for iNELS sensors."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from .const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_RELATIVE,
+    CONF_HEARTBEAT,
+    CONF_MIN_INTERVAL,
+)
+
+
+class InelsSensorThrottle:
+    """Decide whether a new sensor value is worth a state write."""
+
+    __slots__ = (
+        "deadband",
+        "deadband_relative",
+        "min_interval",
+        "heartbeat",
+        "suppressed",
+        "written",
+        "pending",
+        "_last_value",
+        "_last_write",
+    )
+
+    def __init__(
+        self,
+        deadband: float = 0.0,
+        deadband_relative: float = 0.0,
+        min_interval: float = 0.0,
+        heartbeat: float = 0.0,
+    ) -> None:
+        """Init throttle. Deadband relative is in percent, intervals in seconds."""
+        self.deadband = deadband
+        self.deadband_relative = deadband_relative
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+
+        self.suppressed = 0
+        self.written = 0
+        self.pending = False
+        self._last_value: Any = None
+        self._last_write: float | None = None
+
+    @classmethod
+    def from_options(
+        cls, options: Mapping[str, Any] | None
+    ) -> InelsSensorThrottle | None:
+        """Create throttle from the sensor options. None when nothing is set."""
+        if not options:
+            return None
+
+        throttle = cls(
+            deadband=float(options.get(CONF_DEADBAND, 0.0)),
+            deadband_relative=float(options.get(CONF_DEADBAND_RELATIVE, 0.0)),
+            min_interval=float(options.get(CONF_MIN_INTERVAL, 0.0)),
+            heartbeat=float(options.get(CONF_HEARTBEAT, 0.0)),
+        )
+
+        if not (
+            throttle.deadband
+            or throttle.deadband_relative
+            or throttle.min_interval
+            or throttle.heartbeat
+        ):
+            return None
+
+        return throttle
+
+    def is_silent(self, now: float) -> bool:
+        """Return True when the heartbeat expired since the last write."""
+        return (
+            self.heartbeat > 0
+            and self._last_write is not None
+            and now - self._last_write >= self.heartbeat
+        )
+
+    def should_write(self, value: Any, now: float) -> bool:
+        """Return True if the value has to be written, otherwise count it."""
+        if self._accept(value, now):
+            self.record_write(value, now)
+            return True
+
+        self.suppressed += 1
+        self.pending = self.remaining(now) > 0
+        return False
+
+    def should_flush(self, value: Any, now: float) -> bool:
+        """Return True if the value held back by the interval has to be written."""
+        self.pending = False
+        if self._accept(value, now):
+            self.record_write(value, now)
+            return True
+        return False
+
+    def remaining(self, now: float) -> float:
+        """Return seconds until the minimum interval since the last write passed."""
+        if not self.min_interval or self._last_write is None:
+            return 0.0
+        return max(self.min_interval - (now - self._last_write), 0.0)
+
+    def record_write(self, value: Any, now: float) -> None:
+        """Remember the written value."""
+        self.written += 1
+        self.pending = False
+        self._last_value = value
+        self._last_write = now
+
+    def _accept(self, value: Any, now: float) -> bool:
+        """Check the value against the interval and deadband limits."""
+        last = self._last_value
+
+        if (
+            self._last_write is None
+            or not isinstance(value, (int, float))
+            or not isinstance(last, (int, float))
+        ):
+            return True
+
+        if self.is_silent(now):
+            return True
+
+        if self.min_interval and now - self._last_write < self.min_interval:
+            return False
+
+        delta = abs(value - last)
+
+        if self.deadband and delta < self.deadband:
+            return False
+
+        if (
+            self.deadband_relative
+            and last != 0
+            and delta / abs(last) * 100 < self.deadband_relative
+        ):
+            return False
+
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return throttle settings and counters."""
+        return {
+            CONF_DEADBAND: self.deadband,
+            CONF_DEADBAND_RELATIVE: self.deadband_relative,
+            CONF_MIN_INTERVAL: self.min_interval,
+            CONF_HEARTBEAT: self.heartbeat,
+            "written": self.written,
+            "suppressed": self.suppressed,
+        }
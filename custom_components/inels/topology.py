@@ -0,0 +1,55 @@
+"""Gateway topology of the discovered devices."""
+from __future__ import annotations
+
+from typing import Any
+
+from inelsmqtt.devices import Device
+
+from .base_class import device_key
+
+
+def gateway_connected_topic(device: Device) -> str:
+    """Return the connected topic of the gateway of the device."""
+    # inels/connected/{mac}/{type}/{id} -> inels/connected/{mac}/gw
+    return f"{device.connected_topic.rsplit('/', 2)[0]}/gw"
+
+
+class InelsTopology:
+    """Gateway to devices index built once from the discovery.
+
+    Gateways are keyed by their MAC, the parent id of the devices behind them.
+    """
+
+    def __init__(self, devices: list[Device]) -> None:
+        """Index devices by their gateway."""
+        self.parents: dict[str, str] = {}
+        self.children: dict[str, list[str]] = {}
+        self.connected_topics: dict[str, str] = {}
+
+        for device in devices:
+            key = device_key(device)
+            self.parents[key] = device.parent_id
+            self.children.setdefault(device.parent_id, []).append(key)
+            if device.parent_id not in self.connected_topics:
+                self.connected_topics[device.parent_id] = gateway_connected_topic(
+                    device
+                )
+
+    @property
+    def gateways(self) -> list[str]:
+        """Return MACs of the gateways."""
+        return list(self.children)
+
+    def subtree(self, gateway: str) -> list[str]:
+        """Return keys of the devices behind the gateway."""
+        return self.children.get(gateway, [])
+
+    def gateway(self, key: str) -> str | None:
+        """Return MAC of the gateway of the device."""
+        return self.parents.get(key)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return device count of every gateway."""
+        return {
+            "gateways": {mac: len(keys) for mac, keys in self.children.items()},
+        }
@@ -0,0 +1,159 @@
+"""TLS, keepalive and reconnect settings of the broker connection."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from functools import lru_cache
+import ssl
+from typing import Any
+
+from inelsmqtt import InelsMqtt
+
+from homeassistant.const import CONF_VERIFY_SSL
+
+from .const import (
+    CONF_CA_CERT,
+    CONF_CLIENT_CERT,
+    CONF_CLIENT_KEY,
+    CONF_KEEPALIVE,
+    CONF_RECONNECT_MAX,
+    CONF_RECONNECT_MIN,
+    CONF_TLS,
+)
+
+DEFAULT_KEEPALIVE = 60  # s
+DEFAULT_RECONNECT_MIN = 1  # s
+DEFAULT_RECONNECT_MAX = 120  # s
+
+TRANSPORT_OPTIONS = (
+    CONF_TLS,
+    CONF_CA_CERT,
+    CONF_CLIENT_CERT,
+    CONF_CLIENT_KEY,
+    CONF_VERIFY_SSL,
+    CONF_KEEPALIVE,
+    CONF_RECONNECT_MIN,
+    CONF_RECONNECT_MAX,
+)
+TLS_OPTIONS = TRANSPORT_OPTIONS[:5]
+
+
+class InelsTlsSocket(ssl.SSLSocket):
+    """TLS socket handing its session back to the context when closed."""
+
+    def close(self) -> None:
+        """Keep the session for the next connection."""
+        context = self.context
+        if isinstance(context, InelsTlsContext):
+            context.keep_session(self)
+        super().close()
+
+
+class InelsTlsContext(ssl.SSLContext):
+    """Client context resuming the TLS session of the previous connection."""
+
+    sslsocket_class = InelsTlsSocket
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> InelsTlsContext:
+        """Create client context."""
+        context = super().__new__(cls, ssl.PROTOCOL_TLS_CLIENT)
+        context.last_session = None
+        context.handshakes = 0
+        context.resumed = 0
+        return context
+
+    def wrap_socket(self, sock: Any, *args: Any, **kwargs: Any) -> ssl.SSLSocket:
+        """Wrap the socket, offering the kept session to the broker."""
+        if kwargs.get("session") is None and self.last_session is not None:
+            kwargs["session"] = self.last_session
+        self.handshakes += 1
+        return super().wrap_socket(sock, *args, **kwargs)
+
+    def keep_session(self, sock: ssl.SSLSocket) -> None:
+        """Keep session of the closing socket."""
+        try:
+            session = sock.session
+            reused = sock.session_reused
+        except (OSError, ValueError):
+            return
+
+        if session is not None:
+            self.last_session = session
+        if reused:
+            self.resumed += 1
+
+    def as_dict(self) -> dict[str, int]:
+        """Return handshake counters."""
+        return {"handshakes": self.handshakes, "resumed": self.resumed}
+
+
+def tls_settings(config: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the TLS settings of the connection."""
+    return {key: config.get(key) for key in TLS_OPTIONS}
+
+
+def build_tls_context(config: Mapping[str, Any]) -> InelsTlsContext | None:
+    """Create TLS context, None for plain connection. Blocking, reads the files."""
+    if not config.get(CONF_TLS):
+        return None
+
+    context = InelsTlsContext()
+    if config.get(CONF_CA_CERT):
+        context.load_verify_locations(cafile=config[CONF_CA_CERT])
+    else:
+        context.load_default_certs()
+
+    if config.get(CONF_CLIENT_CERT):
+        context.load_cert_chain(
+            config[CONF_CLIENT_CERT], keyfile=config.get(CONF_CLIENT_KEY) or None
+        )
+
+    if config.get(CONF_VERIFY_SSL) is False:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    return context
+
+
+@lru_cache(maxsize=None)
+def keepalive_client_class(base: type) -> type:
+    """Return subclass of the paho client class connecting with the set keepalive.
+
+    inelsmqtt connects with the paho default keepalive and paho has no setter
+    for it, its reconnects reuse the keepalive of the last connect.
+    """
+
+    class InelsKeepaliveClient(base):  # type: ignore[misc,valid-type]
+        """Paho client replacing the keepalive inelsmqtt connects with."""
+
+        inels_keepalive = DEFAULT_KEEPALIVE
+
+        def connect(
+            self,
+            host: str,
+            port: int = 1883,
+            keepalive: int = 60,
+            *args: Any,
+            **kwargs: Any,
+        ) -> Any:
+            """Connect with the configured keepalive."""
+            return super().connect(host, port, self.inels_keepalive, *args, **kwargs)
+
+    return InelsKeepaliveClient
+
+
+def configure_client(
+    mqtt: InelsMqtt, config: Mapping[str, Any], context: InelsTlsContext | None
+) -> None:
+    """Apply TLS, keepalive and reconnect backoff before the client connects."""
+    client = mqtt.client
+
+    if context is not None:
+        client.tls_set_context(context)
+
+    client.reconnect_delay_set(
+        config.get(CONF_RECONNECT_MIN) or DEFAULT_RECONNECT_MIN,
+        config.get(CONF_RECONNECT_MAX) or DEFAULT_RECONNECT_MAX,
+    )
+
+    client.__class__ = keepalive_client_class(type(client))
+    client.inels_keepalive = config.get(CONF_KEEPALIVE) or DEFAULT_KEEPALIVE
@@ -17,6 +17,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .base_class import InelsBaseEntity
+from .commands import setpoint_confirm, setpoint_value
 from .const import (
     DEFAULT_MAX_TEMP,
     DEFAULT_MIN_TEMP,
@@ -115,16 +116,11 @@ class InelsWaterHeater(InelsBaseEntity, WaterHeaterEntity):
             open_in_percentage=_s.open_in_percentage,
         )
 
-        await self.hass.async_add_executor_job(self._device.set_ha_value, new_value)
+        await self._async_set_ha_value(new_value, setpoint_confirm(_s.current))
 
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
-        _s = self._device.state
-        new_value = InelsUtil.new_object(
-            battery=_s.battery,
-            current=_s.current,
-            required=kwargs.get(ATTR_TEMPERATURE),
-            open_in_percentage=_s.open_in_percentage,
-        )
+        temperature = kwargs.get(ATTR_TEMPERATURE)
+        new_value = setpoint_value(self._device, temperature)
 
-        await self.hass.async_add_executor_job(self._device.set_ha_value, new_value)
+        await self._async_set_ha_value(new_value, setpoint_confirm(temperature))
@@ -0,0 +1,63 @@
+"""Websocket commands of the iNELS integration."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+
+from .const import DOMAIN, SENSOR_HISTORY
+from .history import InelsHistory
+
+ATTR_LIMIT = "limit"
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the iNELS websocket commands."""
+    websocket_api.async_register_command(hass, websocket_sensor_history)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/sensor_history",
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+@callback
+def websocket_sensor_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return recent values of an iNELS sensor, oldest first."""
+    entry = er.async_get(hass).async_get(msg[ATTR_ENTITY_ID])
+    inels_data = (
+        hass.data.get(DOMAIN, {}).get(entry.config_entry_id)
+        if entry is not None and entry.platform == DOMAIN
+        else None
+    )
+    history: InelsHistory | None = (
+        inels_data.get(SENSOR_HISTORY) if inels_data is not None else None
+    )
+
+    if history is None or entry.unique_id not in history.sensors:
+        connection.send_error(
+            msg["id"],
+            websocket_api.const.ERR_NOT_FOUND,
+            f"{msg[ATTR_ENTITY_ID]} is not an iNELS sensor with history",
+        )
+        return
+
+    connection.send_result(
+        msg["id"],
+        {
+            ATTR_ENTITY_ID: msg[ATTR_ENTITY_ID],
+            "values": history.sensors[entry.unique_id].as_list(msg.get(ATTR_LIMIT)),
+        },
+    )
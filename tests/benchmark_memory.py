@@ -0,0 +1,173 @@
+"""Memory per entity of synthetic installations, before and after a change.
+
+Run from the repository root, no Home Assistant instance is started:
+
+    python -m tests.benchmark_memory [--before REV] [DEVICES ...]
+
+The entities of the working tree are compared with the ones of the integration
+at REV, by default the first commit of the repository. Needs homeassistant and
+inelsmqtt importable.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib
+import importlib.util
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+from types import ModuleType, SimpleNamespace
+import tracemalloc
+from typing import Any
+
+from inelsmqtt.const import Element
+
+from homeassistant.const import Platform
+
+COUNTS = (1000, 5000, 10000)
+GATEWAYS = 8
+PACKAGE = "custom_components/inels"
+
+
+class SyntheticDevice:
+    """Attributes of an inelsmqtt device read by the entities."""
+
+    def __init__(self, index: int, inels_type: Any, device_type: str, state: Any):
+        """Init device of the gateway chosen by the index."""
+        self.unique_id = f"{index:06X}"
+        self.parent_id = f"{index % GATEWAYS:012X}"
+        self.title = f"Device {index}"
+        self.inels_type = inels_type
+        self.device_type = device_type
+        self.state = state
+        self.values = SimpleNamespace(ha_value=state, inels_value=state)
+        self.features: list[str] | None = None
+        self.is_available = True
+
+
+def _device(index: int) -> SyntheticDevice:
+    """Create switch, RF temperature sensor or two channel dimmer by turns."""
+    kind = index % 3
+    if kind == 0:
+        device = SyntheticDevice(
+            index,
+            Element.RFSTI_11B,
+            Platform.SWITCH,
+            SimpleNamespace(on=1, temperature=21.5),
+        )
+        device.features = ["temperature"]
+    elif kind == 1:
+        device = SyntheticDevice(index, Element.RFTI_10B, "sensor", "00\n" * 16)
+    else:
+        device = SyntheticDevice(
+            index, Element.DA3_22M, "bus", SimpleNamespace(out=[0, 50])
+        )
+        device.features = ["brightness"]
+    return device
+
+
+def _channels(package: dict[str, ModuleType]) -> list[Any]:
+    """Return channel descriptions of the two channel dimmer."""
+    if channels := getattr(package["const"], "DA3_22M_CHANNELS", None):
+        return list(channels)
+    # before the table was shared through const
+    description = package["light"].InelsLightChannelDescription
+    return [description(2, 0), description(2, 1)]
+
+
+def _entities(package: dict[str, ModuleType], device: SyntheticDevice) -> list[Any]:
+    """Create the entities the platforms set up for the device."""
+    if device.device_type == Platform.SWITCH:
+        return [package["switch"].InelsSwitch(device)]
+    if device.inels_type == Element.RFTI_10B:
+        sensor = package["sensor"]
+        return [
+            sensor.InelsSensor(device, description)
+            for description in sensor.SENSOR_DESCRIPTION_TEMPERATURE
+        ]
+    light = package["light"]
+    return [light.InelsLightChannel(device, channel) for channel in _channels(package)]
+
+
+def _import(name: str) -> dict[str, ModuleType]:
+    """Import the platform modules of the integration package."""
+    return {
+        module: importlib.import_module(f"{name}.{module}")
+        for module in ("const", "switch", "sensor", "light")
+    }
+
+
+def _import_revision(rev: str, directory: Path) -> dict[str, ModuleType]:
+    """Import the integration at the revision under its own package name."""
+    archive = subprocess.run(
+        ["git", "archive", rev, PACKAGE], check=True, capture_output=True
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", str(directory)], input=archive, check=True)
+
+    name = "inels_before"
+    path = directory / PACKAGE
+    spec = importlib.util.spec_from_file_location(
+        name, path / "__init__.py", submodule_search_locations=[str(path)]
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return _import(name)
+
+
+def measure(package: dict[str, ModuleType], count: int) -> tuple[int, float]:
+    """Return entity count and bytes per entity."""
+    devices = [_device(index) for index in range(count)]
+    gc.collect()
+    tracemalloc.start()
+
+    start = tracemalloc.get_traced_memory()[0]
+    entities = [entity for device in devices for entity in _entities(package, device)]
+    gc.collect()
+    done = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.stop()
+    return len(entities), (done - start) / len(entities)
+
+
+def main(argv: list[str]) -> None:
+    """Print bytes per entity before and after for each installation size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--before", help="revision to compare with")
+    parser.add_argument("devices", nargs="*", type=int, default=list(COUNTS))
+    args = parser.parse_args(argv)
+
+    before_rev = (
+        args.before
+        or subprocess.run(
+            ["git", "rev-list", "--max-parents=0", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()[0]
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        before = _import_revision(before_rev, Path(directory))
+        after = _import("custom_components.inels")
+
+        print(f"before: {before_rev[:10]}, after: working tree")
+        print(
+            f"{'devices':>8} {'entities':>9} {'B/entity before':>16} "
+            f"{'B/entity after':>15} {'change':>7}"
+        )
+        for count in args.devices:
+            entities, per_before = measure(before, count)
+            _, per_after = measure(after, count)
+            change = (per_after - per_before) / per_before * 100
+            print(
+                f"{count:>8} {entities:>9} {per_before:>16.0f} "
+                f"{per_after:>15.0f} {change:>+6.1f}%"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,260 @@
+"""Reconnect to first frame latency against a local TLS broker stand-in.
+
+Run from the repository root, no Home Assistant instance is started:
+
+    python -m tests.benchmark_reconnect [--cycles N]
+
+The paho client is configured by the integration and reconnects to a minimal
+MQTT 3.1.1 broker on TLS, which answers the subscription with a retained status
+frame. The time from the reconnect to that frame is compared for the context
+resuming the TLS session and for a plain context doing full handshakes. Needs
+homeassistant, inelsmqtt and the openssl command.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import socket
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from paho.mqtt import client as mqtt_client
+
+from homeassistant.const import CONF_VERIFY_SSL
+
+from custom_components.inels.const import CONF_CA_CERT, CONF_TLS
+from custom_components.inels.transport import build_tls_context, configure_client
+
+CYCLES = 200
+HOST = "localhost"
+TOPIC = "inels/status/0A1B2C3D4E5F/10/01"
+FRAME = b"01\n"
+
+CONNECT, CONNACK = 0x10, 0x20
+PUBLISH = 0x30
+SUBSCRIBE, SUBACK = 0x80, 0x90
+PINGREQ, PINGRESP = 0xC0, 0xD0
+DISCONNECT = 0xE0
+
+
+def _certificate(directory: Path) -> tuple[Path, Path]:
+    """Create self-signed certificate of the stand-in, return cert and key."""
+    cert, key = directory / "broker.crt", directory / "broker.key"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "ec",
+            "-pkeyopt",
+            "ec_paramgen_curve:prime256v1",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            f"/CN={HOST}",
+            "-addext",
+            f"subjectAltName=DNS:{HOST}",
+            "-keyout",
+            str(key),
+            "-out",
+            str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def _read_exactly(conn: ssl.SSLSocket, size: int) -> bytes:
+    """Read size bytes, empty when the client went away."""
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            return b""
+        data += chunk
+    return data
+
+
+def _read_packet(conn: ssl.SSLSocket) -> tuple[int, bytes] | None:
+    """Read packet type and payload, None when the client went away."""
+    header = _read_exactly(conn, 1)
+    if not header:
+        return None
+
+    length, shift = 0, 0
+    while True:
+        byte = _read_exactly(conn, 1)
+        if not byte:
+            return None
+        length += (byte[0] & 0x7F) << shift
+        shift += 7
+        if not byte[0] & 0x80:
+            break
+
+    payload = _read_exactly(conn, length) if length else b""
+    if length and not payload:
+        return None
+    return header[0] & 0xF0, payload
+
+
+def _packet(header: int, payload: bytes) -> bytes:
+    """Encode packet, the stand-in only sends payloads under 128 bytes."""
+    return bytes((header, len(payload))) + payload
+
+
+class BrokerStandIn:
+    """MQTT broker on TLS answering subscriptions with one retained frame."""
+
+    def __init__(self, cert: Path, key: Path) -> None:
+        """Listen on a free local port."""
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(cert, key)
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.port = self.server.getsockname()[1]
+        self.thread = threading.Thread(target=self._accept, daemon=True)
+
+    def start(self) -> None:
+        """Start accepting clients."""
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop accepting clients."""
+        self.server.close()
+
+    def _accept(self) -> None:
+        """Serve every client in its own thread."""
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        """Answer the packets of one client until it disconnects."""
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            with self.context.wrap_socket(conn, server_side=True) as tls:
+                while (packet := _read_packet(tls)) is not None:
+                    kind, payload = packet
+                    if kind == CONNECT:
+                        tls.sendall(_packet(CONNACK, b"\x00\x00"))
+                    elif kind == SUBSCRIBE:
+                        tls.sendall(_packet(SUBACK, payload[:2] + b"\x00"))
+                        topic = TOPIC.encode()
+                        frame = len(topic).to_bytes(2, "big") + topic + FRAME
+                        tls.sendall(_packet(PUBLISH | 0x01, frame))
+                    elif kind == PINGREQ:
+                        tls.sendall(_packet(PINGRESP, b""))
+                    elif kind == DISCONNECT:
+                        return
+        except (OSError, ssl.SSLError):
+            return
+
+
+class FirstFrame:
+    """Paho client subscribing on connect and flagging the first status frame."""
+
+    def __init__(self, context: ssl.SSLContext, config: dict[str, Any]) -> None:
+        """Create the client configured by the integration."""
+        self.client = mqtt_client.Client()
+        self.received = threading.Event()
+        self.client.on_connect = self._on_connect
+        self.client.on_message = self._on_message
+        configure_client(SimpleNamespace(client=self.client), config, context)
+
+    def _on_connect(self, client: Any, userdata: Any, flags: Any, rc: int) -> None:
+        """Resubscribe like inelsmqtt after every connect."""
+        client.subscribe(TOPIC)
+
+    def _on_message(self, client: Any, userdata: Any, message: Any) -> None:
+        """Flag the frame."""
+        self.received.set()
+
+    def _wait(self) -> None:
+        """Run the network loop until the frame arrives."""
+        while not self.received.is_set():
+            self.client.loop(0.01)
+
+    def connect(self, port: int) -> None:
+        """Connect the first time and wait for the frame."""
+        self.client.connect(HOST, port)
+        self._wait()
+
+    def reconnect(self) -> float:
+        """Drop the connection, return seconds from the reconnect to the frame."""
+        self.client.disconnect()
+        self.received.clear()
+
+        start = time.perf_counter()
+        self.client.reconnect()
+        self._wait()
+        return time.perf_counter() - start
+
+
+def measure(
+    context: ssl.SSLContext, config: dict[str, Any], port: int, cycles: int
+) -> list[float]:
+    """Return reconnect to first frame latencies in seconds."""
+    first_frame = FirstFrame(context, config)
+    first_frame.connect(port)
+    try:
+        return [first_frame.reconnect() for _ in range(cycles)]
+    finally:
+        first_frame.client.disconnect()
+
+
+def _row(name: str, latencies: list[float], counters: str) -> str:
+    """Format median and 95th percentile in ms."""
+    median = statistics.median(latencies) * 1000
+    p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+    return f"{name:>10} {median:>10.2f} {p95:>10.2f}  {counters}"
+
+
+def main(argv: list[str]) -> None:
+    """Print reconnect latencies with and without TLS session resumption."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=CYCLES)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = _certificate(Path(directory))
+        broker = BrokerStandIn(cert, key)
+        broker.start()
+
+        config = {CONF_TLS: True, CONF_CA_CERT: str(cert), CONF_VERIFY_SSL: True}
+        resuming = build_tls_context(config)
+        assert resuming is not None
+        plain = ssl.create_default_context(cafile=str(cert))
+
+        try:
+            resumed = measure(resuming, config, broker.port, args.cycles)
+            full = measure(plain, config, broker.port, args.cycles)
+        finally:
+            broker.stop()
+
+    print(f"{args.cycles} reconnects to {HOST}:{broker.port}")
+    print(f"{'context':>10} {'median ms':>10} {'p95 ms':>10}")
+    print(_row("full", full, f"handshakes: {args.cycles + 1}, resumed: 0"))
+    counters = resuming.as_dict()
+    print(
+        _row(
+            "resuming",
+            resumed,
+            f"handshakes: {counters['handshakes']}, resumed: {counters['resumed']}",
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,38 @@
+"""Fixtures of the iNELS tests."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+
+from .fake_broker import FakeBroker
+
+
+@pytest.fixture
+def fake_broker(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeBroker]:
+    """Return in-process broker, patched over paho when it is installed."""
+    broker = FakeBroker()
+    try:
+        # pylint: disable-next=import-outside-toplevel
+        from paho.mqtt import client as mqtt_client
+    except ImportError:
+        pass
+    else:
+        monkeypatch.setattr(mqtt_client, "Client", broker.client_class())
+
+    yield broker
+    broker.stop()
+
+
+@pytest.fixture
+def installation(fake_broker: FakeBroker) -> Callable[..., Any]:
+    """Return factory of simulated installations on the fake broker."""
+    pytest.importorskip("inelsmqtt")
+    # pylint: disable-next=import-outside-toplevel
+    from .simulators import FakeInstallation
+
+    def _installation(gateways: int = 1, seed: int = 0) -> FakeInstallation:
+        return FakeInstallation(fake_broker, gateways, seed)
+
+    return _installation
@@ -0,0 +1,386 @@
+"""In-process MQTT broker stand-in with a paho compatible client."""
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable
+import heapq
+import itertools
+import threading
+import time
+from typing import Any
+
+MQTT_ERR_SUCCESS = 0
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """Return true when the topic matches the subscription with + and # wildcards."""
+    pattern_levels = pattern.split("/")
+    topic_levels = topic.split("/")
+
+    for index, level in enumerate(pattern_levels):
+        if level == "#":
+            return True
+        if index >= len(topic_levels):
+            return False
+        if level not in ("+", topic_levels[index]):
+            return False
+
+    return len(pattern_levels) == len(topic_levels)
+
+
+class FakeMessage:
+    """Received message with the attributes of paho MQTTMessage."""
+
+    __slots__ = ("topic", "payload", "qos", "retain", "mid")
+
+    def __init__(
+        self, topic: str, payload: bytes, qos: int, retain: bool, mid: int
+    ) -> None:
+        """Init message."""
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+        self.mid = mid
+
+
+class FakeMessageInfo:
+    """Publish result with the attributes of paho MQTTMessageInfo."""
+
+    __slots__ = ("rc", "mid")
+
+    def __init__(self, mid: int) -> None:
+        """Init published message info."""
+        self.rc = MQTT_ERR_SUCCESS
+        self.mid = mid
+
+    def is_published(self) -> bool:
+        """Return true, the broker takes the frame synchronously."""
+        return True
+
+    def wait_for_publish(self, timeout: float | None = None) -> None:
+        """Return at once."""
+
+
+class FakeBroker:
+    """Broker keeping retained frames and delivering from one network thread.
+
+    Delivery order is the publish order, like a single TCP connection. Delayed
+    calls share the same thread so thousands of simulated devices need no timers.
+    """
+
+    def __init__(self) -> None:
+        """Init broker and start the network thread."""
+        # host names the broker answers on, others refuse the connection
+        self.hosts: set[str] = {"localhost"}
+        self.retained: dict[str, bytes] = {}
+        self.published: Counter[str] = Counter()
+        self.clients: list[FakeMqttClient] = []
+        self._handlers: list[tuple[str, Callable[[str, bytes], None]]] = []
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._calls: list[tuple[float, int, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self._mid = itertools.count(1)
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="fake-mqtt-broker", daemon=True
+        )
+        self._thread.start()
+
+    def client_class(self) -> type[FakeMqttClient]:
+        """Return client class bound to this broker, patched over paho Client."""
+        broker = self
+
+        class BoundFakeMqttClient(FakeMqttClient):
+            def __init__(self, *args: Any, **kwargs: Any) -> None:
+                super().__init__(broker, *args, **kwargs)
+
+        return BoundFakeMqttClient
+
+    def call_later(self, delay: float, call: Callable[[], None]) -> None:
+        """Run the call on the network thread after the delay."""
+        with self._lock:
+            heapq.heappush(
+                self._calls, (time.monotonic() + delay, next(self._seq), call)
+            )
+            self._wakeup.notify()
+
+    def add_handler(self, pattern: str, handler: Callable[[str, bytes], None]) -> None:
+        """Route frames published on the pattern to a simulated device."""
+        with self._lock:
+            self._handlers.append((pattern, handler))
+
+    def publish(
+        self, topic: str, payload: Any = None, qos: int = 0, retain: bool = False
+    ) -> int:
+        """Take the frame and queue it for the subscribers."""
+        data = _payload_bytes(payload)
+        mid = next(self._mid)
+
+        with self._lock:
+            self.published[topic] += 1
+        self.call_later(0, lambda: self._route(topic, data, qos, retain, mid))
+
+        return mid
+
+    def subscribe(self, client: FakeMqttClient, pattern: str, qos: int) -> None:
+        """Add the subscription and send the matching retained frames."""
+        self.call_later(0, lambda: self._subscribe(client, pattern, qos))
+
+    def _subscribe(self, client: FakeMqttClient, pattern: str, qos: int) -> None:
+        """Add the subscription in order with the routed frames."""
+        with self._lock:
+            client.subscriptions[pattern] = qos
+            retained = [
+                (topic, data)
+                for topic, data in self.retained.items()
+                if topic_matches(pattern, topic)
+            ]
+
+        for topic, data in retained:
+            client.deliver(FakeMessage(topic, data, qos, True, next(self._mid)))
+
+    def _route(self, topic: str, data: bytes, qos: int, retain: bool, mid: int) -> None:
+        """Keep the retained frame and deliver it to the devices and clients."""
+        with self._lock:
+            if retain:
+                if data:
+                    self.retained[topic] = data
+                else:
+                    self.retained.pop(topic, None)
+            handlers = [h for p, h in self._handlers if topic_matches(p, topic)]
+            clients = [c for c in self.clients if c.is_subscribed(topic)]
+
+        for handler in handlers:
+            handler(topic, data)
+
+        for client in clients:
+            client.deliver(FakeMessage(topic, data, qos, False, mid))
+
+    def _run(self) -> None:
+        """Run the due calls in order."""
+        while True:
+            with self._lock:
+                while self._running and (
+                    not self._calls or self._calls[0][0] > time.monotonic()
+                ):
+                    timeout = (
+                        self._calls[0][0] - time.monotonic() if self._calls else None
+                    )
+                    self._wakeup.wait(timeout)
+                if not self._running:
+                    return
+                _, _, call = heapq.heappop(self._calls)
+
+            call()
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """Wait until no call is due now, delayed device responses excluded."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._calls or self._calls[0][0] > time.monotonic():
+                    return True
+            time.sleep(0.001)
+        return False
+
+    def stop(self) -> None:
+        """Stop the network thread."""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify()
+        self._thread.join()
+
+
+class FakeMqttClient:
+    """Subset of the paho Client API used by inelsmqtt, backed by the broker."""
+
+    def __init__(self, broker: FakeBroker, *args: Any, **kwargs: Any) -> None:
+        """Init disconnected client."""
+        self._broker = broker
+        self.host: str | None = None
+        self.subscriptions: dict[str, int] = {}
+        self._callbacks: list[tuple[str, Callable[..., None]]] = []
+        self._connected = False
+        self._userdata = kwargs.get("userdata")
+        self.on_connect: Callable[..., None] | None = None
+        self.on_disconnect: Callable[..., None] | None = None
+        self.on_message: Callable[..., None] | None = None
+        self.on_subscribe: Callable[..., None] | None = None
+        self.on_unsubscribe: Callable[..., None] | None = None
+        self.on_publish: Callable[..., None] | None = None
+        self.on_log: Callable[..., None] | None = None
+
+    def username_pw_set(self, username: str | None, password: str | None = None):
+        """Accept any credentials."""
+
+    def tls_set(self, *args: Any, **kwargs: Any) -> None:
+        """Accept TLS settings."""
+
+    def tls_set_context(self, context: Any = None) -> None:
+        """Accept TLS context."""
+
+    def tls_insecure_set(self, value: bool) -> None:
+        """Accept TLS verification setting."""
+
+    def reconnect_delay_set(self, min_delay: int = 1, max_delay: int = 120) -> None:
+        """Accept reconnect backoff."""
+
+    def will_set(self, *args: Any, **kwargs: Any) -> None:
+        """Accept last will."""
+
+    def user_data_set(self, userdata: Any) -> None:
+        """Set user data passed to the callbacks."""
+        self._userdata = userdata
+
+    def connect(self, host: str, port: int = 1883, keepalive: int = 60, *args, **kw):
+        """Connect to the broker at once, refused on unknown hosts like paho."""
+        if host not in self._broker.hosts:
+            raise ConnectionRefusedError(f"No broker on {host}")
+        self.host = host
+        self._connected = True
+        with self._broker._lock:
+            if self not in self._broker.clients:
+                self._broker.clients.append(self)
+        if self.on_connect is not None:
+            self._broker.call_later(
+                0, lambda: self.on_connect(self, self._userdata, {}, 0)
+            )
+        return MQTT_ERR_SUCCESS
+
+    connect_async = connect
+
+    def reconnect(self) -> int:
+        """Connect again."""
+        return self.connect(self.host or "")
+
+    def disconnect(self, *args: Any, **kwargs: Any) -> int:
+        """Disconnect from the broker."""
+        self._connected = False
+        with self._broker._lock:
+            if self in self._broker.clients:
+                self._broker.clients.remove(self)
+        if self.on_disconnect is not None:
+            self.on_disconnect(self, self._userdata, 0)
+        return MQTT_ERR_SUCCESS
+
+    def loop_start(self) -> int:
+        """Network runs on the broker thread."""
+        return MQTT_ERR_SUCCESS
+
+    def loop_stop(self, force: bool = False) -> int:
+        """Network runs on the broker thread."""
+        return MQTT_ERR_SUCCESS
+
+    def loop(self, timeout: float = 1.0) -> int:
+        """Network runs on the broker thread."""
+        return MQTT_ERR_SUCCESS
+
+    def is_connected(self) -> bool:
+        """Return true when connected."""
+        return self._connected
+
+    def subscribe(self, topic: Any, qos: int = 0, *args: Any, **kwargs: Any):
+        """Subscribe one topic, a topic and qos tuple or a list of them."""
+        if isinstance(topic, tuple):
+            topics = [topic]
+        elif isinstance(topic, list):
+            topics = topic
+        else:
+            topics = [(topic, qos)]
+
+        mid = next(self._broker._mid)
+        for pattern, pattern_qos in topics:
+            self._broker.subscribe(self, pattern, pattern_qos)
+
+        if self.on_subscribe is not None:
+            granted = tuple(pattern_qos for _, pattern_qos in topics)
+            self._broker.call_later(
+                0, lambda: self.on_subscribe(self, self._userdata, mid, granted)
+            )
+        return MQTT_ERR_SUCCESS, mid
+
+    def unsubscribe(self, topic: Any, *args: Any, **kwargs: Any):
+        """Unsubscribe one topic or a list of them."""
+        with self._broker._lock:
+            for pattern in topic if isinstance(topic, list) else [topic]:
+                self.subscriptions.pop(pattern, None)
+        return MQTT_ERR_SUCCESS, next(self._broker._mid)
+
+    def is_subscribed(self, topic: str) -> bool:
+        """Return true when a subscription matches the topic."""
+        return any(topic_matches(pattern, topic) for pattern in self.subscriptions)
+
+    def message_callback_add(self, pattern: str, callback: Callable[..., None]):
+        """Route the matching messages to the callback instead of on_message."""
+        self._callbacks.append((pattern, callback))
+
+    def message_callback_remove(self, pattern: str) -> None:
+        """Remove callbacks of the pattern."""
+        self._callbacks = [item for item in self._callbacks if item[0] != pattern]
+
+    def publish(
+        self, topic: str, payload: Any = None, qos: int = 0, retain: bool = False, **kw
+    ) -> FakeMessageInfo:
+        """Publish the frame to the broker."""
+        info = FakeMessageInfo(self._broker.publish(topic, payload, qos, retain))
+        if self.on_publish is not None:
+            self._broker.call_later(
+                0, lambda: self.on_publish(self, self._userdata, info.mid)
+            )
+        return info
+
+    def deliver(self, message: FakeMessage) -> None:
+        """Call the callbacks of the message on the broker thread."""
+        if not self._connected:
+            return
+
+        callbacks = [cb for p, cb in self._callbacks if topic_matches(p, message.topic)]
+        if not callbacks and self.on_message is not None:
+            callbacks = [self.on_message]
+
+        for callback in callbacks:
+            callback(self, self._userdata, message)
+
+
+class Received:
+    """Messages received by a client, waitable from the test thread."""
+
+    def __init__(self) -> None:
+        """Init empty."""
+        self.messages: list[tuple[str, bytes, bool]] = []
+        self._event = threading.Condition()
+
+    def __call__(self, client: FakeMqttClient, userdata: Any, message: FakeMessage):
+        """Store the message."""
+        with self._event:
+            self.messages.append((message.topic, message.payload, message.retain))
+            self._event.notify_all()
+
+    def wait(self, count: int, timeout: float = 5.0) -> list[tuple[str, bytes, bool]]:
+        """Wait for the count of messages."""
+        with self._event:
+            self._event.wait_for(lambda: len(self.messages) >= count, timeout)
+        return self.messages
+
+
+def subscribe(broker: FakeBroker, pattern: str) -> Received:
+    """Connect client subscribed to the pattern."""
+    received = Received()
+    client = broker.client_class()()
+    client.on_message = received
+    client.connect("localhost")
+    client.subscribe(pattern)
+    return received
+
+
+def _payload_bytes(payload: Any) -> bytes:
+    """Encode payload like paho does."""
+    if payload is None:
+        return b""
+    if isinstance(payload, (bytes, bytearray)):
+        return bytes(payload)
+    if isinstance(payload, str):
+        return payload.encode()
+    return str(payload).encode()
@@ -0,0 +1,375 @@
+"""Simulated iNELS devices answering on the fake broker.
+
+Type codes, frame layouts and set frames are taken from the inelsmqtt tables,
+so inelsmqtt decodes the simulated frames like the ones of real devices.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import random
+
+from inelsmqtt.const import (
+    AIN,
+    BATTERY,
+    BUTTON_NUMBER,
+    BUTTON_TYPE_19_DATA,
+    CLIMATE_TYPE_09_DATA,
+    CURRENT_TEMP,
+    DEVICE_CONNCTED,
+    DEW_POINT,
+    DIM_OUT_1,
+    DIM_OUT_2,
+    HUMIDITY,
+    IDENTITY,
+    INELS_DEVICE_TYPE_DATA_STRUCT_DATA,
+    INELS_DEVICE_TYPE_DICT,
+    LIGHT_IN,
+    OPEN_IN_PERCENTAGE,
+    RELAY,
+    RELAY_DATA,
+    REQUIRED_TEMP,
+    SHUTTER_SET,
+    SHUTTER_STATES,
+    STATE,
+    STATE_CLOSED,
+    STATE_OPEN,
+    TEMP_IN,
+    TEMP_OUT,
+    TWOCHANNELDIMMER_DATA,
+    Element,
+)
+
+from .fake_broker import FakeBroker
+
+# device type codes of the status topics
+TYPE_CODES: dict[Element, str] = {
+    element: code for code, element in INELS_DEVICE_TYPE_DICT.items()
+}
+
+# payloads of the connected topics
+CONNECTED: dict[bool, str] = {
+    connected: payload for payload, connected in DEVICE_CONNCTED.items()
+}
+
+# seconds between a set frame and the status answer
+RF_DELAY = (0.15, 0.4)
+BUS_DELAY = (0.03, 0.08)
+
+Layout = dict[str, list[int]]
+
+
+def encode_frame(frame: Iterable[int]) -> str:
+    """Encode bytes as lines of two hex digits."""
+    return "".join(f"{byte & 0xFF:02X}\n" for byte in frame)
+
+
+def decode_frame(payload: bytes | str) -> list[int]:
+    """Decode hex bytes separated by new lines or spaces."""
+    if isinstance(payload, bytes):
+        payload = payload.decode()
+    return [int(part, 16) for part in payload.split()]
+
+
+def write_field(frame: list[int], indexes: list[int], value: int) -> None:
+    """Write the value over the indexes, the first one is the most significant."""
+    for index in reversed(indexes):
+        frame[index] = value & 0xFF
+        value >>= 8
+
+
+def read_field(frame: list[int], indexes: list[int]) -> int:
+    """Read the value from the indexes like inelsmqtt joins the hex bytes."""
+    value = 0
+    for index in indexes:
+        value = value << 8 | frame[index]
+    return value
+
+
+class DeviceSimulator:
+    """Device publishing its retained status, read only unless apply is defined."""
+
+    element: Element
+    layout: Layout = {}
+    rf = False
+
+    def __init__(
+        self,
+        broker: FakeBroker,
+        mac: str,
+        device_id: str,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Init simulator with the power on fields."""
+        self.broker = broker
+        self.mac = mac
+        self.device_id = device_id
+        self.rng = rng or random.Random()
+        self.fields = self.initial_fields()
+        self.commands: list[list[int]] = []
+
+        address = f"{mac}/{TYPE_CODES[self.element]}/{device_id}"
+        self.status_topic = f"inels/status/{address}"
+        self.set_topic = f"inels/set/{address}"
+        self.connected_topic = f"inels/connected/{address}"
+
+    @property
+    def unique_id(self) -> str:
+        """Return unique id as the discovery builds it."""
+        return f"{self.mac}_{self.device_id}"
+
+    @property
+    def frame(self) -> list[int]:
+        """Return status frame of the current fields."""
+        frame = [0] * (max(max(indexes) for indexes in self.layout.values()) + 1)
+        for field, value in self.fields.items():
+            write_field(frame, self.layout[field], value)
+        return frame
+
+    def initial_fields(self) -> dict[str, int]:
+        """Return raw field values after power on."""
+        return {}
+
+    def delay(self) -> float:
+        """Return answer delay of the bus or RF link."""
+        return self.rng.uniform(*(RF_DELAY if self.rf else BUS_DELAY))
+
+    def start(self) -> None:
+        """Announce the device with the retained status and listen to set frames."""
+        self.broker.add_handler(self.set_topic, self._on_set)
+        self.set_connected(True)
+        self.publish()
+
+    def set_connected(self, connected: bool) -> None:
+        """Publish the device as reachable or lost by its gateway."""
+        self.broker.publish(self.connected_topic, CONNECTED[connected], retain=True)
+
+    def publish(self) -> None:
+        """Publish current status frame as retained."""
+        self.broker.publish(self.status_topic, encode_frame(self.frame), retain=True)
+
+    def update(self, fields: dict[str, int]) -> None:
+        """Change the status locally, e.g. a wall switch or a new reading."""
+        self.fields.update(fields)
+        self.publish()
+
+    def answer(self, fields: dict[str, int]) -> None:
+        """Report the fields after the link delay."""
+        self.broker.call_later(self.delay(), lambda: self.update(fields))
+
+    def _on_set(self, topic: str, payload: bytes) -> None:
+        """Take the set frame."""
+        command = decode_frame(payload)
+        self.commands.append(command)
+        self.apply(command)
+
+    def apply(self, command: list[int]) -> None:
+        """Ignore command."""
+
+
+class RFTI10BSimulator(DeviceSimulator):
+    """RF temperature sensor with two probes, 0.01 C units."""
+
+    element = Element.RFTI_10B
+    layout = INELS_DEVICE_TYPE_DATA_STRUCT_DATA[Element.RFTI_10B]
+    rf = True
+
+    def initial_fields(self) -> dict[str, int]:
+        """Return battery fine and 21.5 C on both probes."""
+        return {BATTERY: 0, TEMP_IN: 2150, TEMP_OUT: 2150}
+
+    def set_temperature(self, temperature: float) -> None:
+        """Publish a new reading of both probes."""
+        raw = round(temperature * 100)
+        self.update({TEMP_IN: raw, TEMP_OUT: raw})
+
+
+class GTR350Simulator(DeviceSimulator):
+    """Bus multisensor: temperature, light, analog input, humidity, dew point."""
+
+    element = Element.GTR3_50
+    layout = INELS_DEVICE_TYPE_DATA_STRUCT_DATA[Element.GTR3_50]
+
+    def initial_fields(self) -> dict[str, int]:
+        """Return readings of a living room, 0.01 units."""
+        return {
+            TEMP_IN: 2150,
+            LIGHT_IN: 25000,
+            AIN: 2000,
+            HUMIDITY: 4500,
+            DEW_POINT: 900,
+        }
+
+
+class SA301BSimulator(DeviceSimulator):
+    """Bus relay with a temperature sensor."""
+
+    element = Element.SA3_01B
+    layout = RELAY_DATA
+
+    def initial_fields(self) -> dict[str, int]:
+        """Return relay off at 21.5 C."""
+        return {RELAY: 0, TEMP_IN: 2150}
+
+    def apply(self, command: list[int]) -> None:
+        """Switch the relay, bit 0 of the set frame."""
+        self.answer({RELAY: command[0] & 1})
+
+
+class DA322MSimulator(DeviceSimulator):
+    """Bus two channel dimmer, outputs in percent."""
+
+    element = Element.DA3_22M
+    layout = TWOCHANNELDIMMER_DATA
+
+    def initial_fields(self) -> dict[str, int]:
+        """Return both channels off at 21.5 C."""
+        return {TEMP_IN: 2150, DIM_OUT_1: 0, DIM_OUT_2: 0}
+
+    def apply(self, command: list[int]) -> None:
+        """Take the outputs, the set frame has them at the status indexes."""
+        self.answer(
+            {
+                output: min(read_field(command, self.layout[output]), 100)
+                for output in (DIM_OUT_1, DIM_OUT_2)
+            }
+        )
+
+
+class RFATV2Simulator(DeviceSimulator):
+    """RF thermostatic head, temperatures in 0.5 C units."""
+
+    element = Element.RFATV_2
+    layout = CLIMATE_TYPE_09_DATA
+    rf = True
+
+    def initial_fields(self) -> dict[str, int]:
+        """Return valve closed at 20 C with 21 C required."""
+        return {OPEN_IN_PERCENTAGE: 0, CURRENT_TEMP: 40, BATTERY: 0, REQUIRED_TEMP: 42}
+
+    def apply(self, command: list[int]) -> None:
+        """Take the required temperature, middle byte of the set frame."""
+        self.answer({REQUIRED_TEMP: command[1]})
+
+
+class RFJA12Simulator(DeviceSimulator):
+    """RF shutter reporting open or closed when the travel ends."""
+
+    element = Element.RFJA_12
+    rf = True
+    TRAVEL = 0.5  # s
+
+    FRAMES = {state: decode_frame(frame) for frame, state in SHUTTER_STATES.items()}
+    COMMANDS = {tuple(decode_frame(frame)): move for move, frame in SHUTTER_SET.items()}
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Init shutter closed."""
+        super().__init__(*args, **kwargs)
+        self.state = STATE_CLOSED
+        self._moves = 0
+
+    @property
+    def frame(self) -> list[int]:
+        """Return status frame of the end position."""
+        return self.FRAMES[self.state]
+
+    def apply(self, command: list[int]) -> None:
+        """Report the end state unless stopped or reversed before."""
+        self._moves += 1
+        move = self._moves
+        end = self.COMMANDS.get(tuple(command))
+
+        if end not in (STATE_OPEN, STATE_CLOSED):
+            return
+
+        def _end() -> None:
+            if move == self._moves:
+                self.state = end
+                self.publish()
+
+        self.broker.call_later(self.delay() + self.TRAVEL, _end)
+
+
+class RFGB40Simulator(DeviceSimulator):
+    """RF button array reporting the pressed button."""
+
+    element = Element.RFGB_40
+    layout = BUTTON_TYPE_19_DATA
+    rf = True
+
+    PRESSED = 0x30  # pressing and changed
+    RELEASED = 0x20  # changed
+
+    IDENTITIES = {
+        number: int(identity, 16) for identity, number in BUTTON_NUMBER.items()
+    }
+
+    def initial_fields(self) -> dict[str, int]:
+        """Return no button pressed yet."""
+        return {STATE: 0, IDENTITY: self.IDENTITIES[1]}
+
+    def press(self, button: int, hold: float = 0.1) -> None:
+        """Report the button pressed, then released."""
+        self.update({STATE: self.PRESSED, IDENTITY: self.IDENTITIES[button]})
+        self.broker.call_later(hold, lambda: self.update({STATE: self.RELEASED}))
+
+
+SIMULATORS: tuple[type[DeviceSimulator], ...] = (
+    RFTI10BSimulator,
+    GTR350Simulator,
+    SA301BSimulator,
+    DA322MSimulator,
+    RFATV2Simulator,
+    RFJA12Simulator,
+    RFGB40Simulator,
+)
+
+
+class FakeInstallation:
+    """Devices of a site spread over the bus and RF gateways."""
+
+    def __init__(
+        self,
+        broker: FakeBroker,
+        gateways: int = 1,
+        seed: int = 0,
+    ) -> None:
+        """Init installation with the gateway MAC addresses."""
+        self.broker = broker
+        self.rng = random.Random(seed)
+        self.gateways = [f"{index + 1:012X}" for index in range(gateways)]
+        self.devices: list[DeviceSimulator] = []
+
+    def add(
+        self, simulator: type[DeviceSimulator], count: int = 1
+    ) -> list[DeviceSimulator]:
+        """Add devices round robin over the gateways."""
+        added = []
+
+        for _ in range(count):
+            mac = self.gateways[len(self.devices) % len(self.gateways)]
+            device = simulator(
+                self.broker, mac, f"{len(self.devices) + 1:05X}", self.rng
+            )
+            self.devices.append(device)
+            added.append(device)
+
+        return added
+
+    def add_mix(self, count: int) -> list[DeviceSimulator]:
+        """Add devices cycling through all simulated types."""
+        return [
+            self.add(SIMULATORS[index % len(SIMULATORS)])[0] for index in range(count)
+        ]
+
+    def set_gateway_connected(self, mac: str, connected: bool) -> None:
+        """Publish the gateway as online or offline."""
+        self.broker.publish(
+            f"inels/connected/{mac}/gw", CONNECTED[connected], retain=True
+        )
+
+    def start(self) -> None:
+        """Bring the gateways online and announce the devices."""
+        for mac in self.gateways:
+            self.set_gateway_connected(mac, True)
+        for device in self.devices:
+            device.start()
@@ -0,0 +1,119 @@
+"""Availability of the entities driven by the connected topics."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("inelsmqtt")
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+# pylint: disable=wrong-import-position
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_HOST, CONF_PORT, STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from custom_components.inels.const import DOMAIN, TITLE
+
+from .simulators import FakeInstallation, SA301BSimulator
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable the custom integration."""
+    yield
+
+
+async def _async_setup(hass: HomeAssistant, site: FakeInstallation) -> MockConfigEntry:
+    """Set up the entry on the started installation."""
+    site.start()
+    assert await hass.async_add_executor_job(site.broker.wait_idle)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN, title=TITLE, data={CONF_HOST: "localhost", CONF_PORT: 1883}
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+def _switches(hass: HomeAssistant, entry: MockConfigEntry) -> dict[str, str]:
+    """Return entity ids of the switches by their unique id."""
+    return {
+        entity.unique_id: entity.entity_id
+        for entity in er.async_entries_for_config_entry(
+            er.async_get(hass), entry.entry_id
+        )
+        if entity.domain == "switch"
+    }
+
+
+async def _async_wait_available(
+    hass: HomeAssistant, entity_ids: list[str], available: bool = True
+) -> bool:
+    """Wait until the entities are available, or unavailable."""
+    for _ in range(50):
+        await asyncio.sleep(0.02)
+        await hass.async_block_till_done()
+        if all(
+            (hass.states.get(entity_id).state != STATE_UNAVAILABLE) is available
+            for entity_id in entity_ids
+        ):
+            return True
+    return False
+
+
+async def test_lost_device_unavailable(hass: HomeAssistant, installation) -> None:
+    """Test the device reported lost by its gateway is unavailable at once."""
+    site = installation()
+    lost, kept = site.add(SA301BSimulator, 2)
+    entry = await _async_setup(hass, site)
+    switches = _switches(hass, entry)
+    lost_id = next(eid for uid, eid in switches.items() if lost.device_id in uid)
+    kept_id = next(eid for uid, eid in switches.items() if kept.device_id in uid)
+    assert hass.states.get(lost_id).state != STATE_UNAVAILABLE
+
+    lost.set_connected(False)
+
+    assert await _async_wait_available(hass, [lost_id], False)
+    assert hass.states.get(kept_id).state != STATE_UNAVAILABLE
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_gateway_offline_takes_down_its_devices(
+    hass: HomeAssistant, installation
+) -> None:
+    """Test an offline gateway makes the devices behind it unavailable only."""
+    site = installation(gateways=2)
+    site.add(SA301BSimulator, 4)
+    entry = await _async_setup(hass, site)
+    switches = _switches(hass, entry)
+    down = site.gateways[0]
+
+    def _entity_ids(behind: bool) -> list[str]:
+        return [
+            entity_id
+            for unique_id, entity_id in switches.items()
+            for device in site.devices
+            if device.device_id in unique_id and (device.mac == down) is behind
+        ]
+
+    devices = dr.async_get(hass)
+    gateway = devices.async_get_device({(DOMAIN, down)})
+    assert gateway is not None
+    for entity_id in _entity_ids(True):
+        entity = er.async_get(hass).async_get(entity_id)
+        assert devices.async_get(entity.device_id).via_device_id == gateway.id
+
+    site.set_gateway_connected(down, False)
+
+    assert await _async_wait_available(hass, _entity_ids(True), False)
+    assert await _async_wait_available(hass, _entity_ids(False))
+
+    site.set_gateway_connected(down, True)
+
+    assert await _async_wait_available(hass, _entity_ids(True))
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,57 @@
+"""Tests of the fake broker."""
+from __future__ import annotations
+
+import pytest
+
+from .fake_broker import FakeBroker, subscribe, topic_matches
+
+
+@pytest.mark.parametrize(
+    ("pattern", "topic", "matches"),
+    [
+        ("inels/status/#", "inels/status/AA/10/01", True),
+        ("inels/+/AA/#", "inels/set/AA/10/01", True),
+        ("inels/status/+", "inels/status/AA/10", False),
+        ("inels/status/AA/10/01", "inels/status/AA/10/01", True),
+        ("inels/status/AA/10/01", "inels/status/AA/10/02", False),
+        ("#", "inels/connected/AA/gw", True),
+    ],
+)
+def test_topic_matches(pattern: str, topic: str, matches: bool) -> None:
+    """Test wildcard matching."""
+    assert topic_matches(pattern, topic) is matches
+
+
+def test_retained_delivered_on_subscribe(fake_broker: FakeBroker) -> None:
+    """Test a late subscriber gets the retained frames, newest only."""
+    fake_broker.publish("inels/status/AA/10/01", "01\n", retain=True)
+    fake_broker.publish("inels/status/AA/10/01", "02\n", retain=True)
+    fake_broker.publish("inels/other", "x")
+
+    received = subscribe(fake_broker, "inels/status/#")
+
+    assert received.wait(1) == [("inels/status/AA/10/01", b"02\n", True)]
+
+
+def test_order_kept(fake_broker: FakeBroker) -> None:
+    """Test frames arrive in the publish order."""
+    received = subscribe(fake_broker, "inels/#")
+    assert fake_broker.wait_idle()
+
+    for index in range(100):
+        fake_broker.publish(f"inels/status/AA/10/{index}", str(index))
+
+    assert [int(payload) for _, payload, _ in received.wait(100)] == list(range(100))
+
+
+def test_unknown_host_refused(fake_broker: FakeBroker) -> None:
+    """Test clients connect only on the host names of the broker."""
+    client = fake_broker.client_class()()
+
+    with pytest.raises(ConnectionRefusedError):
+        client.connect("broker.lan")
+    fake_broker.hosts.add("broker.lan")
+    client.connect("broker.lan")
+
+    assert client.host == "broker.lan"
+    assert client in fake_broker.clients
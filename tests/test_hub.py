@@ -0,0 +1,61 @@
+"""Decoding of the status frames in the device hub."""
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("inelsmqtt")
+pytest.importorskip("homeassistant")
+pytest.importorskip("paho.mqtt")
+
+# pylint: disable=wrong-import-position
+from inelsmqtt import InelsMqtt
+from inelsmqtt.const import MQTT_HOST, MQTT_PORT, MQTT_TIMEOUT
+from inelsmqtt.devices import Device
+from inelsmqtt.discovery import InelsDiscovery
+
+from custom_components.inels.hub import InelsDeviceHub, InelsDeviceState
+
+from .simulators import FakeInstallation, RFTI10BSimulator
+
+
+def _discover(site: FakeInstallation) -> Device:
+    """Discover the only device of the installation."""
+    site.start()
+    assert site.broker.wait_idle()
+
+    discovery = InelsDiscovery(
+        InelsMqtt({MQTT_HOST: "localhost", MQTT_PORT: 1883, MQTT_TIMEOUT: 1})
+    )
+    discovery.discovery()
+    return discovery.devices[0]
+
+
+def _unread(device: Device) -> Any:
+    """Fail when the current state of the device is read."""
+    raise AssertionError("device state read while decoding")
+
+
+def test_frame_decoded_once_for_all_listeners(installation) -> None:
+    """Test listeners share one state decoded from the frame, not the device."""
+    site = installation()
+    site.add(RFTI10BSimulator)
+    device = _discover(site)
+    hub = InelsDeviceHub(device, None)
+
+    states: list[InelsDeviceState] = []
+    hub.async_add_listener(lambda state: None)
+    hub.async_add_listener(
+        lambda fields: None, lambda state: states.append(state) or state.fields
+    )
+
+    frame = site.broker.retained[site.devices[0].status_topic]
+    with patch.object(type(device), "state", property(_unread)):
+        (_, state), (_, fields) = hub.decode(frame)
+
+    assert states == [state]
+    assert fields == tuple(frame.decode().split("\n")[:-1])
+    assert state.values.inels_value == frame.decode()
+    assert state.unique_id == device.unique_id
@@ -0,0 +1,72 @@
+"""Setup of the integration at scale against the simulated installation."""
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+pytest.importorskip("inelsmqtt")
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+# pylint: disable=wrong-import-position
+from inelsmqtt.const import RELAY
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.inels.const import DOMAIN, TITLE
+
+from .simulators import SA301BSimulator, decode_frame, read_field
+
+LOAD_DEVICES = int(os.environ.get("INELS_LOAD_DEVICES", "200"))
+# seconds the setup of the simulated installation may take
+LOAD_BUDGET = float(os.environ.get("INELS_LOAD_BUDGET", "30"))
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable the custom integration."""
+    yield
+
+
+async def test_setup_at_scale(hass: HomeAssistant, installation) -> None:
+    """Test all simulated devices get entities and a switch round trips."""
+    site = installation(gateways=max(1, LOAD_DEVICES // 250))
+    site.add_mix(LOAD_DEVICES)
+    site.start()
+    assert await hass.async_add_executor_job(site.broker.wait_idle)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN, title=TITLE, data={CONF_HOST: "localhost", CONF_PORT: 1883}
+    )
+    entry.add_to_hass(hass)
+
+    start = time.monotonic()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    elapsed = time.monotonic() - start
+
+    entities = er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+    assert len(entities) >= LOAD_DEVICES
+    assert elapsed < LOAD_BUDGET
+
+    relay = next(
+        device for device in site.devices if isinstance(device, SA301BSimulator)
+    )
+    switch = next(
+        entity.entity_id
+        for entity in entities
+        if entity.domain == "switch" and relay.device_id in entity.unique_id
+    )
+    await hass.services.async_call(
+        "switch", "turn_on", {"entity_id": switch}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    assert relay.commands
+    frame = decode_frame(site.broker.retained[relay.status_topic])
+    assert read_field(frame, relay.layout[RELAY]) == 1
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,127 @@
+"""Broker reconfiguration of a running entry on the simulated installation."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("inelsmqtt")
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+# pylint: disable=wrong-import-position
+from inelsmqtt.const import RELAY
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_DISCOVERY, CONF_HOST, CONF_PORT, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.inels.const import (
+    BROKER,
+    BROKER_CONFIG,
+    CONF_DECODE_WORKER,
+    DEVICES,
+    DOMAIN,
+    TITLE,
+)
+
+from .fake_broker import FakeBroker
+from .simulators import FakeInstallation, SA301BSimulator, decode_frame, read_field
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable the custom integration."""
+    yield
+
+
+async def _async_setup(hass: HomeAssistant, site: FakeInstallation) -> MockConfigEntry:
+    """Set up the entry on an installation of two relays."""
+    site.add(SA301BSimulator, 2)
+    site.start()
+    assert await hass.async_add_executor_job(site.broker.wait_idle)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN, title=TITLE, data={CONF_HOST: "localhost", CONF_PORT: 1883}
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_swap_keeps_entities(
+    hass: HomeAssistant, fake_broker: FakeBroker, installation
+) -> None:
+    """Test a moved broker takes over the devices without a reload."""
+    site = installation()
+    entry = await _async_setup(hass, site)
+    inels_data = hass.data[DOMAIN][entry.entry_id]
+    old_broker = inels_data[BROKER]
+    switch = hass.states.async_entity_ids("switch")[0]
+
+    # the broker moved, the old address is gone
+    fake_broker.hosts = {"broker.lan"}
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_HOST: "broker.lan"}
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][entry.entry_id] is inels_data
+    assert inels_data[BROKER] is not old_broker
+    assert all(device.mqtt is inels_data[BROKER] for device in inels_data[DEVICES])
+    assert {client.host for client in fake_broker.clients} == {"broker.lan"}
+
+    await hass.services.async_call(
+        "switch", "turn_on", {"entity_id": switch}, blocking=True
+    )
+    for _ in range(50):
+        await asyncio.sleep(0.02)
+        await hass.async_block_till_done()
+        if hass.states.get(switch).state == STATE_ON:
+            break
+    assert hass.states.get(switch).state == STATE_ON
+
+    unique_id = er.async_get(hass).async_get(switch).unique_id
+    relay = next(device for device in site.devices if device.device_id in unique_id)
+    frame = decode_frame(fake_broker.retained[relay.status_topic])
+    assert read_field(frame, relay.layout[RELAY]) == 1
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_options_form_swaps_once(
+    hass: HomeAssistant, fake_broker: FakeBroker, installation
+) -> None:
+    """Test the data and options updates of the options form do not reload."""
+    entry = await _async_setup(hass, installation())
+    inels_data = hass.data[DOMAIN][entry.entry_id]
+    fake_broker.hosts.add("broker.lan")
+
+    data = {**entry.data, CONF_HOST: "broker.lan"}
+    hass.config_entries.async_update_entry(entry, data=data)
+    hass.config_entries.async_update_entry(
+        entry, options={**data, CONF_DECODE_WORKER: False, CONF_DISCOVERY: True}
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][entry.entry_id] is inels_data
+    assert inels_data[BROKER_CONFIG][CONF_HOST] == "broker.lan"
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_failed_swap_keeps_broker(
+    hass: HomeAssistant, fake_broker: FakeBroker, installation
+) -> None:
+    """Test an unreachable broker leaves the entry on the old connection."""
+    entry = await _async_setup(hass, installation())
+    inels_data = hass.data[DOMAIN][entry.entry_id]
+    old_broker = inels_data[BROKER]
+
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_HOST: "nowhere.lan"}
+    )
+    await hass.async_block_till_done()
+
+    assert inels_data[BROKER] is old_broker
+    assert inels_data[BROKER_CONFIG][CONF_HOST] == "localhost"
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,101 @@
+"""Outbound scheduler ordering and gateway budgets."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("inelsmqtt")
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+# pylint: disable=wrong-import-position
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.inels.hub import InelsDeviceHub, async_refresh_hubs
+from custom_components.inels.scheduler import (
+    PRIORITY_AUTOMATION,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    RF_BURST,
+    InelsOutboundScheduler,
+)
+
+
+def _device(gateway: str) -> SimpleNamespace:
+    """Return RF device behind the gateway."""
+    return SimpleNamespace(parent_id=gateway, device_type="sensor")
+
+
+async def test_priority_order_within_gateway(hass: HomeAssistant) -> None:
+    """Test queued jobs of a gateway out of tokens go out by priority."""
+    scheduler = InelsOutboundScheduler(hass)
+    device = _device("AA")
+    done: list[str] = []
+
+    # the burst is used up, the rest waits for tokens
+    for _ in range(RF_BURST):
+        scheduler.async_post(device, lambda: None, PRIORITY_AUTOMATION)
+    scheduler.async_post(device, lambda: done.append("background"), PRIORITY_BACKGROUND)
+    scheduler.async_post(device, lambda: done.append("automation"), PRIORITY_AUTOMATION)
+    await scheduler.async_submit(
+        device, lambda: done.append("interactive"), PRIORITY_INTERACTIVE
+    )
+    await scheduler.async_flush()
+
+    assert done == ["interactive", "automation", "background"]
+    assert scheduler.queued == 0
+
+
+async def test_gateway_out_of_tokens_does_not_block_others(
+    hass: HomeAssistant,
+) -> None:
+    """Test a busy gateway leaves the ready deque while others keep sending."""
+    scheduler = InelsOutboundScheduler(hass)
+    busy, idle = _device("AA"), _device("BB")
+
+    for _ in range(RF_BURST + 2):
+        scheduler.async_post(busy, lambda: None, PRIORITY_INTERACTIVE)
+    assert scheduler.queued == 2
+
+    await asyncio.wait_for(
+        scheduler.async_submit(idle, lambda: "sent", PRIORITY_BACKGROUND), 0.1
+    )
+    assert scheduler.queued == 2
+
+    await scheduler.async_flush()
+    assert scheduler.queued == 0
+    assert scheduler.async_stop() == 0
+
+
+async def test_refresh_in_background_class(hass: HomeAssistant) -> None:
+    """Test re-reading the status takes background tokens of the gateways."""
+    scheduler = InelsOutboundScheduler(hass)
+    dispatched: list[int] = []
+    hubs = []
+    for index in range(3):
+        device = SimpleNamespace(
+            **vars(_device("AA")),
+            unique_id=f"{index:02X}",
+            get_value=lambda index=index: index,
+            subscribe_listener=lambda *args: None,
+        )
+        hub = InelsDeviceHub(device, None)
+        hub.async_add_listener(lambda state: dispatched.append(state.values))
+        hubs.append(hub)
+
+    await async_refresh_hubs(scheduler, hubs)
+
+    assert dispatched == [0, 1, 2]
+    assert scheduler.stats[PRIORITY_BACKGROUND].done == 3
+    assert scheduler.stats[PRIORITY_AUTOMATION].submitted == 0
+
+
+async def test_submit_after_stop_fails(hass: HomeAssistant) -> None:
+    """Test jobs submitted to the stopped scheduler fail at once."""
+    scheduler = InelsOutboundScheduler(hass)
+    scheduler.async_stop()
+
+    with pytest.raises(HomeAssistantError):
+        await scheduler.async_submit(_device("AA"), lambda: None, PRIORITY_INTERACTIVE)
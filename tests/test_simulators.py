@@ -0,0 +1,179 @@
+"""Tests of the device simulators against the inelsmqtt decoding."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+pytest.importorskip("inelsmqtt")
+pytest.importorskip("paho.mqtt")
+
+# pylint: disable=wrong-import-position
+from inelsmqtt import InelsMqtt
+from inelsmqtt.const import (
+    DIM_OUT_1,
+    DIM_OUT_2,
+    INELS_DEVICE_TYPE_DATA_STRUCT_DATA,
+    MQTT_HOST,
+    MQTT_PORT,
+    MQTT_TIMEOUT,
+    SHUTTER_SET,
+    STATE,
+    STATE_OPEN,
+    TEMP_IN,
+    TEMP_OUT,
+    Element,
+)
+from inelsmqtt.devices import Device
+from inelsmqtt.discovery import InelsDiscovery
+
+from .fake_broker import FakeBroker, subscribe
+from .simulators import (
+    SIMULATORS,
+    DA322MSimulator,
+    DeviceSimulator,
+    FakeInstallation,
+    GTR350Simulator,
+    RFATV2Simulator,
+    RFGB40Simulator,
+    RFJA12Simulator,
+    RFTI10BSimulator,
+    SA301BSimulator,
+    decode_frame,
+    encode_frame,
+    read_field,
+)
+
+
+def _discover(site: FakeInstallation) -> dict[str, Device]:
+    """Discover the installation with inelsmqtt, return devices by state topic."""
+    site.start()
+    assert site.broker.wait_idle()
+
+    mqtt = InelsMqtt({MQTT_HOST: "localhost", MQTT_PORT: 1883, MQTT_TIMEOUT: 1})
+    discovery = InelsDiscovery(mqtt)
+    discovery.discovery()
+
+    return {device.state_topic: device for device in discovery.devices}
+
+
+def test_frame_round_trip() -> None:
+    """Test frames are lines of two hex digits, set frames may use spaces."""
+    assert encode_frame([1, 0xAB]) == "01\nAB\n"
+    assert decode_frame(b"01\nAB\n") == [1, 0xAB]
+    assert decode_frame("02 00 00") == [2, 0, 0]
+
+
+def test_inelsmqtt_decodes_frames(installation) -> None:
+    """Test inelsmqtt discovers every simulated device and decodes its frame."""
+    site = installation()
+    for simulator in SIMULATORS:
+        site.add(simulator)
+    devices = _discover(site)
+
+    assert len(devices) == len(SIMULATORS)
+    for simulator in site.devices:
+        device = devices[simulator.status_topic]
+        assert device.inels_type == simulator.element
+        assert device.parent_id == simulator.mac
+        assert device.is_available
+
+    def _device(simulator: type[DeviceSimulator]):
+        return next(
+            devices[device.status_topic]
+            for device in site.devices
+            if isinstance(device, simulator)
+        )
+
+    thermometer = decode_frame(_device(RFTI10BSimulator).state)
+    layout = INELS_DEVICE_TYPE_DATA_STRUCT_DATA[Element.RFTI_10B]
+    assert read_field(thermometer, layout[TEMP_IN]) / 100 == 21.5
+    assert read_field(thermometer, layout[TEMP_OUT]) / 100 == 21.5
+
+    multisensor = decode_frame(_device(GTR350Simulator).state)
+    layout = INELS_DEVICE_TYPE_DATA_STRUCT_DATA[Element.GTR3_50]
+    assert read_field(multisensor, layout[TEMP_IN]) / 100 == 21.5
+
+    relay = _device(SA301BSimulator).state
+    assert not relay.on
+    assert int(relay.temp, 16) / 100 == 21.5
+
+    dimmer = _device(DA322MSimulator).state
+    assert dimmer.out == [0, 0]
+    assert int(dimmer.temp, 16) / 100 == 21.5
+
+    valve = _device(RFATV2Simulator).state
+    assert valve.current == 20.0
+    assert valve.required == 21.0
+
+    assert _device(RFJA12Simulator).state == "closed"
+    assert _device(RFGB40Simulator).values.ha_value.number == 1
+
+
+def test_dimmer_answers_after_delay(fake_broker: FakeBroker, installation) -> None:
+    """Test a bus device reports the set outputs after the link delay."""
+    site = installation()
+    dimmer = site.add(DA322MSimulator)[0]
+    site.start()
+    received = subscribe(fake_broker, dimmer.status_topic)
+    received.wait(1)
+
+    start = time.monotonic()
+    fake_broker.publish(dimmer.set_topic, "00\n00\n00\n00\n64\n32\n")
+
+    frame = decode_frame(received.wait(2)[-1][1])
+    assert time.monotonic() - start >= 0.03
+    assert read_field(frame, dimmer.layout[DIM_OUT_1]) == 100
+    assert read_field(frame, dimmer.layout[DIM_OUT_2]) == 50
+    assert read_field(frame, dimmer.layout[TEMP_IN]) == 2150
+
+
+def test_shutter_reports_end(fake_broker: FakeBroker, installation) -> None:
+    """Test the shutter reports the end state unless stopped before."""
+    site = installation()
+    shutter, stopped = site.add(RFJA12Simulator, 2)
+    site.start()
+    received = subscribe(fake_broker, "inels/status/#")
+    received.wait(2)
+
+    fake_broker.publish(shutter.set_topic, SHUTTER_SET[STATE_OPEN])
+    fake_broker.publish(stopped.set_topic, SHUTTER_SET[STATE_OPEN])
+    for move in SHUTTER_SET.values():
+        if move != SHUTTER_SET[STATE_OPEN]:
+            fake_broker.publish(stopped.set_topic, move)
+
+    messages = received.wait(3)
+    assert [topic for topic, _, _ in messages[2:]] == [shutter.status_topic]
+    assert shutter.state == STATE_OPEN
+    assert stopped.state != STATE_OPEN
+
+
+def test_sensors_ignore_commands(fake_broker: FakeBroker, installation) -> None:
+    """Test read only devices publish readings and ignore set frames."""
+    site = installation()
+    sensor = site.add(RFTI10BSimulator)[0]
+    buttons = site.add(RFGB40Simulator)[0]
+    site.start()
+
+    sensor.set_temperature(22.0)
+    buttons.press(2, hold=0.01)
+    fake_broker.publish(sensor.set_topic, "01\n")
+    assert fake_broker.wait_idle()
+    time.sleep(0.05)
+
+    frame = decode_frame(fake_broker.retained[sensor.status_topic])
+    assert read_field(frame, sensor.layout[TEMP_IN]) == 2200
+    assert buttons.fields[STATE] == RFGB40Simulator.RELEASED
+
+
+def test_installation_spreads_devices(fake_broker: FakeBroker, installation) -> None:
+    """Test a large installation covers all types and gateways."""
+    site = installation(gateways=4)
+    site.add_mix(1000)
+    site.start()
+
+    assert {type(device) for device in site.devices} == set(SIMULATORS)
+    assert len({device.unique_id for device in site.devices}) == 1000
+    assert {device.mac for device in site.devices} == set(site.gateways)
+    assert len(subscribe(fake_broker, "inels/status/#").wait(1000)) == 1000
+    assert len(subscribe(fake_broker, "inels/connected/#").wait(1004)) == 1004
@@ -0,0 +1,60 @@
+"""Tests of the broker connection settings."""
+from __future__ import annotations
+
+import socket
+import struct
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("inelsmqtt")
+pytest.importorskip("homeassistant")
+mqtt_client = pytest.importorskip("paho.mqtt.client")
+
+# pylint: disable=wrong-import-position
+from custom_components.inels.const import CONF_KEEPALIVE
+from custom_components.inels.transport import configure_client, keepalive_client_class
+
+
+def _connect_keepalive(server: socket.socket) -> int:
+    """Accept the client and return the keepalive of its CONNECT packet."""
+    conn, _ = server.accept()
+    with conn:
+        conn.settimeout(5)
+        data = b""
+        while len(data) < 12:
+            data += conn.recv(64)
+    # fixed header, remaining length, 00 04 MQTT, level, flags, keepalive
+    assert data[0] == 0x10
+    assert data[2:8] == b"\x00\x04MQTT"
+    return struct.unpack("!H", data[10:12])[0]
+
+
+def test_connect_uses_configured_keepalive() -> None:
+    """Test the default keepalive of the connect call is replaced."""
+    client = mqtt_client.Client()
+    configure_client(SimpleNamespace(client=client), {CONF_KEEPALIVE: 17}, None)
+
+    assert isinstance(client, mqtt_client.Client)
+    assert type(client) is keepalive_client_class(mqtt_client.Client)
+
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        server.settimeout(5)
+        # inelsmqtt connects with the paho default keepalive
+        client.connect("127.0.0.1", server.getsockname()[1])
+        try:
+            assert _connect_keepalive(server) == 17
+        finally:
+            client.socket().close()
+
+
+def test_wrapper_class_cached() -> None:
+    """Test clients of the same class share the wrapper class."""
+    first = mqtt_client.Client()
+    second = mqtt_client.Client()
+    configure_client(SimpleNamespace(client=first), {}, None)
+    configure_client(SimpleNamespace(client=second), {CONF_KEEPALIVE: 30}, None)
+
+    assert type(first) is type(second)
+    assert first.inels_keepalive == 60
+    assert second.inels_keepalive == 30